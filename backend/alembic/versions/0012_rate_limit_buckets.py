@@ -0,0 +1,31 @@
+"""shared rate limit buckets
+
+Revision ID: 0012_rate_limit_buckets
+Revises: 0011_cloudinary_public_ids
+Create Date: 2026-10-18
+"""
+
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0012_rate_limit_buckets"
+down_revision = "0011_cloudinary_public_ids"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "rate_limit_buckets",
+        sa.Column("key", sa.String(length=255), primary_key=True),
+        sa.Column("tat", sa.Float(), nullable=False),
+    )
+    op.create_index("ix_rate_limit_buckets_tat", "rate_limit_buckets", ["tat"], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index("ix_rate_limit_buckets_tat", table_name="rate_limit_buckets")
+    op.drop_table("rate_limit_buckets")
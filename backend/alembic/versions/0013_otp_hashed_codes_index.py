@@ -0,0 +1,39 @@
+"""otp codes: hashed code column + composite lookup index
+
+Revision ID: 0013_otp_hashed_codes_index
+Revises: 0012_rate_limit_buckets
+Create Date: 2026-10-18
+"""
+
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0013_otp_hashed_codes_index"
+down_revision = "0012_rate_limit_buckets"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # SQLite-safe via batch_alter_table.
+    with op.batch_alter_table("otp_codes") as batch:
+        # HMAC-SHA256 hex digest (64 chars) instead of the plain 6-digit code.
+        batch.alter_column("code", existing_type=sa.String(length=12), type_=sa.String(length=64), existing_nullable=False)
+        batch.drop_index("ix_otp_codes_identifier")
+        batch.drop_index("ix_otp_codes_purpose")
+        batch.create_index("ix_otp_codes_identifier_purpose_expires_at", ["identifier", "purpose", "expires_at"], unique=False)
+        batch.create_index("ix_otp_codes_expires_at", ["expires_at"], unique=False)
+
+
+def downgrade() -> None:
+    # Hashed codes cannot be converted back; drop them (they are short-lived anyway).
+    op.execute("DELETE FROM otp_codes")
+    with op.batch_alter_table("otp_codes") as batch:
+        batch.drop_index("ix_otp_codes_expires_at")
+        batch.drop_index("ix_otp_codes_identifier_purpose_expires_at")
+        batch.create_index("ix_otp_codes_purpose", ["purpose"], unique=False)
+        batch.create_index("ix_otp_codes_identifier", ["identifier"], unique=False)
+        batch.alter_column("code", existing_type=sa.String(length=64), type_=sa.String(length=12), existing_nullable=False)
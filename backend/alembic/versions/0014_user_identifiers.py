@@ -0,0 +1,71 @@
+"""user_identifiers login lookup table
+
+Revision ID: 0014_user_identifiers
+Revises: 0013_otp_hashed_codes_index
+Create Date: 2026-10-18
+"""
+
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0014_user_identifiers"
+down_revision = "0013_otp_hashed_codes_index"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "user_identifiers",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id"), nullable=False),
+        sa.Column("kind", sa.String(length=16), nullable=False),
+        sa.Column("value", sa.String(length=255), nullable=False),
+    )
+    op.create_index("ix_user_identifiers_user_id", "user_identifiers", ["user_id"], unique=False)
+    op.create_index("ix_user_identifiers_value", "user_identifiers", ["value"], unique=True)
+
+    # Backfill from users. Keep the logic self-contained (migrations must not import app code).
+    # On cross-user collisions the oldest account keeps the identifier, matching the
+    # first-match behavior of the legacy OR query.
+    conn = op.get_bind()
+    users = sa.table(
+        "users",
+        sa.column("id", sa.Integer()),
+        sa.column("email", sa.String()),
+        sa.column("username", sa.String()),
+        sa.column("phone_normalized", sa.String()),
+    )
+    idents = sa.table(
+        "user_identifiers",
+        sa.column("user_id", sa.Integer()),
+        sa.column("kind", sa.String()),
+        sa.column("value", sa.String()),
+    )
+    seen: set[str] = set()
+    batch: list[dict] = []
+    rows = conn.execute(sa.select(users.c.id, users.c.email, users.c.username, users.c.phone_normalized).order_by(users.c.id))
+    for uid, email, username, phone_norm in rows:
+        for kind, value in (
+            ("email", (email or "").strip().lower()),
+            ("username", (username or "").strip()),
+            ("phone", (phone_norm or "").strip()),
+        ):
+            if not value or value in seen:
+                continue
+            seen.add(value)
+            batch.append({"user_id": int(uid), "kind": kind, "value": value})
+        if len(batch) >= 1000:
+            conn.execute(idents.insert(), batch)
+            batch = []
+    if batch:
+        conn.execute(idents.insert(), batch)
+
+
+def downgrade() -> None:
+    op.drop_index("ix_user_identifiers_value", table_name="user_identifiers")
+    op.drop_index("ix_user_identifiers_user_id", table_name="user_identifiers")
+    op.drop_table("user_identifiers")
@@ -0,0 +1,33 @@
+"""stored public media URLs + missing flags
+
+Revision ID: 0015_media_public_urls
+Revises: 0014_user_identifiers
+Create Date: 2026-10-18
+"""
+
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0015_media_public_urls"
+down_revision = "0014_user_identifiers"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Empty URLs are filled in by the app's media reconciler (it needs the uploads directory,
+    # which a migration cannot assume); until then serializers resolve the path live.
+    op.add_column("property_images", sa.Column("public_url", sa.String(length=512), nullable=False, server_default=""))
+    op.add_column("property_images", sa.Column("missing", sa.Boolean(), nullable=False, server_default=sa.text("false")))
+    op.add_column("users", sa.Column("profile_image_url", sa.String(length=512), nullable=False, server_default=""))
+    op.add_column("users", sa.Column("profile_image_missing", sa.Boolean(), nullable=False, server_default=sa.text("false")))
+
+
+def downgrade() -> None:
+    op.drop_column("users", "profile_image_missing")
+    op.drop_column("users", "profile_image_url")
+    op.drop_column("property_images", "missing")
+    op.drop_column("property_images", "public_url")
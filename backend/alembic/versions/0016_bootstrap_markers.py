@@ -0,0 +1,31 @@
+"""one-time bootstrap markers
+
+Revision ID: 0016_bootstrap_markers
+Revises: 0015_media_public_urls
+Create Date: 2026-10-18
+"""
+
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0016_bootstrap_markers"
+down_revision = "0015_media_public_urls"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Existing databases have no markers; the first bootstrap after upgrading finds the admin
+    # account / listings already present and only records the steps.
+    op.create_table(
+        "bootstrap_markers",
+        sa.Column("name", sa.String(length=80), primary_key=True),
+        sa.Column("applied_at", sa.DateTime(timezone=True), nullable=False),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("bootstrap_markers")
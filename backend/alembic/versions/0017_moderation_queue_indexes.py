@@ -0,0 +1,30 @@
+"""composite (status, id) indexes for the admin moderation queues
+
+Revision ID: 0017_moderation_queue_indexes
+Revises: 0016_bootstrap_markers
+Create Date: 2026-10-18
+"""
+
+from __future__ import annotations
+
+from alembic import op
+
+
+revision = "0017_moderation_queue_indexes"
+down_revision = "0016_bootstrap_markers"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Pending queues are read newest-first with `id < cursor`; (status, id) serves the filter,
+    # the order and the keyset bound from one index range, and the pending counts index-only.
+    op.create_index("ix_properties_status_id", "properties", ["status", "id"], unique=False)
+    op.create_index("ix_property_images_status_id", "property_images", ["status", "id"], unique=False)
+    op.create_index("ix_users_role_approval_status_id", "users", ["role", "approval_status", "id"], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index("ix_users_role_approval_status_id", table_name="users")
+    op.drop_index("ix_property_images_status_id", table_name="property_images")
+    op.drop_index("ix_properties_status_id", table_name="properties")
@@ -0,0 +1,63 @@
+"""moderation log rollover table + composite audit indexes
+
+Revision ID: 0018_moderation_log_archive
+Revises: 0017_moderation_queue_indexes
+Create Date: 2026-10-18
+"""
+
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0018_moderation_log_archive"
+down_revision = "0017_moderation_queue_indexes"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # (entity_type, entity_id, id) serves per-entity audit pages newest-first and makes the
+    # single-column entity_type index redundant; created_at drives the rollover scan.
+    op.create_index(
+        "ix_moderation_logs_entity_type_entity_id_id", "moderation_logs", ["entity_type", "entity_id", "id"], unique=False
+    )
+    op.create_index("ix_moderation_logs_created_at", "moderation_logs", ["created_at"], unique=False)
+    op.drop_index("ix_moderation_logs_entity_type", table_name="moderation_logs")
+
+    # Same columns and ids as moderation_logs; rows move here after MODERATION_LOG_HOT_DAYS
+    # (portable stand-in for time partitioning, SQLite included).
+    op.create_table(
+        "moderation_logs_archive",
+        sa.Column("id", sa.Integer(), primary_key=True, autoincrement=False),
+        sa.Column("actor_user_id", sa.Integer(), nullable=False),
+        sa.Column("entity_type", sa.String(length=40), nullable=False),
+        sa.Column("entity_id", sa.Integer(), nullable=False),
+        sa.Column("action", sa.String(length=40), nullable=False),
+        sa.Column("reason", sa.Text(), nullable=False, server_default=""),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False),
+    )
+    op.create_index(
+        "ix_moderation_logs_archive_entity_type_entity_id_id",
+        "moderation_logs_archive",
+        ["entity_type", "entity_id", "id"],
+        unique=False,
+    )
+    op.create_index("ix_moderation_logs_archive_created_at", "moderation_logs_archive", ["created_at"], unique=False)
+
+
+def downgrade() -> None:
+    # Archived rows go back to the live table (except those of since-deleted actors, which the
+    # live table's FK would reject).
+    op.execute(
+        "INSERT INTO moderation_logs (id, actor_user_id, entity_type, entity_id, action, reason, created_at) "
+        "SELECT id, actor_user_id, entity_type, entity_id, action, reason, created_at FROM moderation_logs_archive "
+        "WHERE actor_user_id IN (SELECT id FROM users)"
+    )
+    op.drop_index("ix_moderation_logs_archive_created_at", table_name="moderation_logs_archive")
+    op.drop_index("ix_moderation_logs_archive_entity_type_entity_id_id", table_name="moderation_logs_archive")
+    op.drop_table("moderation_logs_archive")
+    op.create_index("ix_moderation_logs_entity_type", "moderation_logs", ["entity_type"], unique=False)
+    op.drop_index("ix_moderation_logs_created_at", table_name="moderation_logs")
+    op.drop_index("ix_moderation_logs_entity_type_entity_id_id", table_name="moderation_logs")
@@ -0,0 +1,197 @@
+from __future__ import annotations
+
+import gzip
+import re
+import stat
+from typing import Any
+
+import anyio
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.staticfiles import StaticFiles
+
+from app.config import compression_brotli_quality, compression_gzip_level, compression_min_bytes
+
+try:  # optional: gzip only without it
+    import brotli  # type: ignore
+except Exception:  # pragma: no cover
+    brotli = None
+
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+_COMPRESSIBLE_TYPES = ("text/", "application/json", "application/javascript", "application/xml", "image/svg+xml")
+# Vite output names: index-Bi3Dz3c6.js, vendor.4f2a9c1e.css
+_HASHED_NAME = re.compile(r"[.-][A-Za-z0-9_-]{8,}\.[A-Za-z0-9]+$")
+
+
+def _accepted_encodings(accept_encoding: str) -> set[str]:
+    out: set[str] = set()
+    for part in (accept_encoding or "").lower().split(","):
+        token, _, params = part.strip().partition(";")
+        q = params.strip()
+        if q.startswith("q="):
+            try:
+                if float(q[2:]) <= 0:
+                    continue
+            except ValueError:
+                continue
+        if token:
+            out.add(token.strip())
+    return out
+
+
+def _negotiate(accept_encoding: str) -> str:
+    accepted = _accepted_encodings(accept_encoding)
+    if brotli is not None and "br" in accepted:
+        return "br"
+    if "gzip" in accepted:
+        return "gzip"
+    return ""
+
+
+def _is_compressible(content_type: str) -> bool:
+    ct = (content_type or "").lower()
+    return ct.startswith(_COMPRESSIBLE_TYPES) or "+json" in ct
+
+
+class CompressionMiddleware:
+    """
+    gzip/brotli for JSON/HTML responses above a size threshold.
+
+    The body is buffered until complete (BaseHTTPMiddleware re-chunks every response), so
+    Content-Length stays exact. Bodies beyond _MAX_BUFFER_BYTES, bodies that already carry a
+    Content-Encoding (precompressed static files) and partial (206 / Content-Range) responses
+    pass through untouched. A strong ETag on a compressed body is made weak.
+    """
+
+    _MAX_BUFFER_BYTES = 8 * 1024 * 1024
+
+    def __init__(self, app: Any, *, minimum_size: int | None = None) -> None:
+        self.app = app
+        self.minimum_size = compression_min_bytes() if minimum_size is None else int(minimum_size)
+        self.gzip_level = compression_gzip_level()
+        self.brotli_quality = compression_brotli_quality()
+
+    def _compress(self, body: bytes, encoding: str) -> bytes:
+        if encoding == "br":
+            return brotli.compress(body, quality=self.brotli_quality)
+        return gzip.compress(body, compresslevel=self.gzip_level)
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = _negotiate(Headers(scope=scope).get("accept-encoding", ""))
+        if not encoding:
+            await self.app(scope, receive, send)
+            return
+
+        start: dict[str, Any] | None = None
+        chunks: list[bytes] = []
+        size = 0
+        passthrough = False
+
+        async def flush_uncompressed(message) -> None:
+            nonlocal passthrough
+            passthrough = True
+            await send(start)
+            if chunks:
+                await send({"type": "http.response.body", "body": b"".join(chunks), "more_body": True})
+            await send(message)
+
+        async def send_wrapper(message) -> None:
+            nonlocal start, size, passthrough
+            if message["type"] == "http.response.start":
+                start = message
+                headers = MutableHeaders(raw=start["headers"])
+                if (
+                    not _is_compressible(headers.get("content-type", ""))
+                    or "content-encoding" in headers
+                    # Content-Range counts bytes of the identity body; compressing would break it.
+                    or start["status"] == 206
+                    or "content-range" in headers
+                ):
+                    passthrough = True
+                    await send(start)
+                return
+            if passthrough or message["type"] != "http.response.body":
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            if message.get("more_body", False):
+                chunks.append(body)
+                size += len(body)
+                if size > self._MAX_BUFFER_BYTES:
+                    await flush_uncompressed({"type": "http.response.body", "body": b"", "more_body": True})
+                return
+
+            body = b"".join(chunks) + body if chunks else body
+            headers = MutableHeaders(raw=start["headers"])
+            headers.add_vary_header("Accept-Encoding")
+            if (
+                len(body) >= self.minimum_size
+                and start["status"] not in (204, 304)
+                and "no-transform" not in headers.get("cache-control", "")
+            ):
+                body = self._compress(body, encoding)
+                headers["Content-Encoding"] = encoding
+                headers["Content-Length"] = str(len(body))
+                etag = headers.get("etag")
+                if etag and not etag.startswith("W/"):
+                    # Same entity, different bytes: a strong validator must not cover both.
+                    headers["ETag"] = "W/" + etag
+            await send(start)
+            await send({"type": "http.response.body", "body": body, "more_body": False})
+
+        await self.app(scope, receive, send_wrapper)
+
+
+class CachedStaticFiles(StaticFiles):
+    """
+    StaticFiles with a Cache-Control header and optional precompressed siblings.
+
+    With `precompressed=True`, a request for `app.js` from a client accepting br/gzip is
+    answered from `app.js.br` / `app.js.gz` when the build produced them. `hashed_only`
+    limits the Cache-Control header to content-hashed file names.
+    """
+
+    def __init__(
+        self,
+        *args: Any,
+        cache_control: str = IMMUTABLE_CACHE_CONTROL,
+        precompressed: bool = False,
+        hashed_only: bool = False,
+        **kwargs: Any,
+    ) -> None:
+        super().__init__(*args, **kwargs)
+        self.cache_control = cache_control
+        self.precompressed = precompressed
+        self.hashed_only = hashed_only
+
+    async def _precompressed_response(self, path: str, scope):
+        accepted = _accepted_encodings(Headers(scope=scope).get("accept-encoding", ""))
+        for encoding, ext in (("br", ".br"), ("gzip", ".gz")):
+            if encoding not in accepted:
+                continue
+            try:
+                full_path, stat_result = await anyio.to_thread.run_sync(self.lookup_path, path + ext)
+            except OSError:
+                continue
+            if stat_result and stat.S_ISREG(stat_result.st_mode):
+                resp = self.file_response(full_path, stat_result, scope)
+                # FileResponse guesses the type from the inner extension (app.js.br -> text/javascript).
+                resp.headers["Content-Encoding"] = encoding
+                return resp
+        return None
+
+    async def get_response(self, path: str, scope):
+        resp = None
+        if self.precompressed and scope["method"] in ("GET", "HEAD"):
+            resp = await self._precompressed_response(path, scope)
+        if resp is None:
+            resp = await super().get_response(path, scope)
+        if self.precompressed:
+            resp.headers.add_vary_header("Accept-Encoding")
+        if resp.status_code in (200, 206, 304) and (not self.hashed_only or _HASHED_NAME.search(path)):
+            resp.headers["Cache-Control"] = self.cache_control
+        return resp
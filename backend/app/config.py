@@ -24,16 +24,57 @@ def _load_dotenv_if_present() -> None:
 _load_dotenv_if_present()
 
 
+# Unset, empty or unparsable values fall back to the default.
+def _env_int(name: str, default: int) -> int:
+    raw = (os.environ.get(name) or "").strip()
+    try:
+        return int(raw) if raw else int(default)
+    except Exception:
+        return int(default)
+
+
+def _env_flag(name: str, default: bool) -> bool:
+    raw = (os.environ.get(name) or "").strip().lower()
+    if not raw:
+        return default
+    return raw in {"1", "true", "yes", "on"}
+
+
+def _env_float(name: str, default: float) -> float:
+    raw = (os.environ.get(name) or "").strip()
+    try:
+        return float(raw) if raw else float(default)
+    except Exception:
+        return float(default)
+
+
 def database_url() -> str:
     # Your GitHub secret should provide this in production/CI.
     # Fallback for local dev:
     url = os.environ.get("DATABASE_URL") or "sqlite:///./local.db"
+    return _normalize_db_url(url)
+
+
+def _normalize_db_url(url: str) -> str:
     # Some managed providers still supply `postgres://...` which SQLAlchemy treats as invalid.
     if url.startswith("postgres://"):
         url = url.replace("postgres://", "postgresql://", 1)
     return url
 
 
+def database_replica_urls() -> list[str]:
+    """
+    Read replicas for browse/listing traffic (comma-separated DATABASE_REPLICA_URLS).
+    Empty means every read goes to DATABASE_URL.
+    """
+    raw = os.environ.get("DATABASE_REPLICA_URLS") or ""
+    return [_normalize_db_url(u.strip()) for u in raw.split(",") if u.strip()]
+
+
+def uploads_dir() -> str:
+    return os.environ.get("UPLOADS_DIR") or os.path.join(os.path.dirname(__file__), "..", "uploads")
+
+
 def jwt_secret() -> str:
     return os.environ.get("JWT_SECRET") or "dev-secret-change-me"
 
@@ -60,6 +101,11 @@ def app_env() -> str:
     return "local" if is_local_dev() else "prod"
 
 
+def is_dev_env() -> bool:
+    """APP_ENV is local/dev: demo data and unauthenticated /metrics are allowed by default."""
+    return app_env() in {"local", "dev", "development"}
+
+
 def allowed_hosts() -> list[str]:
     """
     Comma-separated list for TrustedHost middleware.
@@ -97,17 +143,8 @@ def otp_exp_minutes() -> int:
     OTP expiry duration in minutes.
     Set via env `OTP_EXP_MINUTES` (Render).
     """
-    raw = (os.environ.get("OTP_EXP_MINUTES") or "").strip()
-    try:
-        v = int(raw or "10")
-    except Exception:
-        v = 10
     # Reasonable bounds to avoid foot-guns.
-    if v < 1:
-        v = 1
-    if v > 60:
-        v = 60
-    return v
+    return min(max(_env_int("OTP_EXP_MINUTES", 10), 1), 60)
 
 
 def brevo_api_key() -> str:
@@ -122,16 +159,17 @@ def brevo_sender_name() -> str:
     return (os.environ.get("BREVO_SENDER_NAME") or "Quickrent4u").strip()
 
 
+def brevo_api_url() -> str:
+    """Transactional email endpoint (overridable for staging proxies and load tests)."""
+    return (os.environ.get("BREVO_API_URL") or "https://api.brevo.com/v3/smtp/email").strip()
+
+
 def smtp_host() -> str:
     return (os.environ.get("SMTP_HOST") or "").strip()
 
 
 def smtp_port() -> int:
-    raw = (os.environ.get("SMTP_PORT") or "").strip()
-    try:
-        return int(raw or "587")
-    except Exception:
-        return 587
+    return _env_int("SMTP_PORT", 587)
 
 
 def smtp_user() -> str:
@@ -182,3 +220,301 @@ def google_oauth_client_ids() -> list[str]:
         return []
     return [x.strip() for x in raw.split(",") if x.strip()]
 
+
+def google_oauth_certs_url() -> str:
+    """
+    Google's ID-token signing certificates ({kid: PEM}). Override to point at a local fake
+    (scripts/fake_google_certs.py) for offline testing.
+    """
+    return (os.environ.get("GOOGLE_OAUTH_CERTS_URL") or "https://www.googleapis.com/oauth2/v1/certs").strip()
+
+
+
+# -----------------------
+# Password hashing (bcrypt)
+# -----------------------
+def bcrypt_rounds() -> int:
+    """
+    bcrypt cost factor for new password hashes.
+    Existing hashes with a different cost are transparently rehashed on login.
+    """
+    # bcrypt accepts 4..31; anything above 16 is far too slow for interactive logins.
+    return min(max(_env_int("BCRYPT_ROUNDS", 12), 4), 16)
+
+
+def password_hash_workers() -> int:
+    """
+    Max concurrent bcrypt operations (dedicated executor, separate from the request threadpool).
+    """
+    return max(1, _env_int("PASSWORD_HASH_WORKERS", min(4, os.cpu_count() or 1)))
+
+
+def password_hash_max_queue() -> int:
+    """
+    Max bcrypt operations waiting for a worker. Beyond this, requests fail fast with 503.
+    Login/signup handlers await the queue without a thread; a blocking caller holds one
+    threadpool thread per queued hash, so keep PASSWORD_HASH_WORKERS + this below the
+    request threadpool (anyio's 40 threads) for 503s to come before thread starvation.
+    """
+    return max(0, _env_int("PASSWORD_HASH_MAX_QUEUE", 32))
+
+
+# -----------------------
+# Rate limiting
+# -----------------------
+def rate_limit_backend() -> str:
+    """
+    Rate limiter storage:
+    - "memory" (default): per-process GCRA buckets (limits are per worker)
+    - "database": shared `rate_limit_buckets` table so limits hold across workers/instances
+    """
+    return (os.environ.get("RATE_LIMIT_BACKEND") or "memory").strip().lower()
+
+
+def rate_limit_db_pool_size() -> int:
+    """
+    Connections in the database rate limiter's own pool. Kept apart from the request pool so
+    a limiter check never waits on connections held by the requests it is throttling.
+    """
+    return max(1, _env_int("RATE_LIMIT_DB_POOL_SIZE", 2))
+
+
+def otp_backend() -> str:
+    """
+    OTP storage:
+    - "database" (default): `otp_codes` table (works across workers/instances)
+    - "memory": in-process TTL map (single-node deployments only)
+    """
+    return (os.environ.get("OTP_BACKEND") or "database").strip().lower()
+
+
+def otp_purge_interval_seconds() -> int:
+    """
+    How often expired OTP rows are purged in the background (0 disables).
+    """
+    return max(0, _env_int("OTP_PURGE_INTERVAL_SECONDS", 300))
+
+
+def otp_purge_batch_size() -> int:
+    return max(1, _env_int("OTP_PURGE_BATCH_SIZE", 1000))
+
+
+# -----------------------
+# Database engine / connection pool
+# -----------------------
+def db_pool_size() -> int:
+    """Persistent connections per worker process (size to the request threadpool)."""
+    return max(1, _env_int("DB_POOL_SIZE", 5))
+
+
+def db_max_overflow() -> int:
+    """Extra connections allowed above DB_POOL_SIZE under bursts."""
+    return max(0, _env_int("DB_MAX_OVERFLOW", 10))
+
+
+def db_pool_timeout_seconds() -> int:
+    """How long a request waits for a free connection before failing."""
+    return max(1, _env_int("DB_POOL_TIMEOUT", 30))
+
+
+def db_pool_recycle_seconds() -> int:
+    """Recycle connections older than this (-1 disables). Avoids provider idle disconnects."""
+    return _env_int("DB_POOL_RECYCLE", 1800)
+
+
+def db_pool_pre_ping() -> bool:
+    """
+    Ping connections on checkout (one extra round-trip per checkout). Safe default;
+    with DB_POOL_RECYCLE below the server idle timeout it can usually be disabled.
+    """
+    return _env_flag("DB_POOL_PRE_PING", True)
+
+
+def db_statement_timeout_ms() -> int:
+    """Postgres statement_timeout for app connections (0 disables)."""
+    return max(0, _env_int("DB_STATEMENT_TIMEOUT_MS", 0))
+
+
+def db_pgbouncer_mode() -> bool:
+    """
+    PgBouncer (transaction pooling) compatibility: no client-side pool (NullPool),
+    no prepared statements, no startup parameters.
+    """
+    return _env_flag("DB_PGBOUNCER", False)
+
+
+def db_sqlite_mmap_bytes() -> int:
+    """SQLite mmap_size pragma for local mode (0 disables)."""
+    return max(0, _env_int("DB_SQLITE_MMAP_BYTES", 256 * 1024 * 1024))
+
+
+def db_replica_sticky_seconds() -> int:
+    """
+    After a user's own write, that client's reads stay on the primary this long
+    (read-your-writes, carried in a cookie so every worker honours it). Should exceed
+    typical replica lag.
+    """
+    return max(0, _env_int("DB_REPLICA_STICKY_SECONDS", 15))
+
+
+def db_replica_retry_seconds() -> int:
+    """How long a replica that failed to connect is skipped before being retried."""
+    return max(1, _env_int("DB_REPLICA_RETRY_SECONDS", 30))
+
+
+def async_db_enabled() -> bool:
+    """
+    Run the async handlers (feed, nearby, contact, login) on AsyncSession via asyncpg /
+    aiosqlite instead of threadpool sessions.
+    """
+    return _env_flag("ASYNC_DB", False)
+
+
+def http_client_max_connections() -> int:
+    """Connection pool size of the shared outbound httpx.AsyncClient."""
+    return max(1, _env_int("HTTP_CLIENT_MAX_CONNECTIONS", 100))
+
+
+# -----------------------
+# Media URLs
+# -----------------------
+def media_reconcile_interval_seconds() -> int:
+    """
+    How often stored image URLs / missing flags are re-verified against the uploads
+    directory (0 disables; the first pass runs at startup).
+    """
+    return max(0, _env_int("MEDIA_RECONCILE_INTERVAL_SECONDS", 3600))
+
+
+def media_reconcile_batch_size() -> int:
+    return max(1, _env_int("MEDIA_RECONCILE_BATCH_SIZE", 500))
+
+
+# -----------------------
+# Response compression
+# -----------------------
+def compression_min_bytes() -> int:
+    """Responses smaller than this are sent uncompressed (not worth the CPU/framing)."""
+    return max(0, _env_int("COMPRESSION_MIN_BYTES", 1024))
+
+
+def compression_gzip_level() -> int:
+    return min(max(_env_int("COMPRESSION_GZIP_LEVEL", 6), 1), 9)
+
+
+def compression_brotli_quality() -> int:
+    """Brotli quality for dynamic responses (static assets are precompressed at 11)."""
+    return min(max(_env_int("COMPRESSION_BROTLI_QUALITY", 4), 0), 11)
+
+
+def property_batch_max_ids() -> int:
+    """Upper bound on ids per GET /properties/batch request."""
+    return max(1, _env_int("PROPERTY_BATCH_MAX_IDS", 50))
+
+
+def admin_bulk_max_ids() -> int:
+    """Upper bound on ids per admin bulk-moderate request."""
+    return max(1, _env_int("ADMIN_BULK_MAX_IDS", 500))
+
+
+# -----------------------
+# Bootstrap
+# -----------------------
+def bootstrap_on_startup() -> bool:
+    """Run pending one-time seeding at startup (otherwise: `python scripts/bootstrap.py`)."""
+    return _env_flag("BOOTSTRAP_ON_STARTUP", True)
+
+
+def seed_demo_data() -> bool:
+    """
+    Insert the demo owner and two demo listings when bootstrapping a database with no
+    properties. On by default only for local/dev (APP_ENV); elsewhere set SEED_DEMO_DATA=1.
+    """
+    return _env_flag("SEED_DEMO_DATA", is_dev_env())
+
+
+# -----------------------
+# Moderation log retention
+# -----------------------
+def moderation_log_hot_days() -> int:
+    """Rows older than this move from moderation_logs to moderation_logs_archive."""
+    return max(1, _env_int("MODERATION_LOG_HOT_DAYS", 90))
+
+
+def moderation_log_retention_days() -> int:
+    """Archived rows older than this are exported to gzip files and deleted (0 keeps them)."""
+    return max(0, _env_int("MODERATION_LOG_RETENTION_DAYS", 365))
+
+
+def moderation_log_export_dir() -> str:
+    return os.environ.get("MODERATION_LOG_EXPORT_DIR") or os.path.join(os.path.dirname(__file__), "..", "moderation_log_exports")
+
+
+# -----------------------
+# Routers
+# -----------------------
+def api_routers() -> list[str]:
+    """
+    Comma-separated app.routers modules to serve (auth, feed, owner, admin, media, billing).
+    Empty: all of them. Lets one subsystem run in its own worker pool behind a path router.
+    """
+    raw = (os.environ.get("API_ROUTERS") or "").strip()
+    return [r.strip().lower() for r in raw.split(",") if r.strip()]
+
+
+# -----------------------
+# Metrics
+# -----------------------
+def metrics_enabled() -> bool:
+    """
+    Serve /metrics and record per-route/per-request counters (cheap enough for prod).
+    Default: on for local/dev, elsewhere only when METRICS_TOKEN is set.
+    """
+    return _env_flag("METRICS_ENABLED", is_dev_env() or bool(metrics_token()))
+
+
+def metrics_token() -> str:
+    """
+    /metrics requires `Authorization: Bearer <METRICS_TOKEN>`. Outside local/dev it is refused
+    without a token, even when METRICS_ENABLED=1.
+    """
+    return (os.environ.get("METRICS_TOKEN") or "").strip()
+
+
+# -----------------------
+# Query profiling
+# -----------------------
+def query_profiler_enabled() -> bool:
+    """Per-request statement tracking (N+1 warnings, X-Query-Profile) and the slow-query log."""
+    return _env_flag("QUERY_PROFILER_ENABLED", True)
+
+
+def db_slow_query_ms() -> int:
+    """Statements slower than this are logged with their parameter-free SQL (0 disables)."""
+    return max(0, _env_int("DB_SLOW_QUERY_MS", 500))
+
+
+def db_n_plus_one_threshold() -> int:
+    """Warn when one statement shape runs this many times in a single request (0 disables)."""
+    return max(0, _env_int("DB_N_PLUS_ONE_THRESHOLD", 10))
+
+
+# -----------------------
+# Tracing
+# -----------------------
+def tracing_exporter() -> str:
+    """none (default) | console (stderr) | file (OTLP/JSON lines at TRACING_FILE)."""
+    return (os.environ.get("TRACING_EXPORTER") or "none").strip().lower()
+
+
+def tracing_file() -> str:
+    return (os.environ.get("TRACING_FILE") or "traces.jsonl").strip()
+
+
+def tracing_sample_ratio() -> float:
+    """Fraction of new traces recorded (incoming `traceparent` sampling flags are honoured)."""
+    return min(max(_env_float("TRACING_SAMPLE_RATIO", 1.0), 0.0), 1.0)
+
+
+def tracing_service_name() -> str:
+    return (os.environ.get("TRACING_SERVICE_NAME") or "quickrent4u-api").strip()
@@ -1,15 +1,398 @@
 from __future__ import annotations
 
-from contextlib import contextmanager
+import asyncio
+import contextvars
+import logging
+import time
+import zlib
+from contextlib import asynccontextmanager, contextmanager
+from threading import Lock
+from typing import Any, Callable
 
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event, func, select
+from sqlalchemy.engine import Engine
+from sqlalchemy.engine.url import make_url
+from sqlalchemy.exc import DBAPIError, TimeoutError as PoolTimeoutError
 from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool, QueuePool
+from starlette.concurrency import run_in_threadpool
 
-from app.config import database_url
+from app.config import (
+    async_db_enabled,
+    database_replica_urls,
+    database_url,
+    db_max_overflow,
+    db_pgbouncer_mode,
+    db_pool_pre_ping,
+    db_pool_recycle_seconds,
+    db_pool_size,
+    db_pool_timeout_seconds,
+    db_replica_retry_seconds,
+    db_replica_sticky_seconds,
+    db_sqlite_mmap_bytes,
+    db_statement_timeout_ms,
+)
 
+logger = logging.getLogger(__name__)
 
-ENGINE = create_engine(database_url(), pool_pre_ping=True, future=True)
-SessionLocal = sessionmaker(bind=ENGINE, class_=Session, expire_on_commit=False, autoflush=False, autocommit=False)
+
+class PoolStats:
+    """
+    Connection pool counters for one engine. Pool exhaustion shows up as checkout wait
+    time and timeouts here instead of only as request tail latency.
+    """
+
+    def __init__(self) -> None:
+        self._lock = Lock()
+        self.checkouts_total = 0
+        self.connects_total = 0
+        self.timeouts_total = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+
+    def record_wait(self, seconds: float) -> None:
+        with self._lock:
+            self.checkouts_total += 1
+            self.wait_seconds_total += seconds
+            if seconds > self.wait_seconds_max:
+                self.wait_seconds_max = seconds
+
+    def record_timeout(self) -> None:
+        with self._lock:
+            self.timeouts_total += 1
+
+    def record_connect(self) -> None:
+        with self._lock:
+            self.connects_total += 1
+
+    def snapshot(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "checkouts_total": self.checkouts_total,
+                "connects_total": self.connects_total,
+                "timeouts_total": self.timeouts_total,
+                "wait_seconds_total": round(self.wait_seconds_total, 6),
+                "wait_seconds_max": round(self.wait_seconds_max, 6),
+            }
+
+
+class _InstrumentedPoolMixin:
+    """Times how long each checkout waits for a connection."""
+
+    pool_stats: PoolStats
+
+    def recreate(self):  # type: ignore[override]
+        # dispose()/invalidation swaps in a fresh pool; keep counting into the same stats.
+        pool = super().recreate()
+        pool.pool_stats = self.pool_stats
+        return pool
+
+    def _do_get(self):  # type: ignore[override]
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        except PoolTimeoutError:
+            self.pool_stats.record_timeout()
+            raise
+        finally:
+            self.pool_stats.record_wait(time.perf_counter() - started)
+
+
+class InstrumentedQueuePool(_InstrumentedPoolMixin, QueuePool):
+    pass
+
+
+class InstrumentedAsyncQueuePool(_InstrumentedPoolMixin, AsyncAdaptedQueuePool):
+    pass
+
+
+def _sqlite_on_connect(mmap_bytes: int):
+    def _apply(dbapi_conn, _record) -> None:
+        cur = dbapi_conn.cursor()
+        try:
+            # WAL lets readers proceed during writes; NORMAL is durable in WAL mode except
+            # for the last transactions on power loss, which is fine for local/dev.
+            cur.execute("PRAGMA journal_mode=WAL")
+            cur.execute("PRAGMA synchronous=NORMAL")
+            cur.execute("PRAGMA busy_timeout=5000")
+            if mmap_bytes > 0:
+                cur.execute(f"PRAGMA mmap_size={int(mmap_bytes)}")
+        finally:
+            cur.close()
+
+    return _apply
+
+
+def engine_options(url: str, *, is_async: bool = False, pool_size: int | None = None) -> dict[str, Any]:
+    """
+    create_engine() keyword arguments for a database URL, driven by DB_* env settings.
+    `pool_size` gives a fixed-size pool (no overflow) instead of DB_POOL_SIZE/DB_MAX_OVERFLOW.
+    """
+    u = make_url(url)
+    backend = u.get_backend_name()
+    pool_class = InstrumentedAsyncQueuePool if is_async else InstrumentedQueuePool
+    opts: dict[str, Any] = {"future": True, "pool_pre_ping": db_pool_pre_ping()}
+    size, overflow = (db_pool_size(), db_max_overflow()) if pool_size is None else (pool_size, 0)
+    connect_args: dict[str, Any] = {}
+
+    if backend == "sqlite":
+        # Requests run in a threadpool; connections are handed between threads by the pool.
+        connect_args["check_same_thread"] = False
+        if (u.database or "") not in {"", ":memory:"}:
+            opts.update(poolclass=pool_class, pool_size=size, max_overflow=overflow)
+            opts["pool_timeout"] = db_pool_timeout_seconds()
+    elif backend == "postgresql" and db_pgbouncer_mode():
+        # PgBouncer owns pooling. Transaction pooling breaks server-side prepared
+        # statements and rejects unknown startup parameters (so no `options` here; set
+        # statement_timeout on the database role instead).
+        opts["poolclass"] = NullPool
+        opts["pool_pre_ping"] = False
+        driver = u.get_driver_name()
+        if driver == "asyncpg":
+            connect_args.update(statement_cache_size=0, prepared_statement_cache_size=0)
+        elif driver in {"psycopg", "psycopg3"}:
+            connect_args["prepare_threshold"] = None
+    else:
+        opts.update(
+            poolclass=pool_class,
+            pool_size=size,
+            max_overflow=overflow,
+            pool_timeout=db_pool_timeout_seconds(),
+            pool_recycle=db_pool_recycle_seconds(),
+        )
+        timeout_ms = db_statement_timeout_ms()
+        if backend == "postgresql" and timeout_ms > 0:
+            if u.get_driver_name() == "asyncpg":
+                connect_args["server_settings"] = {"statement_timeout": str(timeout_ms)}
+            else:
+                connect_args["options"] = f"-c statement_timeout={timeout_ms}"
+
+    if connect_args:
+        opts["connect_args"] = connect_args
+    return opts
+
+
+def _instrument(engine: Engine) -> None:
+    stats = PoolStats()
+    engine.pool_stats = stats  # type: ignore[attr-defined]
+    if isinstance(engine.pool, _InstrumentedPoolMixin):
+        engine.pool.pool_stats = stats
+    else:
+        # NullPool etc.: every checkout is a new connection; still count them.
+        event.listen(engine, "checkout", lambda *_a: stats.record_wait(0.0))
+    event.listen(engine, "connect", lambda *_a: stats.record_connect())
+    if engine.dialect.name == "sqlite":
+        event.listen(engine, "connect", _sqlite_on_connect(db_sqlite_mmap_bytes()))
+
+
+def build_engine(url: str, *, pool_size: int | None = None) -> Engine:
+    engine = create_engine(url, **engine_options(url, pool_size=pool_size))
+    _instrument(engine)
+    return engine
+
+
+def async_database_url(url: str) -> str:
+    """Same database, asyncio driver (asyncpg for Postgres, aiosqlite for SQLite)."""
+    u = make_url(url)
+    backend = u.get_backend_name()
+    if backend == "postgresql" and u.get_driver_name() != "asyncpg":
+        u = u.set(drivername="postgresql+asyncpg")
+    elif backend == "sqlite" and u.get_driver_name() != "aiosqlite":
+        u = u.set(drivername="sqlite+aiosqlite")
+    return u.render_as_string(hide_password=False)
+
+
+def build_async_engine(url: str):
+    from sqlalchemy.ext.asyncio import create_async_engine
+
+    aurl = async_database_url(url)
+    engine = create_async_engine(aurl, **engine_options(aurl, is_async=True))
+    _instrument(engine.sync_engine)
+    return engine
+
+
+def engine_pool_stats(engine: Engine) -> dict[str, Any]:
+    pool = engine.pool
+    out: dict[str, Any] = {"pool": type(pool).__name__}
+    if isinstance(pool, QueuePool):
+        out.update(size=pool.size(), checked_out=pool.checkedout(), overflow=pool.overflow(), idle=pool.checkedin())
+    stats = getattr(engine, "pool_stats", None)
+    if stats is not None:
+        out.update(stats.snapshot())
+    return out
+
+
+class AppSession(Session):
+    """Session class for both sync sessions and AsyncSession.sync_session (shared event hooks)."""
+
+
+ENGINE = build_engine(database_url())
+SessionLocal = sessionmaker(bind=ENGINE, class_=AppSession, expire_on_commit=False, autoflush=False, autocommit=False)
+
+
+class ReadRouter:
+    """
+    Picks the engine for read-only sessions: replicas round-robin, the primary when there
+    are none, when all are down, or when the client wrote recently (read-your-writes).
+
+    Stickiness travels with the client (READ_PRIMARY_COOKIE, see ReadYourWritesMiddleware),
+    so it holds whichever worker serves the next request. DB_REPLICA_STICKY_SECONDS should
+    cover replica lag.
+    """
+
+    def __init__(self, primary: Engine, replicas: list[Engine], *, sticky_seconds: int, retry_seconds: int) -> None:
+        self.primary = primary
+        self.replicas = list(replicas)
+        self.sticky_seconds = int(sticky_seconds)
+        self.retry_seconds = int(retry_seconds)
+        self._lock = Lock()
+        self._next = 0
+        self._down_until: dict[int, float] = {}
+        self._reads_primary = 0
+        self._reads_replica = 0
+        self._sticky_reads = 0
+        self._fallbacks = 0
+
+    @property
+    def sticky(self) -> bool:
+        return bool(self.replicas) and self.sticky_seconds > 0
+
+    def candidates(self, *, primary: bool = False) -> list[Engine]:
+        """Engines to try in order; always ends with the primary. `primary`: sticky client."""
+        if not self.replicas:
+            return [self.primary]
+        now = time.monotonic()
+        with self._lock:
+            if primary:
+                self._sticky_reads += 1
+                return [self.primary]
+            start = self._next
+            self._next = (self._next + 1) % len(self.replicas)
+            order = self.replicas[start:] + self.replicas[:start]
+            live = [e for e in order if self._down_until.get(id(e), 0.0) <= now]
+        return live + [self.primary]
+
+    def mark_down(self, engine: Engine) -> None:
+        with self._lock:
+            self._down_until[id(engine)] = time.monotonic() + self.retry_seconds
+            self._fallbacks += 1
+
+    def record_read(self, engine: Engine) -> None:
+        with self._lock:
+            if engine is self.primary:
+                self._reads_primary += 1
+            else:
+                self._reads_replica += 1
+
+    def stats(self) -> dict[str, Any]:
+        now = time.monotonic()
+        with self._lock:
+            return {
+                "replicas": len(self.replicas),
+                "replicas_down": sum(1 for e in self.replicas if self._down_until.get(id(e), 0.0) > now),
+                "reads_primary_total": self._reads_primary,
+                "reads_replica_total": self._reads_replica,
+                "sticky_reads_total": self._sticky_reads,
+                "replica_fallbacks_total": self._fallbacks,
+                "replica_pools": [engine_pool_stats(e) for e in self.replicas],
+            }
+
+
+read_router = ReadRouter(
+    ENGINE,
+    [build_engine(u) for u in database_replica_urls()],
+    sticky_seconds=db_replica_sticky_seconds(),
+    retry_seconds=db_replica_retry_seconds(),
+)
+
+
+@event.listens_for(AppSession, "after_flush")
+def _note_write(session: Session, _flush_context) -> None:
+    session.info["wrote"] = True
+
+
+# Read-your-writes across workers: a response to a request that committed a signed-in user's
+# write sets this cookie (unix time until which the client's reads go to the primary).
+READ_PRIMARY_COOKIE = "read_primary_until"
+
+
+class _RequestWrites:
+    __slots__ = ("until",)
+
+    def __init__(self) -> None:
+        self.until = 0.0
+
+
+# Set per request by ReadYourWritesMiddleware; threadpool and greenlet hops share the object.
+_request_writes: contextvars.ContextVar[_RequestWrites | None] = contextvars.ContextVar("request_writes", default=None)
+
+
+@event.listens_for(AppSession, "after_commit")
+def _note_committed_write(session: Session) -> None:
+    # `user_id` is set by the auth dependency on the request's primary session.
+    if session.info.pop("wrote", False) and session.info.get("user_id"):
+        writes = _request_writes.get()
+        if writes is not None and read_router.sticky:
+            writes.until = time.time() + read_router.sticky_seconds
+
+
+def reads_from_primary(read_primary_until: str | None) -> bool:
+    """Whether a client's READ_PRIMARY_COOKIE value still pins its reads to the primary."""
+    if not read_primary_until or not read_router.sticky:
+        return False
+    try:
+        until = float(read_primary_until)
+    except ValueError:
+        return False
+    now = time.time()
+    # Bounded, so a hand-made cookie can't pin a client past one sticky window.
+    return now < until <= now + read_router.sticky_seconds
+
+
+class ReadYourWritesMiddleware:
+    """Sets READ_PRIMARY_COOKIE on responses to requests that committed a signed-in user's write."""
+
+    def __init__(self, app: Any) -> None:
+        self.app = app
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        writes = _RequestWrites()
+        token = _request_writes.set(writes)
+
+        async def send_wrapper(message) -> None:
+            # Request-scoped sessions commit when their dependency exits, before the response starts.
+            if message["type"] == "http.response.start" and writes.until:
+                cookie = (
+                    f"{READ_PRIMARY_COOKIE}={writes.until:.3f}; Max-Age={read_router.sticky_seconds}; "
+                    "Path=/; HttpOnly; SameSite=Lax"
+                )
+                message = {**message, "headers": list(message.get("headers") or []) + [(b"set-cookie", cookie.encode())]}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _request_writes.reset(token)
+
+
+@event.listens_for(AppSession, "after_rollback")
+def _forget_write(session: Session) -> None:
+    session.info.pop("wrote", None)
+
+
+def pool_stats() -> dict[str, Any]:
+    return engine_pool_stats(ENGINE)
+
+
+def read_routing_stats() -> dict[str, Any]:
+    return read_router.stats()
+
+
+def is_replica_session(db: Session) -> bool:
+    return bool(db.info.get("replica"))
 
 
 @contextmanager
@@ -24,3 +407,235 @@ def session_scope():
     finally:
         db.close()
 
+
+@contextmanager
+def job_lock(name: str):
+    """
+    Yield True when this process should run the periodic job `name` now. On PostgreSQL a
+    transaction-level advisory lock (safe behind PgBouncer transaction pooling) is held on a
+    dedicated connection for the duration, so one worker across all hosts runs the job and
+    the others skip it. Other backends are single-host: always True.
+    """
+    if ENGINE.dialect.name != "postgresql":
+        yield True
+        return
+    key = zlib.crc32(name.encode())
+    with ENGINE.connect() as conn, conn.begin():
+        yield bool(conn.execute(select(func.pg_try_advisory_xact_lock(key))).scalar())
+
+
+def _open_read_session(primary: bool) -> Session:
+    for engine in read_router.candidates(primary=primary):
+        db = SessionLocal(bind=engine)
+        if engine is read_router.primary:
+            read_router.record_read(engine)
+            return db
+        db.info["replica"] = True
+        try:
+            # Connect eagerly so an unreachable replica falls back here, not mid-query.
+            db.connection()
+        except DBAPIError:
+            db.close()
+            read_router.mark_down(engine)
+            logger.warning("read replica %s unavailable; falling back", engine.url.render_as_string(hide_password=True), exc_info=True)
+            continue
+        read_router.record_read(engine)
+        return db
+    raise RuntimeError("no database engine available")  # unreachable: primary is always last
+
+
+@contextmanager
+def read_session_scope(*, primary: bool = False):
+    """
+    Session for read-only work. Routed to a replica when configured (`primary`: the client
+    wrote recently; see ReadRouter). Anything that writes must use session_scope() instead.
+    """
+    db = _open_read_session(primary)
+    try:
+        yield db
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+# -----------------------
+# Async request path (ASYNC_DB=1)
+# -----------------------
+_async_engines: dict[int, Any] = {}
+_async_engines_lock = Lock()
+_async_sessionmaker: Any = None
+_threadpool_session_slots: tuple[Any, asyncio.Semaphore] | None = None
+
+
+def async_engine_for(engine: Engine):
+    """The asyncio twin of a sync engine (same URL and pool settings), created on first use."""
+    key = id(engine)
+    aengine = _async_engines.get(key)
+    if aengine is None:
+        with _async_engines_lock:
+            aengine = _async_engines.get(key)
+            if aengine is None:
+                aengine = build_async_engine(engine.url.render_as_string(hide_password=False))
+                _async_engines[key] = aengine
+    return aengine
+
+
+def _async_session(engine: Engine):
+    global _async_sessionmaker
+    if _async_sessionmaker is None:
+        from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+        _async_sessionmaker = async_sessionmaker(
+            class_=AsyncSession, sync_session_class=AppSession, expire_on_commit=False, autoflush=False
+        )
+    return _async_sessionmaker(bind=async_engine_for(engine))
+
+
+async def dispose_async_engines() -> None:
+    for aengine in list(_async_engines.values()):
+        await aengine.dispose()
+
+
+def _session_slots() -> asyncio.Semaphore:
+    # Threadpool mode: a session keeps its connection across several thread hops. Without a
+    # cap, more sessions than pooled connections can start, and threads then block in pool
+    # checkout while the sessions holding connections wait for a free thread.
+    global _threadpool_session_slots
+    loop = asyncio.get_running_loop()
+    if _threadpool_session_slots is None or _threadpool_session_slots[0] is not loop:
+        _threadpool_session_slots = (loop, asyncio.Semaphore(db_pool_size() + db_max_overflow()))
+    return _threadpool_session_slots[1]
+
+
+class SessionRunner:
+    """
+    Runs sync ORM code (`fn(session, *args)`) for an `async def` handler.
+
+    With ASYNC_DB=1 the session is an AsyncSession and `fn` runs via run_sync(): queries go
+    through asyncpg/aiosqlite on the event loop, so no thread is held while waiting on the
+    database or on outbound calls between DB steps. Otherwise a regular Session is used from
+    the threadpool, which is what a sync `def` handler does today.
+
+    The session is opened on first use, so handlers that fail validation never check out a
+    connection.
+    """
+
+    def __init__(self, *, read: bool, user_id: int | None = None, primary: bool = False) -> None:
+        self.read = bool(read)
+        self.user_id = user_id
+        self.primary = bool(primary)
+        self.is_async = async_db_enabled()
+        self._session: Any = None
+        self._slot: asyncio.Semaphore | None = None
+
+    @property
+    def is_replica(self) -> bool:
+        return self._session is not None and bool(self._session.info.get("replica"))
+
+    async def _open(self):
+        if self._session is not None:
+            return self._session
+        if not self.is_async:
+            if self.read:
+                self._session = await run_in_threadpool(_open_read_session, self.primary)
+            else:
+                self._session = SessionLocal()
+        elif self.read:
+            self._session = await self._open_async_read()
+        else:
+            self._session = _async_session(ENGINE)
+        if not self.read and self.user_id:
+            self._session.info["user_id"] = int(self.user_id)
+        return self._session
+
+    async def _open_async_read(self):
+        for engine in read_router.candidates(primary=self.primary):
+            db = _async_session(engine)
+            if engine is read_router.primary:
+                read_router.record_read(engine)
+                return db
+            db.info["replica"] = True
+            try:
+                await db.connection()
+            except DBAPIError:
+                await db.close()
+                read_router.mark_down(engine)
+                logger.warning("read replica %s unavailable; falling back", engine.url.render_as_string(hide_password=True), exc_info=True)
+                continue
+            read_router.record_read(engine)
+            return db
+        raise RuntimeError("no database engine available")  # unreachable: primary is always last
+
+    async def _acquire_slot(self) -> None:
+        if self._slot is None:
+            slot = _session_slots()
+            await slot.acquire()
+            self._slot = slot
+
+    def _release_slot(self) -> None:
+        slot, self._slot = self._slot, None
+        if slot is not None:
+            slot.release()
+
+    async def run(self, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        if self.is_async:
+            db = await self._open()
+            return await db.run_sync(fn, *args, **kwargs)
+        # Held from the first query until commit/rollback, i.e. while a connection may be held.
+        await self._acquire_slot()
+        db = await self._open()
+        return await run_in_threadpool(fn, db, *args, **kwargs)
+
+    async def commit(self) -> None:
+        """
+        Commit now and release the connection (the session stays usable). Use before slow
+        outbound calls so they don't pin a pooled connection.
+        """
+        if self._session is None:
+            return
+        if self.is_async:
+            await self._session.commit()
+            return
+        try:
+            await run_in_threadpool(self._session.commit)
+        finally:
+            self._release_slot()
+
+    async def rollback(self) -> None:
+        if self._session is None:
+            return
+        if self.is_async:
+            await self._session.rollback()
+            return
+        try:
+            await run_in_threadpool(self._session.rollback)
+        finally:
+            self._release_slot()
+
+    async def close(self) -> None:
+        db, self._session = self._session, None
+        try:
+            if db is None:
+                return
+            if self.is_async:
+                await db.close()
+            else:
+                await run_in_threadpool(db.close)
+        finally:
+            self._release_slot()
+
+
+@asynccontextmanager
+async def session_runner(*, read: bool = False, user_id: int | None = None, primary: bool = False):
+    runner = SessionRunner(read=read, user_id=user_id, primary=primary)
+    try:
+        yield runner
+        await runner.commit()
+    except BaseException:
+        await runner.rollback()
+        raise
+    finally:
+        await runner.close()
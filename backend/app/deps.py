@@ -0,0 +1,178 @@
+from __future__ import annotations
+
+from typing import Annotated
+
+from fastapi import Cookie, Depends, Header, HTTPException
+from sqlalchemy.orm import Session
+
+from app.db import (
+    READ_PRIMARY_COOKIE,
+    SessionRunner,
+    is_replica_session,
+    read_session_scope,
+    reads_from_primary,
+    session_runner,
+    session_scope,
+)
+from app.models import User
+from app.security import decode_access_token
+
+
+def get_db():
+    """
+    The request's session. Dependency results are cached per request, so every router's user
+    dependency (get_current_user, ...) and the handler share one session and one connection.
+    """
+    with session_scope() as db:
+        yield db
+
+
+def _bearer_token(authorization: str | None) -> str | None:
+    if not authorization:
+        return None
+    if not authorization.lower().startswith("bearer "):
+        return None
+    return authorization.split(" ", 1)[1].strip() or None
+
+
+def _token_user_id(authorization: str | None) -> int | None:
+    token = _bearer_token(authorization)
+    if not token:
+        return None
+    try:
+        payload = decode_access_token(token)
+        return int(payload.get("sub") or 0) or None
+    except Exception:
+        return None
+
+
+def get_read_db(read_primary_until: Annotated[str | None, Cookie(alias=READ_PRIMARY_COOKIE)] = None):
+    """
+    Read-only session, routed to a replica when DATABASE_REPLICA_URLS is set. Clients that
+    just wrote something (READ_PRIMARY_COOKIE) are kept on the primary so they see their
+    own changes.
+    """
+    with read_session_scope(primary=reads_from_primary(read_primary_until)) as db:
+        yield db
+
+
+def get_current_user(
+    db: Annotated[Session, Depends(get_db)],
+    authorization: Annotated[str | None, Header()] = None,
+) -> User:
+    token = _bearer_token(authorization)
+    if not token:
+        raise HTTPException(status_code=401, detail="Not authenticated")
+    try:
+        payload = decode_access_token(token)
+        user_id = int(payload.get("sub") or 0)
+    except Exception:
+        raise HTTPException(status_code=401, detail="Invalid token")
+
+    user = db.get(User, user_id)
+    if not user:
+        raise HTTPException(status_code=401, detail="User not found")
+    # Commits on this session make the user's next reads sticky to the primary.
+    db.info["user_id"] = user.id
+    return user
+
+
+def get_optional_user(
+    db: Annotated[Session, Depends(get_db)],
+    authorization: Annotated[str | None, Header()] = None,
+) -> User | None:
+    token = _bearer_token(authorization)
+    if not token:
+        return None
+    try:
+        payload = decode_access_token(token)
+        user_id = int(payload.get("sub") or 0)
+    except Exception:
+        return None
+    if not user_id:
+        return None
+    user = db.get(User, user_id)
+    if user:
+        db.info["user_id"] = user.id
+    return user
+
+
+def _read_user(db: Session, user_id: int) -> User | None:
+    user = db.get(User, int(user_id))
+    if user is None and is_replica_session(db):
+        # Account created moments ago may not have replicated yet.
+        with session_scope() as primary:
+            user = primary.get(User, int(user_id))
+    return user
+
+
+def get_current_read_user(
+    db: Annotated[Session, Depends(get_read_db)],
+    authorization: Annotated[str | None, Header()] = None,
+) -> User:
+    """Like get_current_user, but loaded through the read session (treat as read-only)."""
+    token = _bearer_token(authorization)
+    if not token:
+        raise HTTPException(status_code=401, detail="Not authenticated")
+    user_id = _token_user_id(authorization)
+    if not user_id:
+        raise HTTPException(status_code=401, detail="Invalid token")
+    user = _read_user(db, user_id)
+    if not user:
+        raise HTTPException(status_code=401, detail="User not found")
+    return user
+
+
+def get_optional_read_user(
+    db: Annotated[Session, Depends(get_read_db)],
+    authorization: Annotated[str | None, Header()] = None,
+) -> User | None:
+    user_id = _token_user_id(authorization)
+    if not user_id:
+        return None
+    return _read_user(db, user_id)
+
+
+# Async handlers take a SessionRunner instead of a Session: `await db.run(fn, ...)` runs
+# sync ORM code on an AsyncSession (ASYNC_DB=1) or in the threadpool otherwise.
+async def get_db_runner(authorization: Annotated[str | None, Header()] = None):
+    async with session_runner(user_id=_token_user_id(authorization)) as runner:
+        yield runner
+
+
+async def get_read_db_runner(
+    authorization: Annotated[str | None, Header()] = None,
+    read_primary_until: Annotated[str | None, Cookie(alias=READ_PRIMARY_COOKIE)] = None,
+):
+    primary = reads_from_primary(read_primary_until)
+    async with session_runner(read=True, user_id=_token_user_id(authorization), primary=primary) as runner:
+        yield runner
+
+
+def _get_user(db: Session, user_id: int) -> User | None:
+    return db.get(User, int(user_id))
+
+
+async def get_current_user_async(
+    db: Annotated[SessionRunner, Depends(get_db_runner)],
+    authorization: Annotated[str | None, Header()] = None,
+) -> User:
+    if not _bearer_token(authorization):
+        raise HTTPException(status_code=401, detail="Not authenticated")
+    if not db.user_id:
+        raise HTTPException(status_code=401, detail="Invalid token")
+    user = await db.run(_get_user, db.user_id)
+    if not user:
+        raise HTTPException(status_code=401, detail="User not found")
+    return user
+
+
+async def get_optional_read_user_async(db: Annotated[SessionRunner, Depends(get_read_db_runner)]) -> User | None:
+    if not db.user_id:
+        return None
+    user = await db.run(_get_user, db.user_id)
+    if user is None and db.is_replica:
+        # Account created moments ago may not have replicated yet.
+        async with session_runner() as primary:
+            user = await primary.run(_get_user, db.user_id)
+    return user
@@ -0,0 +1,138 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import re
+import time
+from typing import Any
+
+from app.config import google_oauth_certs_url
+
+logger = logging.getLogger(__name__)
+
+GOOGLE_ISSUERS = {"accounts.google.com", "https://accounts.google.com"}
+
+# Google currently serves max-age of several hours; clamp to sane bounds either way.
+_MIN_TTL_SECONDS = 60
+_MAX_TTL_SECONDS = 24 * 3600
+_DEFAULT_TTL_SECONDS = 3600
+# An unknown `kid` forces a refetch (key rotation), but at most this often.
+_FORCED_REFRESH_COOLDOWN_SECONDS = 30
+
+
+class GoogleTokenError(ValueError):
+    """ID token is malformed, expired, badly signed or not issued by Google."""
+
+
+def _max_age(cache_control: str | None) -> int | None:
+    m = re.search(r"max-age=(\d+)", cache_control or "")
+    return int(m.group(1)) if m else None
+
+
+class GoogleIdTokenVerifier:
+    """
+    Verifies Google ID tokens locally against cached signing certificates.
+
+    Certificates are fetched through the shared pooled HTTP client and kept for the response's
+    Cache-Control max-age, so the common case is signature verification only (pure CPU).
+    Concurrent refreshes are coalesced; a stale set is kept if a refresh fails.
+    """
+
+    def __init__(self, *, certs_url: str | None = None, clock_skew_seconds: int = 0) -> None:
+        self._certs_url = certs_url
+        self.clock_skew_seconds = int(clock_skew_seconds)
+        self._certs: dict[str, str] = {}
+        self._expires_at = 0.0
+        self._last_fetch = 0.0
+        self._lock: asyncio.Lock | None = None
+        self._lock_loop: Any = None
+        self.fetches_total = 0
+        self.fetch_errors_total = 0
+        self.verified_total = 0
+        self.rejected_total = 0
+
+    @property
+    def certs_url(self) -> str:
+        return self._certs_url or google_oauth_certs_url()
+
+    async def _fetch(self) -> None:
+        from app.http_client import async_http_client
+
+        resp = await async_http_client().get(self.certs_url, timeout=10)
+        resp.raise_for_status()
+        certs = resp.json()
+        if not isinstance(certs, dict) or not certs:
+            raise GoogleTokenError("Unexpected certificate response")
+        ttl = _max_age(resp.headers.get("cache-control"))
+        ttl = _DEFAULT_TTL_SECONDS if ttl is None else min(max(ttl, _MIN_TTL_SECONDS), _MAX_TTL_SECONDS)
+        now = time.monotonic()
+        self._certs = {str(k): str(v) for k, v in certs.items()}
+        self._expires_at = now + ttl
+        self._last_fetch = now
+        self.fetches_total += 1
+
+    async def certs(self, *, force: bool = False) -> dict[str, str]:
+        now = time.monotonic()
+        if self._certs and now < self._expires_at and not force:
+            return self._certs
+        if force and self._certs and now - self._last_fetch < _FORCED_REFRESH_COOLDOWN_SECONDS:
+            return self._certs
+        loop = asyncio.get_running_loop()
+        if self._lock is None or self._lock_loop is not loop:
+            self._lock, self._lock_loop = asyncio.Lock(), loop
+        async with self._lock:
+            # Another request may have refreshed while we waited.
+            if self._last_fetch > now:
+                return self._certs
+            try:
+                await self._fetch()
+            except Exception:
+                self.fetch_errors_total += 1
+                if not self._certs:
+                    raise
+                logger.warning("Google certificate refresh failed; using cached keys", exc_info=True)
+        return self._certs
+
+    def _decode(self, token: str, certs: dict[str, str]) -> dict[str, Any]:
+        from google.auth import jwt as google_jwt
+
+        return google_jwt.decode(token, certs=certs, audience=None, clock_skew_in_seconds=self.clock_skew_seconds)
+
+    async def verify(self, token: str) -> dict[str, Any]:
+        """
+        Signature, expiry and issuer are checked here; callers enforce the audience.
+        """
+        import jwt as pyjwt
+
+        try:
+            kid = str(pyjwt.get_unverified_header(token).get("kid") or "")
+        except Exception as e:
+            self.rejected_total += 1
+            raise GoogleTokenError("Malformed token") from e
+
+        certs = await self.certs()
+        if kid and kid not in certs:
+            certs = await self.certs(force=True)
+        try:
+            info = self._decode(token, certs)
+        except Exception as e:
+            self.rejected_total += 1
+            raise GoogleTokenError(str(e) or "Invalid token") from e
+        if info.get("iss") not in GOOGLE_ISSUERS:
+            self.rejected_total += 1
+            raise GoogleTokenError("Wrong issuer")
+        self.verified_total += 1
+        return info
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "keys": len(self._certs),
+            "expires_in_seconds": max(0, round(self._expires_at - time.monotonic())) if self._certs else 0,
+            "fetches_total": self.fetches_total,
+            "fetch_errors_total": self.fetch_errors_total,
+            "verified_total": self.verified_total,
+            "rejected_total": self.rejected_total,
+        }
+
+
+google_id_token_verifier = GoogleIdTokenVerifier()
@@ -4,6 +4,8 @@ from functools import lru_cache
 from typing import Any
 
 from app.config import google_play_package_name, google_play_service_account_file
+from app.metrics import observe_outbound
+from app.tracing import traced
 
 
 class GooglePlayNotConfigured(RuntimeError):
@@ -36,6 +38,7 @@ def _publisher_client():
     return build("androidpublisher", "v3", credentials=creds, cache_discovery=False)
 
 
+@traced("google_play.verify_subscription", kind="CLIENT")
 def verify_subscription_with_google_play(*, purchase_token: str, product_id: str) -> dict[str, Any]:
     """
     Calls Google Play Developer API to verify a subscription purchase token.
@@ -45,15 +48,16 @@ def verify_subscription_with_google_play(*, purchase_token: str, product_id: str
         raise GooglePlayNotConfigured("GOOGLE_PLAY_PACKAGE_NAME not configured")
 
     client = _publisher_client()
-    result = (
-        client.purchases()
-        .subscriptions()
-        .get(
-            packageName=pkg,
-            subscriptionId=product_id,
-            token=purchase_token,
+    with observe_outbound("google_play"):
+        result = (
+            client.purchases()
+            .subscriptions()
+            .get(
+                packageName=pkg,
+                subscriptionId=product_id,
+                token=purchase_token,
+            )
+            .execute()
         )
-        .execute()
-    )
     return dict(result or {})
 
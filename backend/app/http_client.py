@@ -0,0 +1,38 @@
+from __future__ import annotations
+
+import threading
+from typing import TYPE_CHECKING
+
+from app.config import http_client_max_connections
+
+if TYPE_CHECKING:
+    import httpx
+
+_client: httpx.AsyncClient | None = None
+_client_lock = threading.Lock()
+
+
+def async_http_client() -> httpx.AsyncClient:
+    """
+    Process-wide httpx.AsyncClient for outbound API calls (keep-alive connection reuse).
+    Per-call timeouts are passed by callers.
+    """
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                import httpx  # first outbound call; keeps httpx off the import path
+
+                n = http_client_max_connections()
+                _client = httpx.AsyncClient(
+                    limits=httpx.Limits(max_connections=n, max_keepalive_connections=n),
+                    timeout=httpx.Timeout(15.0),
+                )
+    return _client
+
+
+async def aclose_http_client() -> None:
+    global _client
+    client, _client = _client, None
+    if client is not None:
+        await client.aclose()
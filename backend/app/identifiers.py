@@ -0,0 +1,107 @@
+from __future__ import annotations
+
+import re
+
+from sqlalchemy import case, delete, select
+from sqlalchemy.orm import Session
+
+from app.models import User, UserIdentifier
+
+
+# Resolution priority when one input matches different users' identifiers.
+_KIND_PRIORITY = {"email": 0, "username": 1, "phone": 2}
+
+
+def norm_phone(s: str) -> str:
+    s = (s or "").strip()
+    if not s:
+        return ""
+    # Keep digits; preserve a leading '+' if present.
+    plus = s.startswith("+")
+    digits = re.sub(r"[^0-9]", "", s)
+    if not digits:
+        return ""
+    return f"+{digits}" if plus else digits
+
+
+def user_identifier_keys(*, email: str, username: str, phone_normalized: str) -> list[tuple[str, str]]:
+    """
+    Normalized (kind, value) pairs a user can log in with. Values are unique per user
+    (e.g. phone-registered users have username == phone).
+    """
+    out: list[tuple[str, str]] = []
+    seen: set[str] = set()
+    for kind, value in (
+        ("email", (email or "").strip().lower()),
+        ("username", (username or "").strip()),
+        ("phone", (phone_normalized or "").strip()),
+    ):
+        if value and value not in seen:
+            seen.add(value)
+            out.append((kind, value))
+    return out
+
+
+def lookup_keys(identifier: str) -> list[str]:
+    """
+    Candidate normalized values for a login input. Mirrors the legacy
+    email / username / phone / phone_normalized OR-match.
+    """
+    raw = (identifier or "").strip()
+    keys: list[str] = []
+    for v in (raw.lower() if "@" in raw else "", raw, norm_phone(raw)):
+        if v and v not in keys:
+            keys.append(v)
+    return keys
+
+
+def sync_user_identifiers(db: Session, user: User) -> None:
+    """
+    Bring `user_identifiers` in line with the user's current email/username/phone.
+    The user must already have an id (flush first). A value owned by another user
+    raises IntegrityError on flush.
+    """
+    desired = dict(
+        (value, kind)
+        for kind, value in user_identifier_keys(
+            email=user.email, username=user.username, phone_normalized=user.phone_normalized
+        )
+    )
+    existing = db.execute(select(UserIdentifier).where(UserIdentifier.user_id == int(user.id))).scalars().all()
+    stale = [row.id for row in existing if desired.get(row.value) != row.kind]
+    if stale:
+        db.execute(delete(UserIdentifier).where(UserIdentifier.id.in_(stale)))
+    kept = {row.value for row in existing if row.id not in set(stale)}
+    for value, kind in desired.items():
+        if value not in kept:
+            db.add(UserIdentifier(user_id=int(user.id), kind=kind, value=value))
+    db.flush()
+
+
+def identifier_in_use(db: Session, value: str, *, exclude_user_id: int | None = None) -> bool:
+    stmt = select(UserIdentifier.id).where(UserIdentifier.value == value)
+    if exclude_user_id is not None:
+        stmt = stmt.where(UserIdentifier.user_id != int(exclude_user_id))
+    return db.execute(stmt.limit(1)).first() is not None
+
+
+def resolve_user(db: Session, identifier: str) -> User | None:
+    """
+    Resolve a login identifier (email, username or phone) to a user with a single
+    probe on the unique `user_identifiers.value` index.
+    """
+    keys = lookup_keys(identifier)
+    if not keys:
+        return None
+    priority = case(_KIND_PRIORITY, value=UserIdentifier.kind, else_=len(_KIND_PRIORITY))
+    return (
+        db.execute(
+            select(User)
+            .join(UserIdentifier, UserIdentifier.user_id == User.id)
+            .where(UserIdentifier.value.in_(keys))
+            .order_by(priority, UserIdentifier.id)
+            .limit(1)
+        )
+        .scalars()
+        .first()
+    )
@@ -0,0 +1,295 @@
+from __future__ import annotations
+
+import json
+from typing import Any, Callable
+
+from fastapi import HTTPException
+from sqlalchemy import func, or_, select
+from sqlalchemy.orm import Session, load_only, noload, selectinload
+
+from app.media_urls import stored_media_url
+from app.models import ContactUsage, FreeContactUsage, Property, PropertyImage, User
+
+
+def _property_amenities(p: Property) -> list[Any]:
+    try:
+        return json.loads(p.amenities_json or "[]") if p.amenities_json else []
+    except Exception:
+        return []
+
+
+def _owner_text(o: User | None, attr: str) -> str:
+    return (getattr(o, attr, "") or "").strip() if o else ""
+
+
+# Listing fields in response order: key -> (Property columns it reads, value).
+# "images" is built separately; owner fields read the joined owner row.
+_PROPERTY_FIELDS: dict[str, tuple[tuple[str, ...], Callable[[Property, User | None], Any] | None]] = {
+    "id": ((), lambda p, o: p.id),
+    "adv_number": (("ad_number",), lambda p, o: (getattr(p, "ad_number", "") or "").strip() or str(p.id)),
+    "title": (("title",), lambda p, o: p.title),
+    "description": (("description",), lambda p, o: p.description),
+    "property_type": (("property_type",), lambda p, o: p.property_type),
+    "rent_sale": (("rent_sale",), lambda p, o: p.rent_sale),
+    "price": (("price",), lambda p, o: p.price),
+    "price_display": (("price",), lambda p, o: f"{p.price:,}"),
+    "location": (("location",), lambda p, o: p.location),
+    "location_display": (("area", "address", "location"), lambda p, o: (p.area or "").strip() or p.address or p.location),
+    "state": (("state",), lambda p, o: p.state),
+    "district": (("district",), lambda p, o: p.district),
+    "area": (("area",), lambda p, o: getattr(p, "area", "") or ""),
+    "amenities": (("amenities_json",), lambda p, o: _property_amenities(p)),
+    "availability": (("availability",), lambda p, o: p.availability),
+    "status": (("status",), lambda p, o: p.status),
+    "images": ((), None),
+    "created_at": (("created_at",), lambda p, o: p.created_at if getattr(p, "created_at", None) else ""),
+    "owner_name": ((), lambda p, o: _owner_text(o, "name")),
+    "owner_company_name": ((), lambda p, o: _owner_text(o, "company_name")),
+}
+
+
+# Owner/admin-only fields (include_internal=True).
+_PROPERTY_INTERNAL_FIELDS: dict[str, tuple[tuple[str, ...], Callable[[Property, User | None], Any]]] = {
+    "owner_id": (("owner_id",), lambda p, o: int(p.owner_id)),
+    "owner_username": ((), lambda p, o: _owner_text(o, "username")),
+    "owner_email": ((), lambda p, o: _owner_text(o, "email")),
+    "owner_phone": ((), lambda p, o: _owner_text(o, "phone")),
+    "contact_phone": (("contact_phone",), lambda p, o: (p.contact_phone or "").strip()),
+    "contact_email": (("contact_email",), lambda p, o: (p.contact_email or "").strip()),
+    "gps_lat": (("gps_lat",), lambda p, o: getattr(p, "gps_lat", None)),
+    "gps_lng": (("gps_lng",), lambda p, o: getattr(p, "gps_lng", None)),
+    "moderation_reason": (("moderation_reason",), lambda p, o: p.moderation_reason),
+    "address": (("address",), lambda p, o: p.address),
+    "address_normalized": (("address_normalized",), lambda p, o: p.address_normalized),
+    "contact_phone_normalized": (("contact_phone_normalized",), lambda p, o: p.contact_phone_normalized),
+    "state_normalized": (("state_normalized",), lambda p, o: p.state_normalized),
+    "district_normalized": (("district_normalized",), lambda p, o: p.district_normalized),
+    "area_normalized": (("area_normalized",), lambda p, o: getattr(p, "area_normalized", "") or ""),
+    "allow_duplicate_address": (("allow_duplicate_address",), lambda p, o: p.allow_duplicate_address),
+    "allow_duplicate_phone": (("allow_duplicate_phone",), lambda p, o: p.allow_duplicate_phone),
+}
+
+
+# User columns behind the owner_* fields (sparse loads of the joined owner row).
+_OWNER_FIELD_COLUMNS = {
+    "owner_name": "name",
+    "owner_company_name": "company_name",
+    "owner_username": "username",
+    "owner_email": "email",
+    "owner_phone": "phone",
+}
+
+
+# Added by the listing queries themselves (when applicable).
+_PROPERTY_COMPUTED_FIELDS = ("distance_km", "contacted")
+
+
+# view=card: what a feed card renders; images holds the cover image only.
+_CARD_FIELDS = frozenset(
+    {
+        "id",
+        "adv_number",
+        "title",
+        "property_type",
+        "rent_sale",
+        "price",
+        "price_display",
+        "location_display",
+        "area",
+        "district",
+        "status",
+        "images",
+        "created_at",
+        "owner_name",
+        "distance_km",
+        "contacted",
+    }
+)
+
+
+class PropertyFieldset:
+    """
+    Parsed `view=` / `fields=` for listing endpoints. `fields=None` is the full payload.
+    An explicit `fields=` list wins over `view=`; `cover_only` follows `view=card`.
+    """
+
+    def __init__(self, fields: frozenset[str] | None = None, *, cover_only: bool = False) -> None:
+        self.fields = fields
+        self.cover_only = cover_only
+
+    @classmethod
+    def parse(cls, view: str | None, fields: str | None, *, internal: bool = False) -> "PropertyFieldset":
+        v = (view or "full").strip().lower()
+        if v not in {"card", "full"}:
+            raise HTTPException(status_code=400, detail="view must be 'card' or 'full'")
+        requested = split_csv_values(fields)
+        if requested:
+            allowed = set(_PROPERTY_FIELDS) | set(_PROPERTY_COMPUTED_FIELDS)
+            if internal:
+                allowed |= set(_PROPERTY_INTERNAL_FIELDS)
+            unknown = sorted(set(requested) - allowed)
+            if unknown:
+                raise HTTPException(status_code=400, detail=f"Unknown field(s): {', '.join(unknown)}")
+            # `id` is always returned (clients key on it).
+            return cls(frozenset(requested) | {"id"}, cover_only=(v == "card"))
+        if v == "card":
+            return cls(_CARD_FIELDS, cover_only=True)
+        return cls()
+
+    def wants(self, key: str) -> bool:
+        return self.fields is None or key in self.fields
+
+    @property
+    def images(self) -> bool:
+        return self.wants("images")
+
+    def load_options(self, *, owner_entity: bool = True, extra_columns: tuple[str, ...] = ()) -> list[Any]:
+        """ORM loader options: only the needed columns, and images only when they are returned in full."""
+        if self.fields is None:
+            return [selectinload(Property.images)]
+        cols = {"id", "owner_id", *extra_columns}
+        for key in self.fields:
+            spec = _PROPERTY_FIELDS.get(key) or _PROPERTY_INTERNAL_FIELDS.get(key)
+            if spec:
+                cols.update(spec[0])
+        if self.wants("distance_km"):
+            cols.update({"gps_lat", "gps_lng"})
+        opts: list[Any] = [load_only(*(getattr(Property, c) for c in sorted(cols)))]
+        opts.append(selectinload(Property.images) if self.images and not self.cover_only else noload(Property.images))
+        if owner_entity:
+            owner_cols = [getattr(User, c) for k, c in _OWNER_FIELD_COLUMNS.items() if k in self.fields]
+            opts.append(load_only(User.id, *owner_cols))
+        return opts
+
+
+def _image_out(i: PropertyImage, *, include_internal: bool = False) -> dict[str, Any] | None:
+    url = stored_media_url(i.file_path, i.public_url, i.missing)
+    if not url:
+        return None
+    img_out: dict[str, Any] = {
+        "id": i.id,
+        "url": url,
+        "sort_order": i.sort_order,
+        "content_type": (i.content_type or "").strip(),
+        "size_bytes": int(i.size_bytes or 0),
+    }
+    if include_internal:
+        img_out["status"] = i.status
+        img_out["image_hash"] = i.image_hash
+    return img_out
+
+
+def cover_images(db: Session, property_ids: list[int], *, approved_only: bool = True) -> dict[int, PropertyImage]:
+    """First visible image per property (by sort_order, id), one row per property."""
+    ids = [int(x) for x in property_ids if int(x) > 0]
+    if not ids:
+        return {}
+    rn = (
+        func.row_number()
+        .over(partition_by=PropertyImage.property_id, order_by=(PropertyImage.sort_order, PropertyImage.id))
+        .label("rn")
+    )
+    ranked = (
+        select(PropertyImage.id, rn)
+        .where(PropertyImage.property_id.in_(ids))
+        .where(PropertyImage.missing.is_(False))
+    )
+    if approved_only:
+        ranked = ranked.where(PropertyImage.status == "approved")
+    ranked = ranked.subquery()
+    rows = db.execute(
+        select(PropertyImage)
+        .options(
+            load_only(
+                PropertyImage.id,
+                PropertyImage.property_id,
+                PropertyImage.file_path,
+                PropertyImage.public_url,
+                PropertyImage.missing,
+                PropertyImage.sort_order,
+                PropertyImage.content_type,
+                PropertyImage.size_bytes,
+                PropertyImage.status,
+                PropertyImage.image_hash,
+            )
+        )
+        .join(ranked, ranked.c.id == PropertyImage.id)
+        .where(ranked.c.rn == 1)
+    ).scalars().all()
+    return {int(i.property_id): i for i in rows}
+
+
+def property_out(
+    p: Property,
+    *,
+    owner: User | None = None,
+    include_unapproved_images: bool = False,
+    include_internal: bool = False,
+    fieldset: PropertyFieldset | None = None,
+    cover: PropertyImage | None = None,
+) -> dict[str, Any]:
+    fs = fieldset or PropertyFieldset()
+    o = owner or getattr(p, "owner", None)
+    out: dict[str, Any] = {}
+    for key, (_cols, value) in _PROPERTY_FIELDS.items():
+        if not fs.wants(key):
+            continue
+        if key != "images":
+            out[key] = value(p, o)
+            continue
+        images: list[dict[str, Any]] = []
+        try:
+            if fs.cover_only:
+                candidates = [cover] if cover is not None else []
+            else:
+                candidates = sorted((p.images or []), key=lambda x: (int(getattr(x, "sort_order", 0) or 0), int(getattr(x, "id", 0) or 0)))
+            for i in candidates:
+                if not include_unapproved_images and (i.status or "") != "approved":
+                    continue
+                img_out = _image_out(i, include_internal=include_internal)
+                if img_out:
+                    images.append(img_out)
+        except Exception:
+            images = []
+        out["images"] = images
+    if include_internal:
+        for key, (_cols, value) in _PROPERTY_INTERNAL_FIELDS.items():
+            if fs.wants(key):
+                out[key] = value(p, o)
+    return out
+
+
+def _contacted_column(user_id: int):
+    """
+    Correlated EXISTS flag: has this user unlocked the row's property (free or paid)?
+    Added to listing queries so the flag costs no extra round-trips; both probes hit the
+    (user_id, property_id) unique indexes.
+    """
+    free = select(FreeContactUsage.id).where(
+        (FreeContactUsage.user_id == int(user_id)) & (FreeContactUsage.property_id == Property.id)
+    )
+    paid = select(ContactUsage.id).where(
+        (ContactUsage.user_id == int(user_id)) & (ContactUsage.property_id == Property.id)
+    )
+    return or_(free.exists(), paid.exists()).label("contacted")
+
+
+def with_contacted(stmt, me: User | None):
+    return stmt.add_columns(_contacted_column(me.id)) if me else stmt
+
+
+def set_contacted(item: dict[str, Any], row: Any, me: User | None) -> None:
+    if me:
+        item["contacted"] = bool(row.contacted)
+
+
+def split_csv_values(v: str | None) -> list[str]:
+    """
+    Parse a comma-separated query param into a clean list.
+    Used for multi-select filters (e.g. area=a,b,c).
+    """
+    raw = (v or "").strip()
+    if not raw:
+        return []
+    parts = [p.strip() for p in raw.split(",")]
+    return [p for p in parts if p]
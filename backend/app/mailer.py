@@ -8,6 +8,7 @@ from email.message import EmailMessage
 
 from app.config import (
     brevo_api_key,
+    brevo_api_url,
     brevo_from_email,
     brevo_sender_name,
     email_backend,
@@ -19,6 +20,8 @@ from app.config import (
     smtp_port,
     smtp_user,
 )
+from app.metrics import observe_outbound
+from app.tracing import traced
 
 logger = logging.getLogger(__name__)
 
@@ -46,7 +49,7 @@ def _is_delivery_configuration_error(err: EmailSendError) -> bool:
     return any(n in msg for n in needles)
 
 
-def _send_via_brevo(*, to_email: str, subject: str, text: str) -> None:
+def _brevo_request(*, to_email: str, subject: str, text: str) -> tuple[dict[str, str], str]:
     """
     Uses Brevo Transactional Email API:
     https://developers.brevo.com/docs/send-a-transactional-email
@@ -58,24 +61,37 @@ def _send_via_brevo(*, to_email: str, subject: str, text: str) -> None:
     if not sender_email:
         raise EmailSendError("BREVO_FROM/SMTP_FROM not configured")
 
-    # Local import: keep dependencies optional unless Brevo is used.
-    try:
-        import requests  # type: ignore
-    except Exception as e:  # pragma: no cover
-        raise EmailSendError(f"requests package not available: {e}") from e
-
     payload = {
         "sender": {"email": sender_email, "name": brevo_sender_name()},
         "to": [{"email": to_email}],
         "subject": subject,
         "textContent": text,
     }
-    resp = requests.post(
-        "https://api.brevo.com/v3/smtp/email",
-        headers={"api-key": key, "Content-Type": "application/json", "Accept": "application/json"},
-        data=json.dumps(payload),
-        timeout=15,
-    )
+    headers = {"api-key": key, "Content-Type": "application/json", "Accept": "application/json"}
+    return headers, json.dumps(payload)
+
+
+def _send_via_brevo(*, to_email: str, subject: str, text: str) -> None:
+    headers, body = _brevo_request(to_email=to_email, subject=subject, text=text)
+
+    # Local import: keep dependencies optional unless Brevo is used.
+    try:
+        import requests  # type: ignore
+    except Exception as e:  # pragma: no cover
+        raise EmailSendError(f"requests package not available: {e}") from e
+
+    with observe_outbound("brevo"):
+        resp = requests.post(brevo_api_url(), headers=headers, data=body, timeout=15)
+    if not (200 <= int(resp.status_code) < 300):
+        raise EmailSendError(f"Brevo send failed: HTTP {resp.status_code}: {resp.text[:500]}")
+
+
+async def _send_via_brevo_async(*, to_email: str, subject: str, text: str) -> None:
+    from app.http_client import async_http_client
+
+    headers, body = _brevo_request(to_email=to_email, subject=subject, text=text)
+    with observe_outbound("brevo"):
+        resp = await async_http_client().post(brevo_api_url(), headers=headers, content=body, timeout=15)
     if not (200 <= int(resp.status_code) < 300):
         raise EmailSendError(f"Brevo send failed: HTTP {resp.status_code}: {resp.text[:500]}")
 
@@ -121,16 +137,32 @@ def _send_via_smtp(*, to_email: str, subject: str, text: str) -> None:
         s.send_message(msg)
 
 
-def send_email(*, to_email: str, subject: str, text: str) -> None:
+def _delivery_route() -> str:
     """
+    Which transport to use: console | brevo | smtp | dev_console.
     Prefer Brevo if configured; otherwise fall back to SMTP.
     """
-    to_email = (to_email or "").strip()
-    if not to_email or "@" not in to_email:
-        raise EmailSendError("Invalid recipient email")
-
     backend = email_backend()
     if backend in ("console", "log"):
+        return "console"
+    if backend in ("brevo", "smtp"):
+        return backend
+    # "auto" (default): prefer Brevo when API key is present.
+    if brevo_api_key():
+        return "brevo"
+    # If SMTP is configured, try it; otherwise we may fall back in local dev.
+    if smtp_host():
+        return "smtp"
+    # Dev-friendly fallback (no external email service configured).
+    if is_local_dev():
+        return "dev_console"
+    raise EmailSendError(
+        "Email provider not configured. Set BREVO_API_KEY+BREVO_FROM (Brevo) or SMTP_HOST+SMTP_FROM (SMTP)."
+    )
+
+
+def _log_console_email(route: str, *, to_email: str, subject: str, text: str) -> None:
+    if route == "console":
         logger.warning(
             "EMAIL_BACKEND=console: to=%s subject=%s\n%s",
             to_email,
@@ -138,43 +170,53 @@ def send_email(*, to_email: str, subject: str, text: str) -> None:
             text,
         )
         return
+    logger.warning(
+        "No email provider configured; falling back to console output in local dev. "
+        "Set EMAIL_BACKEND=smtp/brevo (or configure SMTP_/BREVO_ env vars) for real delivery.\n"
+        "to=%s subject=%s\n%s",
+        to_email,
+        subject,
+        text,
+    )
 
-    if backend == "brevo":
-        _send_via_brevo(to_email=to_email, subject=subject, text=text)
-        return
 
-    if backend == "smtp":
-        _send_via_smtp(to_email=to_email, subject=subject, text=text)
-        return
+@traced("email.send", kind="CLIENT")
+def send_email(*, to_email: str, subject: str, text: str) -> None:
+    to_email = (to_email or "").strip()
+    if not to_email or "@" not in to_email:
+        raise EmailSendError("Invalid recipient email")
 
-    # "auto" (default): prefer Brevo when API key is present.
-    if brevo_api_key():
+    route = _delivery_route()
+    if route == "brevo":
         _send_via_brevo(to_email=to_email, subject=subject, text=text)
-        return
-
-    # If SMTP is configured, try it; otherwise we may fall back in local dev.
-    if smtp_host():
+    elif route == "smtp":
         _send_via_smtp(to_email=to_email, subject=subject, text=text)
-        return
+    else:
+        _log_console_email(route, to_email=to_email, subject=subject, text=text)
 
-    # Dev-friendly fallback (no external email service configured).
-    if is_local_dev():
-        logger.warning(
-            "No email provider configured; falling back to console output in local dev. "
-            "Set EMAIL_BACKEND=smtp/brevo (or configure SMTP_/BREVO_ env vars) for real delivery.\n"
-            "to=%s subject=%s\n%s",
-            to_email,
-            subject,
-            text,
-        )
-        return
 
-    raise EmailSendError(
-        "Email provider not configured. Set BREVO_API_KEY+BREVO_FROM (Brevo) or SMTP_HOST+SMTP_FROM (SMTP)."
-    )
+@traced("email.send", kind="CLIENT")
+async def send_email_async(*, to_email: str, subject: str, text: str) -> None:
+    """
+    send_email() for async handlers: Brevo goes through the shared httpx.AsyncClient;
+    SMTP (blocking smtplib) runs in the threadpool.
+    """
+    to_email = (to_email or "").strip()
+    if not to_email or "@" not in to_email:
+        raise EmailSendError("Invalid recipient email")
 
+    route = _delivery_route()
+    if route == "brevo":
+        await _send_via_brevo_async(to_email=to_email, subject=subject, text=text)
+    elif route == "smtp":
+        from starlette.concurrency import run_in_threadpool
 
-def send_otp_email(*, to_email: str, otp: str, purpose: str) -> str:
+        await run_in_threadpool(lambda: _send_via_smtp(to_email=to_email, subject=subject, text=text))
+    else:
+        _log_console_email(route, to_email=to_email, subject=subject, text=text)
+
+
+def _otp_message(*, otp: str, purpose: str) -> tuple[str, str]:
     mins = otp_exp_minutes()
     purpose_label = "Login" if (purpose or "").strip().lower() == "login" else "Password reset"
     subject = f"{purpose_label} OTP"
@@ -183,20 +225,38 @@ def send_otp_email(*, to_email: str, otp: str, purpose: str) -> str:
         f"This code expires in {mins} minutes.\n\n"
         "If you did not request this, you can ignore this email."
     )
+    return subject, text
+
+
+def _otp_delivery_fallback(err: EmailSendError, *, to_email: str, otp: str, purpose: str) -> str:
+    # If email isn't configured, still allow OTP flows to work by logging
+    # the OTP to server logs (useful for initial deployments / staging).
+    if not _is_delivery_configuration_error(err):
+        raise err
+    logger.warning(
+        "OTP delivery fallback (email not configured): purpose=%s to=%s otp=%s expires_in_minutes=%s error=%s",
+        purpose,
+        to_email,
+        otp,
+        otp_exp_minutes(),
+        str(err),
+    )
+    return "console"
+
+
+def send_otp_email(*, to_email: str, otp: str, purpose: str) -> str:
+    subject, text = _otp_message(otp=otp, purpose=purpose)
     try:
         send_email(to_email=to_email, subject=subject, text=text)
         return "email"
     except EmailSendError as e:
-        # If email isn't configured, still allow OTP flows to work by logging
-        # the OTP to server logs (useful for initial deployments / staging).
-        if _is_delivery_configuration_error(e):
-            logger.warning(
-                "OTP delivery fallback (email not configured): purpose=%s to=%s otp=%s expires_in_minutes=%s error=%s",
-                purpose,
-                to_email,
-                otp,
-                mins,
-                str(e),
-            )
-            return "console"
-        raise
+        return _otp_delivery_fallback(e, to_email=to_email, otp=otp, purpose=purpose)
+
+
+async def send_otp_email_async(*, to_email: str, otp: str, purpose: str) -> str:
+    subject, text = _otp_message(otp=otp, purpose=purpose)
+    try:
+        await send_email_async(to_email=to_email, subject=subject, text=text)
+        return "email"
+    except EmailSendError as e:
+        return _otp_delivery_fallback(e, to_email=to_email, otp=otp, purpose=purpose)
@@ -0,0 +1,209 @@
+from __future__ import annotations
+
+import logging
+import os
+import threading
+import time
+
+from sqlalchemy import select, update
+
+from app.config import media_reconcile_batch_size, media_reconcile_interval_seconds, uploads_dir
+from app.db import job_lock, session_scope
+from app.models import PropertyImage, User
+
+logger = logging.getLogger(__name__)
+
+
+def _is_remote(fp: str) -> bool:
+    return fp.startswith(("http://", "https://", "//"))
+
+
+def upload_rel_path(file_path: str) -> str:
+    """
+    Normalize a stored file path into a path relative to uploads/ ("" for remote URLs).
+
+    Historical/buggy values are supported:
+    - "/uploads/abc.jpg", "uploads/abc.jpg"
+    - "/var/app/uploads/abc.jpg" (absolute path mistakenly stored)
+    - "C:\\app\\uploads\\abc.jpg" (Windows path)
+    - "backend/uploads/abc.jpg" (repo-relative)
+    """
+    fp = (file_path or "").strip().replace("\\", "/")
+    if not fp or _is_remote(fp):
+        return ""
+    if fp.startswith("/uploads/"):
+        # Public path already; keep any nested "uploads/uploads" layout intact.
+        return fp[len("/uploads/") :].lstrip("/")
+
+    low = fp.lower()
+    # If the path contains an uploads segment, strip everything before it.
+    idx = low.rfind("/uploads/")
+    if idx >= 0:
+        return fp[idx + len("/uploads/") :].lstrip("/")
+    idx2 = low.rfind("uploads/")
+    if idx2 >= 0:
+        return fp[idx2 + len("uploads/") :].lstrip("/")
+
+    # If an absolute path was stored, try to map it back to uploads/.
+    try:
+        if os.path.isabs(fp):
+            root = os.path.abspath(uploads_dir())
+            fp_abs = os.path.abspath(fp)
+            try:
+                if os.path.commonpath([fp_abs, root]) == root:
+                    return os.path.relpath(fp_abs, root).replace("\\", "/").lstrip("/")
+            except Exception:
+                pass
+            # Last resort: assume basename lives under uploads/
+            return os.path.basename(fp_abs).lstrip("/")
+    except Exception:
+        pass
+    return fp.lstrip("/")
+
+
+def public_media_url(file_path: str) -> str:
+    """Public URL for a stored file path, without touching the filesystem."""
+    fp = (file_path or "").strip().replace("\\", "/")
+    if not fp:
+        return ""
+    if _is_remote(fp):
+        return fp
+    rel = upload_rel_path(fp)
+    return f"/uploads/{rel}" if rel else ""
+
+
+def resolve_media_url(file_path: str, *, existing: set[str] | None = None) -> tuple[str, bool]:
+    """
+    (public URL, missing) for a stored file path.
+
+    Local files are looked up directly under uploads/ and then under the nested
+    "uploads/uploads" layout some deployments used. `existing` (relative paths under
+    uploads/) lets bulk callers avoid one stat per row.
+    """
+    fp = (file_path or "").strip().replace("\\", "/")
+    if not fp:
+        return "", False
+    if _is_remote(fp):
+        return fp, False
+    rel = upload_rel_path(fp)
+    if not rel:
+        return "", False
+
+    if existing is None:
+        root = uploads_dir()
+
+        def found(r: str) -> bool:
+            try:
+                return os.path.exists(os.path.join(root, r))
+            except Exception:
+                return False
+    else:
+
+        def found(r: str) -> bool:
+            return r in existing
+
+    if found(rel):
+        return f"/uploads/{rel}", False
+    if found(f"uploads/{rel}"):
+        return f"/uploads/uploads/{rel}", False
+    return f"/uploads/{rel}", True
+
+
+def stored_media_url(file_path: str, url: str, missing: bool) -> str:
+    """
+    URL to serialize for a row: "" when the file is known to be missing. Rows not
+    reconciled yet (empty stored URL) are resolved live.
+    """
+    if not url:
+        url, missing = resolve_media_url(file_path)
+    return "" if missing else url
+
+
+def _existing_upload_files() -> set[str]:
+    root = uploads_dir()
+    out: set[str] = set()
+    for dirpath, _dirnames, filenames in os.walk(root):
+        rel_dir = os.path.relpath(dirpath, root).replace("\\", "/")
+        prefix = "" if rel_dir == "." else rel_dir + "/"
+        out.update(prefix + f for f in filenames)
+    return out
+
+
+def _reconcile_table(model, id_col, path_col, url_col, missing_col, existing: set[str], batch_size: int) -> int:
+    changed = 0
+    last_id = 0
+    while True:
+        with session_scope() as db:
+            rows = db.execute(
+                select(id_col, path_col, url_col, missing_col)
+                .where(id_col > last_id)
+                .where((path_col != "") | (url_col != ""))
+                .order_by(id_col)
+                .limit(batch_size)
+            ).all()
+            if not rows:
+                return changed
+            last_id = int(rows[-1][0])
+            updates = []
+            for row_id, path, url, missing in rows:
+                new_url, new_missing = resolve_media_url(path or "", existing=existing)
+                if new_missing:
+                    # Uploaded after the directory listing was taken? Check the file itself.
+                    new_url, new_missing = resolve_media_url(path or "")
+                if new_url != (url or "") or bool(new_missing) != bool(missing):
+                    updates.append({"id": int(row_id), url_col.key: new_url, missing_col.key: bool(new_missing)})
+            if updates:
+                # Bulk UPDATE by primary key (one executemany per batch).
+                db.execute(update(model), updates)
+                changed += len(updates)
+
+
+def reconcile_media_urls(*, batch_size: int | None = None) -> dict[str, int]:
+    """
+    Store the canonical public URL and missing flag for every property image and profile
+    image, checking existence against one directory listing of uploads/ (rows whose file
+    is not in the listing are re-checked on disk before being flagged missing).
+    """
+    size = int(batch_size or media_reconcile_batch_size())
+    existing = _existing_upload_files()
+    images = _reconcile_table(
+        PropertyImage, PropertyImage.id, PropertyImage.file_path, PropertyImage.public_url, PropertyImage.missing, existing, size
+    )
+    profiles = _reconcile_table(
+        User, User.id, User.profile_image_path, User.profile_image_url, User.profile_image_missing, existing, size
+    )
+    return {"files": len(existing), "property_images_updated": images, "profile_images_updated": profiles}
+
+
+_reconciler_started = False
+_reconciler_lock = threading.Lock()
+
+
+def start_media_reconciler() -> None:
+    """
+    Start the reconcile thread (once per process): one pass at startup to fill in rows
+    that have no stored URL yet, then every MEDIA_RECONCILE_INTERVAL_SECONDS. Each pass runs
+    under job_lock(): one worker walks uploads/ and the others skip that pass.
+    """
+    global _reconciler_started
+    interval = media_reconcile_interval_seconds()
+    if interval <= 0:
+        return
+    with _reconciler_lock:
+        if _reconciler_started:
+            return
+        _reconciler_started = True
+
+    def _loop() -> None:
+        while True:
+            try:
+                with job_lock("media_reconcile") as leader:
+                    res = reconcile_media_urls() if leader else None
+                if res and (res["property_images_updated"] or res["profile_images_updated"]):
+                    logger.info("media reconcile: %s", res)
+            except Exception:
+                # DB may be unavailable/unmigrated; try again next interval.
+                logger.warning("Media reconcile failed", exc_info=True)
+            time.sleep(interval)
+
+    threading.Thread(target=_loop, name="media-reconciler", daemon=True).start()
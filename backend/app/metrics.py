@@ -0,0 +1,238 @@
+from __future__ import annotations
+
+import contextvars
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Any, Callable, Iterator
+
+from app.sql_events import ExecutedStatement, observe_statements
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+_LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+_QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+_LE_INF = 'le="+Inf"'
+
+
+def _escape(value: Any) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: tuple[str, ...], values: tuple[Any, ...], extra: str = "") -> str:
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _num(v: float) -> str:
+    if v == int(v):
+        return str(int(v))
+    return repr(float(v))
+
+
+class Counter:
+    def __init__(self, name: str, help: str, labelnames: tuple[str, ...] = ()) -> None:
+        self.name = name
+        self.help = help
+        self.labelnames = labelnames
+        self._values: dict[tuple[Any, ...], float] = {}
+        self._lock = threading.Lock()
+        _REGISTRY.append(self)
+
+    def inc(self, *labels: Any, amount: float = 1.0) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def render(self) -> list[str]:
+        with self._lock:
+            items = sorted(self._values.items(), key=lambda kv: tuple(map(str, kv[0])))
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        lines += [f"{self.name}{_labels(self.labelnames, k)} {_num(v)}" for k, v in items]
+        return lines
+
+
+class Histogram:
+    """Cumulative-bucket histogram; one small list per label set, updated under a lock."""
+
+    def __init__(
+        self, name: str, help: str, labelnames: tuple[str, ...] = (), buckets: tuple[float, ...] = _LATENCY_BUCKETS
+    ) -> None:
+        self.name = name
+        self.help = help
+        self.labelnames = labelnames
+        self.buckets = tuple(sorted(buckets))
+        # labels -> [count per bucket..., count in +Inf, sum]
+        self._series: dict[tuple[Any, ...], list[float]] = {}
+        self._lock = threading.Lock()
+        _REGISTRY.append(self)
+
+    def observe(self, value: float, *labels: Any) -> None:
+        idx = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [0.0] * (len(self.buckets) + 2)
+            series[idx] += 1
+            series[-1] += value
+
+    def render(self) -> list[str]:
+        with self._lock:
+            items = sorted(((k, list(v)) for k, v in self._series.items()), key=lambda kv: tuple(map(str, kv[0])))
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        for labels, series in items:
+            cumulative = 0.0
+            for bound, n in zip(self.buckets, series):
+                cumulative += n
+                le = 'le="%s"' % _num(bound)
+                lines.append(f"{self.name}_bucket{_labels(self.labelnames, labels, le)} {_num(cumulative)}")
+            cumulative += series[len(self.buckets)]
+            lines.append(f"{self.name}_bucket{_labels(self.labelnames, labels, _LE_INF)} {_num(cumulative)}")
+            lines.append(f"{self.name}_sum{_labels(self.labelnames, labels)} {_num(series[-1])}")
+            lines.append(f"{self.name}_count{_labels(self.labelnames, labels)} {_num(cumulative)}")
+        return lines
+
+
+_REGISTRY: list[Counter | Histogram] = []
+# Scrape-time gauges/counters from existing stats() snapshots: prefix -> fn.
+_COLLECTORS: dict[str, Callable[[], dict[str, Any]]] = {}
+
+REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds", "HTTP request latency by route template.", ("method", "route", "status")
+)
+REQUEST_DB_QUERIES = Histogram(
+    "http_request_db_queries", "SQL statements executed per request.", ("method", "route"), _QUERY_COUNT_BUCKETS
+)
+REQUEST_DB_SECONDS = Histogram(
+    "http_request_db_duration_seconds", "Time spent in SQL statements per request.", ("method", "route")
+)
+DB_QUERIES = Counter("db_queries_total", "SQL statements executed (all callers, including background jobs).")
+DB_QUERY_SECONDS = Counter("db_query_duration_seconds_total", "Time spent in SQL statements.")
+RATE_LIMIT_REJECTIONS = Counter("rate_limit_rejections_total", "Requests rejected by the rate limiter.", ("rule",))
+OUTBOUND_DURATION = Histogram(
+    "outbound_request_duration_seconds", "Latency of calls to external services.", ("service", "outcome")
+)
+
+
+class _RequestStats:
+    __slots__ = ("db_queries", "db_seconds")
+
+    def __init__(self) -> None:
+        self.db_queries = 0
+        self.db_seconds = 0.0
+
+
+# Set per request by MetricsMiddleware; worker threads see the same object (context is copied).
+_request_stats: contextvars.ContextVar[_RequestStats | None] = contextvars.ContextVar("request_stats", default=None)
+
+
+def _record_statement(executed: ExecutedStatement) -> None:
+    DB_QUERIES.inc()
+    DB_QUERY_SECONDS.inc(amount=executed.seconds)
+    stats = _request_stats.get()
+    if stats is not None:
+        stats.db_queries += 1
+        stats.db_seconds += executed.seconds
+
+
+def install_db_hooks() -> None:
+    """Count/time every SQL statement on every engine (sync, async and replicas)."""
+    observe_statements(_record_statement)
+
+
+def rate_limit_rule(key: str) -> str:
+    """`otp:login:req:alice@example.com` -> `otp:login:req` (bounded label cardinality)."""
+    return key.rsplit(":", 1)[0] if ":" in key else key
+
+
+@contextmanager
+def observe_outbound(service: str) -> Iterator[None]:
+    """Time a call to an external service (sync and async callers alike)."""
+    started = time.perf_counter()
+    outcome = "error"
+    try:
+        yield
+        outcome = "ok"
+    finally:
+        OUTBOUND_DURATION.observe(time.perf_counter() - started, service, outcome)
+
+
+def register_stats(prefix: str, fn: Callable[[], dict[str, Any]]) -> None:
+    """
+    Expose a stats() snapshot at scrape time: numeric keys become `<prefix>_<key>`,
+    counters when the key ends in `_total`, gauges otherwise.
+    """
+    _COLLECTORS[prefix] = fn
+
+
+def _render_stats(prefix: str, values: dict[str, Any]) -> list[str]:
+    lines: list[str] = []
+    for key, value in values.items():
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            continue
+        name = f"{prefix}_{key}"
+        kind = "counter" if key.endswith("_total") else "gauge"
+        lines += [f"# TYPE {name} {kind}", f"{name} {_num(float(value))}"]
+    return lines
+
+
+def render_metrics(extra: dict[str, dict[str, Any]] | None = None) -> str:
+    """Prometheus text exposition of every metric plus the registered/extra stats snapshots."""
+    lines: list[str] = []
+    for metric in _REGISTRY:
+        lines += metric.render()
+    for prefix, fn in list(_COLLECTORS.items()):
+        try:
+            lines += _render_stats(prefix, fn())
+        except Exception:
+            continue
+    for prefix, values in (extra or {}).items():
+        lines += _render_stats(prefix, values)
+    return "\n".join(lines) + "\n"
+
+
+def _route_label(scope, root_path: str) -> str:
+    route = scope.get("route")
+    if route is not None and getattr(route, "path", None):
+        return route.path
+    # Mounted apps (static files) don't set a route; label by mount prefix.
+    mounted = scope.get("root_path", "")
+    if mounted and mounted != root_path and mounted.startswith(root_path):
+        return mounted[len(root_path) :] + "/{path}"
+    return "<unmatched>"
+
+
+class MetricsMiddleware:
+    """Per-route latency and per-request SQL count/time. Labels use the route template."""
+
+    def __init__(self, app: Any) -> None:
+        self.app = app
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        stats = _RequestStats()
+        token = _request_stats.set(stats)
+        root_path = scope.get("root_path", "")
+        status = 500
+        started = time.perf_counter()
+
+        async def send_wrapper(message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = int(message["status"])
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - started
+            _request_stats.reset(token)
+            method = scope.get("method", "")
+            route = _route_label(scope, root_path)
+            REQUEST_DURATION.observe(elapsed, method, route, status)
+            REQUEST_DB_QUERIES.observe(stats.db_queries, method, route)
+            REQUEST_DB_SECONDS.observe(stats.db_seconds, method, route)
@@ -2,7 +2,7 @@ from __future__ import annotations
 
 import datetime as dt
 
-from sqlalchemy import Boolean, DateTime, Float, ForeignKey, Integer, String, Text, UniqueConstraint
+from sqlalchemy import Boolean, DateTime, Float, ForeignKey, Index, Integer, String, Text, UniqueConstraint
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column, relationship
 
 
@@ -12,6 +12,8 @@ class Base(DeclarativeBase):
 
 class User(Base):
     __tablename__ = "users"
+    # Pending-owner queue: WHERE role = 'owner' AND approval_status = ? ORDER BY id DESC.
+    __table_args__ = (Index("ix_users_role_approval_status_id", "role", "approval_status", "id"),)
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
     email: Mapped[str] = mapped_column(String(255), unique=True, index=True)
@@ -39,6 +41,10 @@ class User(Base):
 
     # Profile image (optional). Stored as a relative uploads path or full URL.
     profile_image_path: Mapped[str] = mapped_column(String(512), default="")
+    # Canonical public URL for profile_image_path and whether the local file was found
+    # (maintained by app.media_urls; empty URL = not resolved yet).
+    profile_image_url: Mapped[str] = mapped_column(String(512), default="")
+    profile_image_missing: Mapped[bool] = mapped_column(Boolean, default=False)
     # Cloudinary public_id for profile image (optional).
     profile_image_cloudinary_public_id: Mapped[str] = mapped_column(String(255), default="")
 
@@ -53,17 +59,46 @@ class User(Base):
     subscription = relationship("Subscription", back_populates="user", uselist=False)
 
 
+class UserIdentifier(Base):
+    """
+    Login lookup index: every normalized identifier (email, username, phone) a user can
+    sign in with maps to exactly one user. Maintained by app.identifiers.
+    """
+
+    __tablename__ = "user_identifiers"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    user_id: Mapped[int] = mapped_column(ForeignKey("users.id"), index=True)
+    kind: Mapped[str] = mapped_column(String(16))  # email | username | phone
+    value: Mapped[str] = mapped_column(String(255), unique=True, index=True)
+
+
 class OtpCode(Base):
     __tablename__ = "otp_codes"
+    # Verification probes (identifier, purpose, expires_at > now); purge scans expires_at.
+    __table_args__ = (Index("ix_otp_codes_identifier_purpose_expires_at", "identifier", "purpose", "expires_at"),)
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
-    identifier: Mapped[str] = mapped_column(String(255), index=True)  # email/username/phone
-    purpose: Mapped[str] = mapped_column(String(40), index=True)  # login | forgot
-    code: Mapped[str] = mapped_column(String(12))
-    expires_at: Mapped[dt.datetime] = mapped_column(DateTime(timezone=True))
+    identifier: Mapped[str] = mapped_column(String(255))  # email/username/phone
+    purpose: Mapped[str] = mapped_column(String(40))  # login | forgot
+    # HMAC-SHA256 hex of the code (see app.otp_store); legacy rows may hold the plain code.
+    code: Mapped[str] = mapped_column(String(64))
+    expires_at: Mapped[dt.datetime] = mapped_column(DateTime(timezone=True), index=True)
     created_at: Mapped[dt.datetime] = mapped_column(DateTime(timezone=True), default=lambda: dt.datetime.now(dt.timezone.utc))
 
 
+class RateLimitBucket(Base):
+    """
+    Shared GCRA state for the database rate-limit backend: one row per key.
+    `tat` is the theoretical arrival time (unix seconds); rows with tat < now are idle.
+    """
+
+    __tablename__ = "rate_limit_buckets"
+
+    key: Mapped[str] = mapped_column(String(255), primary_key=True)
+    tat: Mapped[float] = mapped_column(Float, index=True)
+
+
 class Subscription(Base):
     __tablename__ = "subscriptions"
 
@@ -129,6 +164,8 @@ class FreeContactUsage(Base):
 
 class Property(Base):
     __tablename__ = "properties"
+    # Admin moderation queue: WHERE status = ? ORDER BY id DESC, keyset-paginated.
+    __table_args__ = (Index("ix_properties_status_id", "status", "id"),)
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
     owner_id: Mapped[int] = mapped_column(ForeignKey("users.id"), index=True)
@@ -191,11 +228,18 @@ class SavedProperty(Base):
 
 class PropertyImage(Base):
     __tablename__ = "property_images"
-    __table_args__ = (UniqueConstraint("property_id", "sort_order", name="uq_property_image_sort"),)
+    __table_args__ = (
+        UniqueConstraint("property_id", "sort_order", name="uq_property_image_sort"),
+        Index("ix_property_images_status_id", "status", "id"),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
     property_id: Mapped[int] = mapped_column(ForeignKey("properties.id"), index=True)
     file_path: Mapped[str] = mapped_column(String(512))  # relative path or URL
+    # Canonical public URL for file_path and whether the local file was found
+    # (maintained by app.media_urls; empty URL = not resolved yet).
+    public_url: Mapped[str] = mapped_column(String(512), default="")
+    missing: Mapped[bool] = mapped_column(Boolean, default=False)
     # Cloudinary public_id for cleanup (optional).
     cloudinary_public_id: Mapped[str] = mapped_column(String(255), default="")
     sort_order: Mapped[int] = mapped_column(Integer, default=0)
@@ -214,12 +258,45 @@ class PropertyImage(Base):
 
 class ModerationLog(Base):
     __tablename__ = "moderation_logs"
+    # Audit reads: per entity, newest first (keyset on id); rollover scans by created_at.
+    __table_args__ = (
+        Index("ix_moderation_logs_entity_type_entity_id_id", "entity_type", "entity_id", "id"),
+        Index("ix_moderation_logs_created_at", "created_at"),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
     actor_user_id: Mapped[int] = mapped_column(ForeignKey("users.id"), index=True)
-    entity_type: Mapped[str] = mapped_column(String(40), index=True)  # user|property|property_image
+    entity_type: Mapped[str] = mapped_column(String(40))  # user|property|property_image
     entity_id: Mapped[int] = mapped_column(Integer, index=True)
     action: Mapped[str] = mapped_column(String(40), index=True)  # approve|reject|suspend|create|upload
     reason: Mapped[str] = mapped_column(Text, default="")
     created_at: Mapped[dt.datetime] = mapped_column(DateTime(timezone=True), default=lambda: dt.datetime.now(dt.timezone.utc))
 
+
+class ModerationLogArchive(Base):
+    """moderation_logs rows past MODERATION_LOG_HOT_DAYS, same ids (see app.moderation_logs)."""
+
+    __tablename__ = "moderation_logs_archive"
+    __table_args__ = (
+        Index("ix_moderation_logs_archive_entity_type_entity_id_id", "entity_type", "entity_id", "id"),
+        Index("ix_moderation_logs_archive_created_at", "created_at"),
+    )
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=False)
+    # No FK: archived rows outlive the accounts they mention.
+    actor_user_id: Mapped[int] = mapped_column(Integer)
+    entity_type: Mapped[str] = mapped_column(String(40))
+    entity_id: Mapped[int] = mapped_column(Integer)
+    action: Mapped[str] = mapped_column(String(40))
+    reason: Mapped[str] = mapped_column(Text, default="")
+    created_at: Mapped[dt.datetime] = mapped_column(DateTime(timezone=True))
+
+
+
+class BootstrapMarker(Base):
+    """One-time data bootstrap steps that have run (see app.main.run_bootstrap)."""
+
+    __tablename__ = "bootstrap_markers"
+
+    name: Mapped[str] = mapped_column(String(80), primary_key=True)
+    applied_at: Mapped[dt.datetime] = mapped_column(DateTime(timezone=True), default=lambda: dt.datetime.now(dt.timezone.utc))
@@ -0,0 +1,124 @@
+from __future__ import annotations
+
+import datetime as dt
+import gzip
+import json
+import logging
+import os
+from typing import Any
+
+from sqlalchemy import delete, insert, select
+
+from app.config import moderation_log_export_dir, moderation_log_hot_days, moderation_log_retention_days
+from app.db import session_scope
+from app.models import ModerationLog, ModerationLogArchive
+
+logger = logging.getLogger(__name__)
+
+_COLUMNS = ("id", "actor_user_id", "entity_type", "entity_id", "action", "reason", "created_at")
+
+
+def rollover_moderation_logs(
+    *,
+    older_than_days: int | None = None,
+    batch_size: int = 1000,
+    max_batches: int = 1000,
+    now: dt.datetime | None = None,
+) -> int:
+    """
+    Move moderation_logs rows older than MODERATION_LOG_HOT_DAYS to moderation_logs_archive.
+    Each batch (INSERT ... SELECT, then DELETE by id) commits separately to keep locks short.
+    """
+    days = moderation_log_hot_days() if older_than_days is None else int(older_than_days)
+    cutoff = (now or dt.datetime.now(dt.timezone.utc)) - dt.timedelta(days=days)
+    src, dst = ModerationLog.__table__, ModerationLogArchive.__table__
+    total = 0
+    for _ in range(max(1, int(max_batches))):
+        with session_scope() as db:
+            ids = (
+                db.execute(
+                    select(src.c.id).where(src.c.created_at < cutoff).order_by(src.c.created_at, src.c.id).limit(int(batch_size))
+                )
+                .scalars()
+                .all()
+            )
+            if ids:
+                db.execute(insert(dst).from_select(list(_COLUMNS), select(*(src.c[c] for c in _COLUMNS)).where(src.c.id.in_(ids))))
+                db.execute(delete(src).where(src.c.id.in_(ids)))
+        total += len(ids)
+        if len(ids) < int(batch_size):
+            break
+    return total
+
+
+def _json_value(v: Any) -> Any:
+    return v.isoformat() if isinstance(v, dt.datetime) else str(v)
+
+
+def export_expired_moderation_logs(
+    *,
+    older_than_days: int | None = None,
+    out_dir: str | None = None,
+    batch_size: int = 1000,
+    max_rows: int = 100_000,
+    now: dt.datetime | None = None,
+) -> dict[str, Any]:
+    """
+    Write archived rows older than MODERATION_LOG_RETENTION_DAYS (0: keep forever) to one
+    gzip JSON-lines file, oldest id first, then delete them. Rows are only deleted once the
+    file is complete, so an interrupted run exports them again next time.
+    """
+    days = moderation_log_retention_days() if older_than_days is None else int(older_than_days)
+    if days <= 0:
+        return {"rows": 0, "file": ""}
+    now = now or dt.datetime.now(dt.timezone.utc)
+    cutoff = now - dt.timedelta(days=days)
+    t = ModerationLogArchive.__table__
+    out_dir = out_dir or moderation_log_export_dir()
+    os.makedirs(out_dir, exist_ok=True)
+    path = os.path.join(out_dir, f"moderation_logs_{now.strftime('%Y%m%dT%H%M%SZ')}.jsonl.gz")
+    part = path + ".part"
+
+    exported: list[int] = []
+    last_id = 0
+    with gzip.open(part, "wt", encoding="utf-8") as f, session_scope() as db:
+        while len(exported) < int(max_rows):
+            n = min(int(batch_size), int(max_rows) - len(exported))
+            rows = (
+                db.execute(select(t).where(t.c.created_at < cutoff, t.c.id > last_id).order_by(t.c.id).limit(n))
+                .mappings()
+                .all()
+            )
+            for r in rows:
+                f.write(json.dumps(dict(r), default=_json_value, separators=(",", ":")) + "\n")
+            exported.extend(int(r["id"]) for r in rows)
+            if len(rows) < n:
+                break
+            last_id = exported[-1]
+    if not exported:
+        os.remove(part)
+        return {"rows": 0, "file": ""}
+    os.replace(part, path)
+
+    for i in range(0, len(exported), int(batch_size)):
+        with session_scope() as db:
+            db.execute(delete(t).where(t.c.id.in_(exported[i : i + int(batch_size)])))
+    logger.info("exported %s archived moderation log rows to %s", len(exported), path)
+    return {"rows": len(exported), "file": path}
+
+
+def run_moderation_log_retention(
+    *,
+    hot_days: int | None = None,
+    retention_days: int | None = None,
+    out_dir: str | None = None,
+    batch_size: int = 1000,
+    max_export_rows: int = 100_000,
+    now: dt.datetime | None = None,
+) -> dict[str, Any]:
+    """Rollover, then export. Run from a single scheduler (cron); see scripts/archive_moderation_logs.py."""
+    moved = rollover_moderation_logs(older_than_days=hot_days, batch_size=batch_size, now=now)
+    export = export_expired_moderation_logs(
+        older_than_days=retention_days, out_dir=out_dir, batch_size=batch_size, max_rows=max_export_rows, now=now
+    )
+    return {"archived": moved, "exported": export["rows"], "file": export["file"]}
@@ -0,0 +1,181 @@
+from __future__ import annotations
+
+import datetime as dt
+import hashlib
+import hmac
+import logging
+import threading
+import time
+from typing import Any
+
+from sqlalchemy import delete, select
+from sqlalchemy.orm import Session
+
+from app.config import jwt_secret, otp_backend, otp_purge_batch_size, otp_purge_interval_seconds
+from app.models import OtpCode
+
+logger = logging.getLogger(__name__)
+
+
+def hash_otp_code(*, identifier: str, purpose: str, code: str) -> str:
+    """
+    Keyed hash of an OTP. Binding identifier+purpose means a leaked row can't be replayed
+    for another account/flow, and the server secret makes 6-digit codes non-brute-forceable
+    offline.
+    """
+    msg = f"{purpose}\x00{identifier}\x00{code}".encode("utf-8")
+    return hmac.new(jwt_secret().encode("utf-8"), msg, hashlib.sha256).hexdigest()
+
+
+def _code_matches(stored: str, *, identifier: str, purpose: str, code: str) -> bool:
+    stored = (stored or "").strip()
+    if len(stored) == 64:
+        return hmac.compare_digest(stored, hash_otp_code(identifier=identifier, purpose=purpose, code=code))
+    # Plain codes issued before hashing was introduced (expire within OTP_EXP_MINUTES).
+    return bool(stored) and hmac.compare_digest(stored, code)
+
+
+def _as_utc(value: dt.datetime) -> dt.datetime:
+    # SQLite returns naive datetimes even for timezone=True columns.
+    return value if value.tzinfo else value.replace(tzinfo=dt.timezone.utc)
+
+
+class DatabaseOtpStore:
+    """
+    OTPs in the `otp_codes` table. At most one active code per (identifier, purpose),
+    so verification is a single probe on the composite index.
+    """
+
+    name = "database"
+
+    def issue(self, db: Session, *, identifier: str, purpose: str, code: str, expires_at: dt.datetime) -> None:
+        db.execute(delete(OtpCode).where((OtpCode.identifier == identifier) & (OtpCode.purpose == purpose)))
+        db.add(
+            OtpCode(
+                identifier=identifier,
+                purpose=purpose,
+                code=hash_otp_code(identifier=identifier, purpose=purpose, code=code),
+                expires_at=expires_at,
+            )
+        )
+
+    def consume(self, db: Session, *, identifier: str, purpose: str, code: str) -> bool:
+        now = dt.datetime.now(dt.timezone.utc)
+        rec = (
+            db.execute(
+                select(OtpCode)
+                .where((OtpCode.identifier == identifier) & (OtpCode.purpose == purpose) & (OtpCode.expires_at > now))
+                .order_by(OtpCode.id.desc())
+                .limit(1)
+            )
+            .scalars()
+            .first()
+        )
+        if not rec or not _code_matches(rec.code, identifier=identifier, purpose=purpose, code=code):
+            return False
+        # One-time: consume the OTP.
+        db.execute(delete(OtpCode).where(OtpCode.id == rec.id))
+        return True
+
+    def purge_expired(self, db: Session, *, batch_size: int) -> int:
+        """Delete one batch of expired rows. Returns rows deleted."""
+        now = dt.datetime.now(dt.timezone.utc)
+        ids = db.execute(select(OtpCode.id).where(OtpCode.expires_at <= now).limit(int(batch_size))).scalars().all()
+        if ids:
+            db.execute(delete(OtpCode).where(OtpCode.id.in_(ids)))
+        return len(ids)
+
+
+class MemoryOtpStore:
+    """
+    In-process TTL map keyed by (identifier, purpose). O(1) issue/verify with no DB round-trips.
+    Only suitable for single-process deployments: codes are lost on restart and are not
+    visible to other workers.
+    """
+
+    name = "memory"
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._codes: dict[tuple[str, str], tuple[str, dt.datetime]] = {}
+
+    def issue(self, db: Session | None, *, identifier: str, purpose: str, code: str, expires_at: dt.datetime) -> None:
+        with self._lock:
+            self._codes[(identifier, purpose)] = (hash_otp_code(identifier=identifier, purpose=purpose, code=code), _as_utc(expires_at))
+
+    def consume(self, db: Session | None, *, identifier: str, purpose: str, code: str) -> bool:
+        now = dt.datetime.now(dt.timezone.utc)
+        with self._lock:
+            rec = self._codes.get((identifier, purpose))
+            if not rec or rec[1] <= now:
+                return False
+            if not _code_matches(rec[0], identifier=identifier, purpose=purpose, code=code):
+                return False
+            del self._codes[(identifier, purpose)]
+            return True
+
+    def purge_expired(self, db: Session | None, *, batch_size: int) -> int:
+        now = dt.datetime.now(dt.timezone.utc)
+        with self._lock:
+            expired = [k for k, (_, exp) in self._codes.items() if exp <= now][: int(batch_size)]
+            for k in expired:
+                del self._codes[k]
+        return len(expired)
+
+
+def _make_store():
+    if otp_backend() in {"memory", "inmemory", "local"}:
+        return MemoryOtpStore()
+    return DatabaseOtpStore()
+
+
+otp_store: Any = _make_store()
+
+
+def purge_expired_otps(*, batch_size: int | None = None, max_batches: int = 100) -> int:
+    """
+    Batched purge of expired OTPs. Each batch commits separately to keep locks short.
+    """
+    from app.db import session_scope
+
+    size = int(batch_size or otp_purge_batch_size())
+    total = 0
+    for _ in range(max(1, int(max_batches))):
+        with session_scope() as db:
+            n = otp_store.purge_expired(db, batch_size=size)
+        total += n
+        if n < size:
+            break
+    return total
+
+
+_purger_started = False
+_purger_lock = threading.Lock()
+
+
+def start_otp_purger() -> None:
+    """
+    Start the periodic purge thread (once per process). Every worker may run one;
+    deletes are idempotent.
+    """
+    global _purger_started
+    interval = otp_purge_interval_seconds()
+    if interval <= 0:
+        return
+    with _purger_lock:
+        if _purger_started:
+            return
+        _purger_started = True
+
+    def _loop() -> None:
+        while True:
+            time.sleep(interval)
+            try:
+                n = purge_expired_otps()
+                if n:
+                    logger.info("purged %s expired OTP codes", n)
+            except Exception:
+                # DB may be unavailable/unmigrated; try again next interval.
+                logger.warning("OTP purge failed", exc_info=True)
+
+    threading.Thread(target=_loop, name="otp-purger", daemon=True).start()
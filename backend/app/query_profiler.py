@@ -0,0 +1,173 @@
+from __future__ import annotations
+
+import contextvars
+import logging
+import re
+import threading
+from typing import Any
+
+from app.config import db_n_plus_one_threshold, db_slow_query_ms
+from app.security import decode_access_token
+from app.sql_events import ExecutedStatement, observe_statements
+
+logger = logging.getLogger(__name__)
+
+PROFILE_HEADER = "x-query-profile"
+_MAX_LOGGED_SQL = 2000
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"\b\d+(?:\.\d+)?\b")
+# Placeholders across drivers: ?, %s, %(name)s, $1, :name
+_PLACEHOLDER = re.compile(r"%\(\w+\)s|%s|\$\d+|(?<![:\w]):\w+|\?")
+_PLACEHOLDER_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_sql(statement: str) -> str:
+    """
+    Statement shape with every literal and bind placeholder replaced by `?` and IN lists
+    collapsed, so no parameter values reach the logs and loops over ids share one shape.
+    """
+    sql = _WHITESPACE.sub(" ", statement or "").strip()
+    sql = _STRING_LITERAL.sub("?", sql)
+    sql = _PLACEHOLDER.sub("?", sql)
+    sql = _NUMBER_LITERAL.sub("?", sql)
+    sql = _PLACEHOLDER_LIST.sub("(?...)", sql)
+    if len(sql) > _MAX_LOGGED_SQL:
+        sql = sql[:_MAX_LOGGED_SQL] + "..."
+    return sql
+
+
+class QueryProfile:
+    """Statements seen during one request, keyed by compiled SQL (params are separate)."""
+
+    __slots__ = ("scope", "detailed", "count", "seconds", "statements", "_lock")
+
+    def __init__(self, scope: dict[str, Any], *, detailed: bool = False) -> None:
+        self.scope = scope
+        self.detailed = detailed
+        self.count = 0
+        self.seconds = 0.0
+        # statement -> [executions, seconds]; SQLAlchemy reuses cached compiled strings, so
+        # this is one dict update per statement.
+        self.statements: dict[str, list[float]] = {}
+        self._lock = threading.Lock()
+
+    def record(self, statement: str, elapsed: float) -> None:
+        with self._lock:
+            self.count += 1
+            self.seconds += elapsed
+            entry = self.statements.get(statement)
+            if entry is None:
+                self.statements[statement] = [1, elapsed]
+            else:
+                entry[0] += 1
+                entry[1] += elapsed
+
+    def label(self) -> str:
+        route = self.scope.get("route")
+        path = getattr(route, "path", None) or self.scope.get("path", "")
+        return f"{self.scope.get('method', '')} {path}"
+
+    def shapes(self) -> list[tuple[str, int, float]]:
+        """(normalized SQL, executions, seconds), most executed first."""
+        merged: dict[str, list[float]] = {}
+        with self._lock:
+            items = list(self.statements.items())
+        for statement, (n, secs) in items:
+            entry = merged.setdefault(normalize_sql(statement), [0, 0.0])
+            entry[0] += n
+            entry[1] += secs
+        return sorted(((sql, int(n), secs) for sql, (n, secs) in merged.items()), key=lambda x: (-x[1], -x[2]))
+
+    def repeated(self, threshold: int) -> list[tuple[str, int, float]]:
+        if threshold <= 0:
+            return []
+        with self._lock:
+            if not any(n >= threshold for n, _secs in self.statements.values()):
+                return []
+        return [s for s in self.shapes() if s[1] >= threshold]
+
+
+_current: contextvars.ContextVar[QueryProfile | None] = contextvars.ContextVar("query_profile", default=None)
+
+
+def current_profile() -> QueryProfile | None:
+    return _current.get()
+
+
+def _record_statement(executed: ExecutedStatement) -> None:
+    profile = _current.get()
+    if profile is not None:
+        profile.record(executed.statement, executed.seconds)
+    slow_ms = db_slow_query_ms()
+    if slow_ms > 0 and executed.seconds * 1000.0 >= slow_ms:
+        where = profile.label() if profile is not None else "background"
+        logger.warning("slow query %.1fms [%s]: %s", executed.seconds * 1000.0, where, normalize_sql(executed.statement))
+
+
+def install_query_profiler() -> None:
+    """Slow-query logging and per-request statement tracking on every engine."""
+    observe_statements(_record_statement)
+
+
+def _is_admin_bearer(authorization: str) -> bool:
+    scheme, _, token = (authorization or "").partition(" ")
+    if scheme.lower() != "bearer" or not token.strip():
+        return False
+    try:
+        return decode_access_token(token.strip()).get("role") == "admin"
+    except Exception:
+        return False
+
+
+class QueryProfilerMiddleware:
+    """
+    Tracks the statements of every request and warns when one statement shape repeats
+    DB_N_PLUS_ONE_THRESHOLD times (an N+1 loop).
+
+    Admins can send `X-Query-Profile: 1` to get X-Query-Count / X-Query-Time-Ms /
+    X-Query-Repeated response headers and a per-shape breakdown in the log.
+    """
+
+    def __init__(self, app: Any) -> None:
+        self.app = app
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        detailed = False
+        headers = dict(scope.get("headers") or [])
+        if headers.get(PROFILE_HEADER.encode(), b"").strip() not in (b"", b"0"):
+            detailed = _is_admin_bearer(headers.get(b"authorization", b"").decode("latin-1"))
+        profile = QueryProfile(scope, detailed=detailed)
+        token = _current.set(profile)
+        threshold = db_n_plus_one_threshold()
+
+        async def send_wrapper(message) -> None:
+            if detailed and message["type"] == "http.response.start":
+                repeated = profile.repeated(threshold)
+                extra = [
+                    (b"x-query-count", str(profile.count).encode()),
+                    (b"x-query-time-ms", f"{profile.seconds * 1000.0:.1f}".encode()),
+                    (b"x-query-repeated", str(len(repeated)).encode()),
+                ]
+                message = {**message, "headers": list(message.get("headers") or []) + extra}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _current.reset(token)
+            for sql, n, secs in profile.repeated(threshold):
+                logger.warning("possible N+1 [%s]: %dx (%.1fms) %s", profile.label(), n, secs * 1000.0, sql)
+            if detailed:
+                lines = [f"{n}x {secs * 1000.0:.1f}ms {sql}" for sql, n, secs in profile.shapes()]
+                logger.info(
+                    "query profile [%s]: %d statements, %.1fms\n%s",
+                    profile.label(),
+                    profile.count,
+                    profile.seconds * 1000.0,
+                    "\n".join(lines),
+                )
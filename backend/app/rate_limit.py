@@ -1,34 +1,241 @@
 from __future__ import annotations
 
+import hashlib
+import logging
+import math
 import time
-from collections import defaultdict, deque
 from threading import Lock
+from typing import Any
 
 from fastapi import HTTPException
 
+from app.config import database_url, rate_limit_backend, rate_limit_db_pool_size
+from app.metrics import RATE_LIMIT_REJECTIONS, rate_limit_rule
+
+logger = logging.getLogger(__name__)
+
+
+# GCRA (generic cell rate algorithm): `limit` events per `window_seconds` means one event
+# "costs" window/limit seconds and a key may run at most `window_seconds` ahead of now.
+# The only state per key is its theoretical arrival time (TAT), so memory is O(1) per key,
+# and a key whose TAT is in the past is indistinguishable from a brand-new key (safe to evict).
+
+
+def _gcra_step(tat: float | None, *, now: float, limit: int, window_seconds: float) -> tuple[bool, float, float]:
+    """
+    Returns (allowed, new_tat, retry_after_seconds).
+    """
+    interval = float(window_seconds) / max(1, int(limit))
+    base = max(float(tat), now) if tat is not None else now
+    new_tat = base + interval
+    if new_tat - now > float(window_seconds):
+        return False, base, new_tat - now - float(window_seconds)
+    return True, new_tat, 0.0
+
+
+class MemoryBackend:
+    """
+    Per-process GCRA buckets, sharded to keep lock contention low.
+    Idle keys are swept every `sweep_every` hits per shard.
+    """
+
+    name = "memory"
+
+    def __init__(self, *, shards: int = 16, sweep_every: int = 2048) -> None:
+        self._shards: list[tuple[Lock, dict[str, float]]] = [(Lock(), {}) for _ in range(max(1, int(shards)))]
+        self._hits_since_sweep = [0] * len(self._shards)
+        self._sweep_every = max(1, int(sweep_every))
+
+    def allow(self, key: str, *, limit: int, window_seconds: float) -> tuple[bool, float]:
+        idx = hash(key) % len(self._shards)
+        lock, tats = self._shards[idx]
+        now = time.monotonic()
+        with lock:
+            ok, new_tat, retry_after = _gcra_step(tats.get(key), now=now, limit=limit, window_seconds=window_seconds)
+            if ok:
+                tats[key] = new_tat
+            self._hits_since_sweep[idx] += 1
+            if self._hits_since_sweep[idx] >= self._sweep_every:
+                self._hits_since_sweep[idx] = 0
+                for k in [k for k, t in tats.items() if t <= now]:
+                    del tats[k]
+        return ok, retry_after
+
+    def key_count(self) -> int:
+        return sum(len(tats) for _, tats in self._shards)
+
+
+class DatabaseBackend:
+    """
+    Shared GCRA buckets in the `rate_limit_buckets` table (Postgres or SQLite).
+
+    Each hit is a single atomic UPSERT: the conditional ON CONFLICT ... WHERE only advances
+    the TAT when the event is allowed, and RETURNING tells us whether it was. Uses wall-clock
+    time since buckets are shared across processes. Runs on a small engine of its own
+    (RATE_LIMIT_DB_POOL_SIZE): the calling request already holds a connection from the main
+    pool, so sharing it could leave every request waiting on a second one.
+    """
+
+    name = "database"
+
+    def __init__(self, *, purge_every: int = 5000, purge_batch: int = 1000) -> None:
+        self._purge_every = max(1, int(purge_every))
+        self._purge_batch = max(1, int(purge_batch))
+        self._hits = 0
+        self._lock = Lock()
+        self._engine = None
+
+    @property
+    def engine(self):
+        with self._lock:
+            if self._engine is None:
+                from app.db import ENGINE, build_engine
+
+                # A second in-memory SQLite engine would open a different, empty database.
+                in_memory = ENGINE.dialect.name == "sqlite" and (ENGINE.url.database or "") in {"", ":memory:"}
+                self._engine = ENGINE if in_memory else build_engine(database_url(), pool_size=rate_limit_db_pool_size())
+            return self._engine
+
+    def allow(self, key: str, *, limit: int, window_seconds: float) -> tuple[bool, float]:
+        from sqlalchemy import func, select
+
+        from app.models import RateLimitBucket
+
+        engine = self.engine
+        dname = engine.dialect.name
+        if dname == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert
+
+            greatest = func.greatest
+        elif dname == "sqlite":
+            from sqlalchemy.dialects.sqlite import insert
+
+            # SQLite's multi-argument max() is a scalar function.
+            greatest = func.max
+        else:
+            raise RuntimeError(f"Database rate limiting is not supported on {dname}")
+
+        now = time.time()
+        window = float(window_seconds)
+        interval = window / max(1, int(limit))
+        t = RateLimitBucket.__table__
+        new_tat = greatest(t.c.tat, now) + interval
+        stmt = (
+            insert(t)
+            .values(key=key, tat=now + interval)
+            .on_conflict_do_update(index_elements=[t.c.key], set_={"tat": new_tat}, where=(new_tat - now <= window))
+            .returning(t.c.tat)
+        )
+        with engine.begin() as conn:
+            row = conn.execute(stmt).first()
+            retry_after = 0.0
+            if row is None:
+                cur = conn.execute(select(t.c.tat).where(t.c.key == key)).scalar()
+                retry_after = max(0.0, float(cur or now) + interval - now - window)
+        self._maybe_purge(now)
+        return row is not None, retry_after
+
+    def _maybe_purge(self, now: float) -> None:
+        with self._lock:
+            self._hits += 1
+            if self._hits < self._purge_every:
+                return
+            self._hits = 0
+        self.purge_idle(now=now)
+
+    def purge_idle(self, *, now: float | None = None) -> int:
+        """Delete one batch of idle buckets (TAT in the past). Returns rows deleted."""
+        from sqlalchemy import delete, select
+
+        from app.models import RateLimitBucket
+
+        t = RateLimitBucket.__table__
+        cutoff = time.time() if now is None else float(now)
+        try:
+            with self.engine.begin() as conn:
+                keys = conn.execute(select(t.c.key).where(t.c.tat < cutoff).limit(self._purge_batch)).scalars().all()
+                if not keys:
+                    return 0
+                conn.execute(delete(t).where(t.c.key.in_(keys)))
+                return len(keys)
+        except Exception:
+            logger.warning("rate limit bucket purge failed", exc_info=True)
+            return 0
+
+    def key_count(self) -> int | None:
+        return None
+
+
+def _make_backend(name: str):
+    if name in {"database", "db", "sql"}:
+        return DatabaseBackend()
+    return MemoryBackend()
+
 
 class RateLimiter:
     """
-    Very small in-memory rate limiter (per-process).
+    Rate limiter with a pluggable backend (see `RATE_LIMIT_BACKEND`).
 
-    Production note: for multi-instance deployments, replace with Redis-based limits.
+    If the shared backend is unavailable (e.g. table not migrated yet), we fall back to the
+    in-process backend rather than failing auth flows.
     """
 
-    def __init__(self) -> None:
+    def __init__(self, backend: Any | None = None) -> None:
+        self._backend = backend
+        self._fallback = MemoryBackend()
         self._lock = Lock()
-        self._events: dict[str, deque[float]] = defaultdict(deque)
+        self._hits = 0
+        self._rejected = 0
+        self._backend_errors = 0
+
+    @property
+    def backend(self):
+        if self._backend is None:
+            self._backend = _make_backend(rate_limit_backend())
+        return self._backend
+
+    @staticmethod
+    def _storage_key(key: str) -> str:
+        # Keys embed user-supplied identifiers; keep storage bounded.
+        if len(key) <= 200:
+            return key
+        return "sha256:" + hashlib.sha256(key.encode("utf-8")).hexdigest()
 
     def hit(self, *, key: str, limit: int, window_seconds: int, detail: str = "Too many requests") -> None:
-        now = time.monotonic()
-        win_start = now - float(window_seconds)
+        skey = self._storage_key(key)
+        try:
+            ok, retry_after = self.backend.allow(skey, limit=int(limit), window_seconds=float(window_seconds))
+        except Exception:
+            with self._lock:
+                self._backend_errors += 1
+            logger.warning("rate limit backend %s failed; using in-process fallback", self.backend.name, exc_info=True)
+            ok, retry_after = self._fallback.allow(skey, limit=int(limit), window_seconds=float(window_seconds))
         with self._lock:
-            q = self._events[key]
-            while q and q[0] < win_start:
-                q.popleft()
-            if len(q) >= int(limit):
-                raise HTTPException(status_code=429, detail=detail)
-            q.append(now)
+            self._hits += 1
+            if not ok:
+                self._rejected += 1
+        if not ok:
+            RATE_LIMIT_REJECTIONS.inc(rate_limit_rule(key))
+            raise HTTPException(status_code=429, detail=detail, headers={"Retry-After": str(max(1, math.ceil(retry_after)))})
 
+    async def hit_async(self, *, key: str, limit: int, window_seconds: int, detail: str = "Too many requests") -> None:
+        """hit() for async handlers; the shared (database) backend runs in the threadpool."""
+        if isinstance(self.backend, MemoryBackend):
+            self.hit(key=key, limit=limit, window_seconds=window_seconds, detail=detail)
+            return
+        from starlette.concurrency import run_in_threadpool
+
+        await run_in_threadpool(lambda: self.hit(key=key, limit=limit, window_seconds=window_seconds, detail=detail))
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "backend": self.backend.name,
+                "hits_total": self._hits,
+                "rejected_total": self._rejected,
+                "backend_errors_total": self._backend_errors,
+                "keys": self.backend.key_count(),
+            }
 
-limiter = RateLimiter()
 
+limiter = RateLimiter()
@@ -0,0 +1,12 @@
+from __future__ import annotations
+
+from fastapi import APIRouter
+from fastapi.responses import ORJSONResponse
+
+
+def api_router() -> APIRouter:
+    """
+    Router for one subsystem, with the app's ORJSON response class. app.main includes it as
+    is (see _include_router): declare prefixes, tags and dependencies per route.
+    """
+    return APIRouter(default_response_class=ORJSONResponse)
@@ -0,0 +1,707 @@
+from __future__ import annotations
+
+import datetime as dt
+import os
+from typing import Annotated, Any, Callable
+
+from fastapi import Depends, HTTPException, Query
+from fastapi.responses import ORJSONResponse
+from sqlalchemy import delete, func, select, update as sa_update
+from sqlalchemy.orm import Session, selectinload
+
+from app.config import admin_bulk_max_ids, uploads_dir
+from app.db import SessionRunner, pool_stats, read_routing_stats
+from app.deps import get_current_read_user, get_current_user, get_db, get_db_runner, get_read_db
+from app.google_auth import google_id_token_verifier
+from app.identifiers import resolve_user
+from app.listings import property_out, split_csv_values
+from app.media_urls import public_media_url
+from app.models import (
+    ContactUsage,
+    FreeContactUsage,
+    ModerationLog,
+    ModerationLogArchive,
+    Property,
+    PropertyImage,
+    SavedProperty,
+    SubscriptionPlan,
+    User,
+    UserSubscription,
+)
+from app.rate_limit import limiter
+from app.routers import api_router
+from app.routers.owner import owner_update_property
+from app.schemas import AdminLoginIn, AllowDuplicatesIn, BulkModerateIn, ModerateIn, PropertyUpdateIn
+from app.security import create_access_token, password_hashing_stats
+from app.services import check_password_async, ensure_plans, log_moderation, log_moderations, norm_key
+from app.utils.cloudinary_storage import destroy as cloudinary_destroy
+
+
+# Attached by app.main.create_app().
+router = api_router()
+
+
+# Moderation queues are keyset-paginated, newest first: `cursor` is the `next_cursor` of the
+# previous page (the last id it returned). Backed by the (status, id) indexes.
+def _queue_page(stmt, id_col, cursor: int | None, limit: int) -> Any:
+    if cursor is not None:
+        stmt = stmt.where(id_col < int(cursor))
+    return stmt.order_by(id_col.desc()).limit(int(limit) + 1)
+
+
+def _next_cursor(rows: list[Any], limit: int, row_id: Callable[[Any], int]) -> int | None:
+    return row_id(rows[int(limit) - 1]) if len(rows) > int(limit) else None
+
+
+@router.get("/admin/properties/pending")
+def admin_pending_properties(
+    me: Annotated[User, Depends(get_current_user)],
+    db: Annotated[Session, Depends(get_db)],
+    cursor: int | None = Query(default=None, ge=1),
+    limit: int = Query(default=50, ge=1, le=200),
+):
+    if me.role != "admin":
+        raise HTTPException(status_code=403, detail="Admin only")
+    stmt = (
+        select(Property, User)
+        .options(selectinload(Property.images))
+        .join(User, Property.owner_id == User.id)
+        .where(Property.status == "pending")
+    )
+    rows = db.execute(_queue_page(stmt, Property.id, cursor, limit)).all()
+    items = [property_out(p, owner=u, include_unapproved_images=True, include_internal=True) for (p, u) in rows[:limit]]
+    return {"items": items, "next_cursor": _next_cursor(rows, limit, lambda r: r[0].id)}
+
+
+@router.get("/admin/pending/counts")
+def admin_pending_counts(
+    me: Annotated[User, Depends(get_current_user)],
+    db: Annotated[Session, Depends(get_db)],
+) -> dict[str, Any]:
+    """Queue sizes for the admin UI badges (one round-trip, index-only counts)."""
+    if me.role != "admin":
+        raise HTTPException(status_code=403, detail="Admin only")
+    row = db.execute(
+        select(
+            select(func.count()).select_from(Property).where(Property.status == "pending").scalar_subquery(),
+            select(func.count()).select_from(User).where((User.role == "owner") & (User.approval_status == "pending")).scalar_subquery(),
+            select(func.count()).select_from(PropertyImage).where(PropertyImage.status == "pending").scalar_subquery(),
+        )
+    ).one()
+    return {"properties": int(row[0] or 0), "owners": int(row[1] or 0), "images": int(row[2] or 0)}
+
+
+@router.get("/admin/properties")
+def admin_list_properties(
+    db: Annotated[Session, Depends(get_read_db)],
+    me: Annotated[User, Depends(get_current_read_user)],
+    q: str | None = Query(default=None),
+    rent_sale: str | None = Query(default=None),
+    property_type: str | None = Query(default=None),
+    max_price: int | None = Query(default=None),
+    state: str | None = Query(default=None),
+    district: str | None = Query(default=None),
+    area: str | None = Query(default=None),
+    status: str | None = Query(default=None),
+    limit: int = Query(default=50, ge=1, le=200),
+    sort_budget: str | None = Query(default=None),  # top|bottom|asc|desc
+    posted_within_days: int | None = Query(default=None, ge=1, le=365),
+):
+    """
+    Admin-only listing endpoint with the same filters as the public `/properties`,
+    but without the "approved only" restriction.
+    """
+    if me.role != "admin":
+        raise HTTPException(status_code=403, detail="Admin only")
+
+    state_in = (state or "").strip()
+    district_in = (district or "").strip()
+    area_in = (area or "").strip()
+    state_norm = norm_key(state_in)
+    district_norm = norm_key(district_in)
+    area_list = split_csv_values(area_in)
+    area_norms = [norm_key(x) for x in area_list]
+    area_norms = [x for x in area_norms if x]
+    area_norm = norm_key(area_in)
+
+    stmt = (
+        select(Property, User)
+        .options(selectinload(Property.images))
+        .join(User, Property.owner_id == User.id)
+    )
+
+    st = (status or "").strip().lower()
+    if st and st != "any":
+        stmt = stmt.where(Property.status == st)
+
+    sb = (sort_budget or "").strip().lower()
+    if sb in {"top", "desc", "high"}:
+        stmt = stmt.order_by(Property.price.desc(), Property.id.desc())
+    elif sb in {"bottom", "asc", "low"}:
+        stmt = stmt.order_by(Property.price.asc(), Property.id.desc())
+    else:
+        stmt = stmt.order_by(Property.id.desc())
+
+    if state_norm:
+        stmt = stmt.where(Property.state_normalized == state_norm)
+    if district_norm:
+        stmt = stmt.where(Property.district_normalized == district_norm)
+    if area_norms:
+        stmt = stmt.where(Property.area_normalized.in_(area_norms))
+    elif area_norm:
+        stmt = stmt.where(Property.area_normalized == area_norm)
+    if q:
+        q_like = f"%{q.strip()}%"
+        stmt = stmt.where((Property.title.ilike(q_like)) | (Property.location.ilike(q_like)))
+    if rent_sale:
+        stmt = stmt.where(Property.rent_sale == rent_sale)
+    if property_type:
+        stmt = stmt.where(Property.property_type == property_type)
+    if max_price is not None:
+        stmt = stmt.where(Property.price <= int(max_price))
+    if posted_within_days:
+        now = dt.datetime.now(dt.timezone.utc)
+        stmt = stmt.where(Property.created_at >= (now - dt.timedelta(days=int(posted_within_days))))
+
+    rows = db.execute(stmt.limit(int(limit))).all()
+    items: list[dict[str, Any]] = []
+    for (p, u) in rows:
+        items.append(property_out(p, owner=u, include_unapproved_images=True, include_internal=True))
+    return ORJSONResponse({"items": items})
+
+
+@router.patch("/admin/properties/{property_id:int}")
+def admin_update_property(
+    property_id: int,
+    data: PropertyUpdateIn,
+    me: Annotated[User, Depends(get_current_user)],
+    db: Annotated[Session, Depends(get_db)],
+):
+    if me.role != "admin":
+        raise HTTPException(status_code=403, detail="Admin only")
+    # Reuse owner/admin update logic (admin can edit any ad).
+    return owner_update_property(property_id=property_id, data=data, me=me, db=db)
+
+
+@router.delete("/admin/properties/{property_id:int}")
+def admin_delete_property(
+    property_id: int,
+    me: Annotated[User, Depends(get_current_user)],
+    db: Annotated[Session, Depends(get_db)],
+):
+    if me.role != "admin":
+        raise HTTPException(status_code=403, detail="Admin only")
+    p = db.get(Property, int(property_id))
+    if not p:
+        raise HTTPException(status_code=404, detail="Property not found")
+
+    # Best-effort: delete uploaded media (Cloudinary and/or local disk).
+    try:
+        for img in (p.images or []):
+            if (img.cloudinary_public_id or "").strip():
+                rt = "video" if str(img.content_type or "").lower().startswith("video/") else "image"
+                cloudinary_destroy(public_id=img.cloudinary_public_id, resource_type=rt)
+            fp = (img.file_path or "").strip().lstrip("/")
+            if fp and not fp.startswith("http"):
+                disk_path = os.path.join(uploads_dir(), fp)
+                try:
+                    if os.path.exists(disk_path):
+                        os.remove(disk_path)
+                except Exception:
+                    pass
+    except Exception:
+        pass
+
+    # Remove dependent rows first (avoid FK issues).
+    db.execute(delete(FreeContactUsage).where(FreeContactUsage.property_id == int(property_id)))
+    db.execute(delete(ContactUsage).where(ContactUsage.property_id == int(property_id)))
+    db.execute(delete(PropertyImage).where(PropertyImage.property_id == int(property_id)))
+    db.execute(delete(SavedProperty).where(SavedProperty.property_id == int(property_id)))
+    db.execute(delete(Property).where(Property.id == int(property_id)))
+    log_moderation(db, actor_user_id=me.id, entity_type="property", entity_id=int(property_id), action="delete", reason="")
+    return {"ok": True}
+
+
+@router.post("/admin/properties/{property_id:int}/approve")
+def admin_approve_property(
+    property_id: int,
+    me: Annotated[User, Depends(get_current_user)],
+    db: Annotated[Session, Depends(get_db)],
+    data: ModerateIn | None = None,
+):
+    if me.role != "admin":
+        raise HTTPException(status_code=403, detail="Admin only")
+    p = db.get(Property, int(property_id))
+    if not p:
+        raise HTTPException(status_code=404, detail="Property not found")
+    p.status = "approved"
+    p.moderation_reason = ""
+    p.updated_at = dt.datetime.now(dt.timezone.utc)
+    db.add(p)
+    log_moderation(db, actor_user_id=me.id, entity_type="property", entity_id=p.id, action="approve", reason="")
+    return {"ok": True}
+
+
+@router.post("/admin/properties/{property_id:int}/reject")
+def admin_reject_property(
+    property_id: int,
+    me: Annotated[User, Depends(get_current_user)],
+    db: Annotated[Session, Depends(get_db)],
+    data: ModerateIn | None = None,
+):
+    if me.role != "admin":
+        raise HTTPException(status_code=403, detail="Admin only")
+    p = db.get(Property, int(property_id))
+    if not p:
+        raise HTTPException(status_code=404, detail="Property not found")
+    p.status = "rejected"
+    p.moderation_reason = (data.reason if data else "") or ""
+    p.updated_at = dt.datetime.now(dt.timezone.utc)
+    db.add(p)
+    log_moderation(db, actor_user_id=me.id, entity_type="property", entity_id=p.id, action="reject", reason=p.moderation_reason)
+    return {"ok": True}
+
+
+@router.post("/admin/properties/{property_id:int}/suspend")
+def admin_suspend_property(
+    property_id: int,
+    me: Annotated[User, Depends(get_current_user)],
+    db: Annotated[Session, Depends(get_db)],
+    data: ModerateIn | None = None,
+):
+    if me.role != "admin":
+        raise HTTPException(status_code=403, detail="Admin only")
+    p = db.get(Property, int(property_id))
+    if not p:
+        raise HTTPException(status_code=404, detail="Property not found")
+    p.status = "suspended"
+    p.moderation_reason = (data.reason if data else "") or ""
+    p.updated_at = dt.datetime.now(dt.timezone.utc)
+    db.add(p)
+    log_moderation(db, actor_user_id=me.id, entity_type="property", entity_id=p.id, action="suspend", reason=p.moderation_reason)
+    return {"ok": True}
+
+
+# One UPDATE ... WHERE id IN (...) RETURNING id per batch, then one multi-row log INSERT.
+_BULK_STATUSES = {"approve": "approved", "reject": "rejected", "suspend": "suspended"}
+
+
+def _bulk_moderate(
+    db: Session,
+    me: User,
+    data: BulkModerateIn,
+    *,
+    model: Any,
+    entity_type: str,
+    not_found: str,
+    values: Callable[[str, str], dict[str, Any]],
+    where: tuple[Any, ...] = (),
+) -> dict[str, Any]:
+    action = (data.action or "").strip().lower()
+    status = _BULK_STATUSES.get(action)
+    if status is None:
+        raise HTTPException(status_code=400, detail="Invalid action (approve, reject or suspend)")
+    ids = list(dict.fromkeys(int(i) for i in data.ids))
+    limit = admin_bulk_max_ids()
+    if len(ids) > limit:
+        raise HTTPException(status_code=400, detail=f"Too many ids (max {limit})")
+    reason = "" if action == "approve" else (data.reason or "")
+    stmt = (
+        sa_update(model)
+        .where(model.id.in_(ids), *where)
+        .values(**values(status, reason))
+        .returning(model.id)
+        .execution_options(synchronize_session=False)
+    )
+    updated = set(db.execute(stmt).scalars())
+    done = [i for i in ids if i in updated]
+    log_moderations(db, actor_user_id=me.id, entity_type=entity_type, entity_ids=done, action=action, reason=reason)
+    return {
+        "ok": True,
+        "action": action,
+        "updated": len(done),
+        "results": [{"id": i, "ok": True} if i in updated else {"id": i, "ok": False, "detail": not_found} for i in ids],
+    }
+
+
+@router.post("/admin/properties/bulk-moderate")
+def admin_bulk_moderate_properties(
+    data: BulkModerateIn,
+    me: Annotated[User, Depends(get_current_user)],
+    db: Annotated[Session, Depends(get_db)],
+):
+    """Approve/reject/suspend many listings at once; per-id outcomes in `results`."""
+    if me.role != "admin":
+        raise HTTPException(status_code=403, detail="Admin only")
+    now = dt.datetime.now(dt.timezone.utc)
+    return _bulk_moderate(
+        db,
+        me,
+        data,
+        model=Property,
+        entity_type="property",
+        not_found="Property not found",
+        values=lambda status, reason: {"status": status, "moderation_reason": reason, "updated_at": now},
+    )
+
+
+@router.post("/admin/properties/{property_id:int}/allow-duplicates")
+def admin_allow_duplicates(
+    property_id: int,
+    me: Annotated[User, Depends(get_current_user)],
+    db: Annotated[Session, Depends(get_db)],
+    data: AllowDuplicatesIn,
+):
+    if me.role != "admin":
+        raise HTTPException(status_code=403, detail="Admin only")
+    p = db.get(Property, int(property_id))
+    if not p:
+        raise HTTPException(status_code=404, detail="Property not found")
+    changed = False
+    if data.allow_duplicate_address is not None:
+        p.allow_duplicate_address = bool(data.allow_duplicate_address)
+        changed = True
+    if data.allow_duplicate_phone is not None:
+        p.allow_duplicate_phone = bool(data.allow_duplicate_phone)
+        changed = True
+    if changed:
+        p.updated_at = dt.datetime.now(dt.timezone.utc)
+        db.add(p)
+        log_moderation(
+            db,
+            actor_user_id=me.id,
+            entity_type="property",
+            entity_id=p.id,
+            action="allow_duplicates",
+            reason=(data.reason or "").strip(),
+        )
+    return {
+        "ok": True,
+        "allow_duplicate_address": p.allow_duplicate_address,
+        "allow_duplicate_phone": p.allow_duplicate_phone,
+    }
+
+
+@router.get("/admin/owners/pending")
+def admin_pending_owners(
+    me: Annotated[User, Depends(get_current_user)],
+    db: Annotated[Session, Depends(get_db)],
+    cursor: int | None = Query(default=None, ge=1),
+    limit: int = Query(default=50, ge=1, le=200),
+):
+    if me.role != "admin":
+        raise HTTPException(status_code=403, detail="Admin only")
+    stmt = select(User).where((User.role == "owner") & (User.approval_status == "pending"))
+    owners = db.execute(_queue_page(stmt, User.id, cursor, limit)).scalars().all()
+    return {
+        "items": [
+            {
+                "id": o.id,
+                "email": o.email,
+                "username": o.username,
+                "phone": o.phone,
+                "name": o.name,
+                "state": o.state,
+                "district": o.district,
+                "owner_category": o.owner_category,
+                "company_name": o.company_name,
+                "company_description": o.company_description,
+                "company_address": o.company_address,
+                "approval_status": o.approval_status,
+                "approval_reason": o.approval_reason,
+            }
+            for o in owners[:limit]
+        ],
+        "next_cursor": _next_cursor(owners, limit, lambda o: o.id),
+    }
+
+
+@router.post("/admin/owners/{owner_id}/approve")
+def admin_approve_owner(
+    owner_id: int,
+    me: Annotated[User, Depends(get_current_user)],
+    db: Annotated[Session, Depends(get_db)],
+    data: ModerateIn | None = None,
+):
+    if me.role != "admin":
+        raise HTTPException(status_code=403, detail="Admin only")
+    u = db.get(User, int(owner_id))
+    if not u or u.role != "owner":
+        raise HTTPException(status_code=404, detail="Owner not found")
+    u.approval_status = "approved"
+    u.approval_reason = ""
+    db.add(u)
+    log_moderation(db, actor_user_id=me.id, entity_type="user", entity_id=u.id, action="approve", reason="")
+    return {"ok": True}
+
+
+@router.post("/admin/owners/{owner_id}/reject")
+def admin_reject_owner(
+    owner_id: int,
+    me: Annotated[User, Depends(get_current_user)],
+    db: Annotated[Session, Depends(get_db)],
+    data: ModerateIn | None = None,
+):
+    if me.role != "admin":
+        raise HTTPException(status_code=403, detail="Admin only")
+    u = db.get(User, int(owner_id))
+    if not u or u.role != "owner":
+        raise HTTPException(status_code=404, detail="Owner not found")
+    u.approval_status = "rejected"
+    u.approval_reason = (data.reason if data else "") or ""
+    db.add(u)
+    log_moderation(db, actor_user_id=me.id, entity_type="user", entity_id=u.id, action="reject", reason=u.approval_reason)
+    return {"ok": True}
+
+
+@router.post("/admin/owners/{owner_id}/suspend")
+def admin_suspend_owner(
+    owner_id: int,
+    me: Annotated[User, Depends(get_current_user)],
+    db: Annotated[Session, Depends(get_db)],
+    data: ModerateIn | None = None,
+):
+    if me.role != "admin":
+        raise HTTPException(status_code=403, detail="Admin only")
+    u = db.get(User, int(owner_id))
+    if not u or u.role != "owner":
+        raise HTTPException(status_code=404, detail="Owner not found")
+    u.approval_status = "suspended"
+    u.approval_reason = (data.reason if data else "") or ""
+    db.add(u)
+    log_moderation(db, actor_user_id=me.id, entity_type="user", entity_id=u.id, action="suspend", reason=u.approval_reason)
+    return {"ok": True}
+
+
+@router.post("/admin/owners/bulk-moderate")
+def admin_bulk_moderate_owners(
+    data: BulkModerateIn,
+    me: Annotated[User, Depends(get_current_user)],
+    db: Annotated[Session, Depends(get_db)],
+):
+    if me.role != "admin":
+        raise HTTPException(status_code=403, detail="Admin only")
+    return _bulk_moderate(
+        db,
+        me,
+        data,
+        model=User,
+        entity_type="user",
+        not_found="Owner not found",
+        values=lambda status, reason: {"approval_status": status, "approval_reason": reason},
+        where=(User.role == "owner",),
+    )
+
+
+@router.get("/admin/images/pending")
+def admin_pending_images(
+    me: Annotated[User, Depends(get_current_user)],
+    db: Annotated[Session, Depends(get_db)],
+    cursor: int | None = Query(default=None, ge=1),
+    limit: int = Query(default=50, ge=1, le=200),
+):
+    if me.role != "admin":
+        raise HTTPException(status_code=403, detail="Admin only")
+    # Listing title and owner company come from the same query (no per-image lookups).
+    stmt = (
+        select(PropertyImage, Property.title, User.id, User.company_name)
+        .outerjoin(Property, PropertyImage.property_id == Property.id)
+        .outerjoin(User, Property.owner_id == User.id)
+        .where(PropertyImage.status == "pending")
+    )
+    rows = db.execute(_queue_page(stmt, PropertyImage.id, cursor, limit)).all()
+    out: list[dict[str, Any]] = []
+    for img, title, owner_id, company_name in rows[:limit]:
+        out.append(
+            {
+                "id": img.id,
+                "property_id": img.property_id,
+                "property_title": title or "",
+                "owner_id": owner_id,
+                "owner_company_name": company_name if owner_id is not None else "",
+                "url": public_media_url(img.file_path),
+                "image_hash": img.image_hash,
+                "status": img.status,
+                "original_filename": img.original_filename,
+                "content_type": img.content_type,
+                "size_bytes": img.size_bytes,
+                "moderation_reason": img.moderation_reason,
+            }
+        )
+    return {"items": out, "next_cursor": _next_cursor(rows, limit, lambda r: r[0].id)}
+
+
+@router.post("/admin/images/{image_id}/approve")
+def admin_approve_image(
+    image_id: int,
+    me: Annotated[User, Depends(get_current_user)],
+    db: Annotated[Session, Depends(get_db)],
+    data: ModerateIn | None = None,
+):
+    if me.role != "admin":
+        raise HTTPException(status_code=403, detail="Admin only")
+    img = db.get(PropertyImage, int(image_id))
+    if not img:
+        raise HTTPException(status_code=404, detail="Image not found")
+    img.status = "approved"
+    img.moderation_reason = ""
+    db.add(img)
+    log_moderation(db, actor_user_id=me.id, entity_type="property_image", entity_id=img.id, action="approve", reason="")
+    return {"ok": True}
+
+
+@router.post("/admin/images/{image_id}/reject")
+def admin_reject_image(
+    image_id: int,
+    me: Annotated[User, Depends(get_current_user)],
+    db: Annotated[Session, Depends(get_db)],
+    data: ModerateIn | None = None,
+):
+    if me.role != "admin":
+        raise HTTPException(status_code=403, detail="Admin only")
+    img = db.get(PropertyImage, int(image_id))
+    if not img:
+        raise HTTPException(status_code=404, detail="Image not found")
+    img.status = "rejected"
+    img.moderation_reason = (data.reason if data else "") or ""
+    db.add(img)
+    log_moderation(db, actor_user_id=me.id, entity_type="property_image", entity_id=img.id, action="reject", reason=img.moderation_reason)
+    return {"ok": True}
+
+
+@router.post("/admin/images/{image_id}/suspend")
+def admin_suspend_image(
+    image_id: int,
+    me: Annotated[User, Depends(get_current_user)],
+    db: Annotated[Session, Depends(get_db)],
+    data: ModerateIn | None = None,
+):
+    if me.role != "admin":
+        raise HTTPException(status_code=403, detail="Admin only")
+    img = db.get(PropertyImage, int(image_id))
+    if not img:
+        raise HTTPException(status_code=404, detail="Image not found")
+    img.status = "suspended"
+    img.moderation_reason = (data.reason if data else "") or ""
+    db.add(img)
+    log_moderation(db, actor_user_id=me.id, entity_type="property_image", entity_id=img.id, action="suspend", reason=img.moderation_reason)
+    return {"ok": True}
+
+
+@router.post("/admin/images/bulk-moderate")
+def admin_bulk_moderate_images(
+    data: BulkModerateIn,
+    me: Annotated[User, Depends(get_current_user)],
+    db: Annotated[Session, Depends(get_db)],
+):
+    if me.role != "admin":
+        raise HTTPException(status_code=403, detail="Admin only")
+    return _bulk_moderate(
+        db,
+        me,
+        data,
+        model=PropertyImage,
+        entity_type="property_image",
+        not_found="Image not found",
+        values=lambda status, reason: {"status": status, "moderation_reason": reason},
+    )
+
+
+@router.get("/admin/logs")
+def admin_logs(
+    me: Annotated[User, Depends(get_current_read_user)],
+    db: Annotated[Session, Depends(get_read_db)],
+    entity_type: str | None = Query(default=None),
+    entity_id: int | None = Query(default=None),
+    cursor: int | None = Query(default=None, ge=1),
+    limit: int = Query(default=200, ge=1, le=1000),
+    include_archived: bool = Query(default=True),
+):
+    """
+    Newest first, keyset-paginated like the moderation queues. Once the live table is
+    exhausted, pages continue into moderation_logs_archive (its ids are all older).
+    """
+    if me.role != "admin":
+        raise HTTPException(status_code=403, detail="Admin only")
+    logs: list[Any] = []
+    for model in (ModerationLog, ModerationLogArchive) if include_archived else (ModerationLog,):
+        stmt = select(model)
+        if entity_type:
+            stmt = stmt.where(model.entity_type == entity_type)
+        if entity_id is not None:
+            stmt = stmt.where(model.entity_id == int(entity_id))
+        bound = logs[-1].id if logs else cursor
+        logs.extend(db.execute(_queue_page(stmt, model.id, bound, limit - len(logs))).scalars().all())
+        if len(logs) > limit:
+            break
+    return {
+        "items": [
+            {
+                "id": l.id,
+                "actor_user_id": l.actor_user_id,
+                "entity_type": l.entity_type,
+                "entity_id": l.entity_id,
+                "action": l.action,
+                "reason": l.reason,
+                "created_at": l.created_at,
+            }
+            for l in logs[:limit]
+        ],
+        "next_cursor": _next_cursor(logs, limit, lambda l: l.id),
+    }
+
+
+@router.get("/admin/stats")
+def admin_stats(me: Annotated[User, Depends(get_current_user)]) -> dict[str, Any]:
+    """
+    Runtime counters for this worker process (queueing/saturation signals).
+    """
+    if me.role != "admin":
+        raise HTTPException(status_code=403, detail="Admin only")
+    return {
+        "password_hashing": password_hashing_stats(),
+        "rate_limit": limiter.stats(),
+        "db_pool": pool_stats(),
+        "db_read_routing": read_routing_stats(),
+        "google_certs": google_id_token_verifier.stats(),
+    }
+
+
+@router.post("/admin/auth/login")
+async def admin_login(data: AdminLoginIn, db: Annotated[SessionRunner, Depends(get_db_runner)]):
+    identifier = (data.identifier or "").strip()
+    user = await db.run(resolve_user, identifier)
+    if not user or user.role != "admin" or not await check_password_async(user, data.password):
+        raise HTTPException(status_code=401, detail="Invalid admin credentials")
+    token = create_access_token(user_id=user.id, role=user.role)
+    return {"access_token": token, "user": {"id": user.id, "email": user.email, "name": user.name, "role": user.role}}
+
+
+@router.get("/admin/revenue")
+def admin_revenue(
+    me: Annotated[User, Depends(get_current_user)],
+    db: Annotated[Session, Depends(get_db)],
+):
+    """
+    Revenue dashboard (basic):
+    Aggregates validated subscriptions by plan.
+    """
+    if (me.role or "").lower() != "admin":
+        raise HTTPException(status_code=403, detail="Admin only")
+
+    ensure_plans(db)
+    items = []
+    for p in db.execute(select(SubscriptionPlan)).scalars().all():
+        subs = db.execute(select(UserSubscription).where(UserSubscription.plan_id == p.id)).scalars().all()
+        count = len(subs)
+        items.append(
+            {
+                "plan_id": p.id,
+                "name": p.name,
+                "price_inr": int(p.price_inr or 0),
+                "subscriptions": count,
+                "revenue_inr": int(p.price_inr or 0) * count,
+            }
+        )
+    items.sort(key=lambda x: x["revenue_inr"], reverse=True)
+    return {"items": items}
@@ -0,0 +1,517 @@
+from __future__ import annotations
+
+import datetime as dt
+import os
+import re
+import secrets
+from typing import Annotated, Any
+
+from fastapi import Depends, HTTPException
+from sqlalchemy import delete, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.config import app_env, google_oauth_client_ids, otp_exp_minutes
+from app.db import SessionRunner
+from app.deps import get_current_user, get_db, get_db_runner
+from app.google_auth import google_id_token_verifier
+from app.identifiers import identifier_in_use, norm_phone as _norm_phone, resolve_user, sync_user_identifiers
+from app.mailer import EmailSendError, send_otp_email, send_otp_email_async
+from app.models import (
+    ContactUsage,
+    FreeContactUsage,
+    Property,
+    PropertyImage,
+    SavedProperty,
+    Subscription,
+    User,
+    UserIdentifier,
+)
+from app.otp_store import otp_store
+from app.rate_limit import limiter
+from app.routers import api_router
+from app.schemas import (
+    ChangeEmailRequestIn,
+    ChangeEmailVerifyIn,
+    ChangePhoneRequestIn,
+    ChangePhoneVerifyIn,
+    ForgotRequestOtpIn,
+    ForgotResetIn,
+    GoogleLoginIn,
+    LoginRequestOtpIn,
+    LoginVerifyOtpIn,
+    MeUpdateIn,
+    RegisterIn,
+)
+from app.security import create_access_token, hash_password_async, make_unusable_password
+from app.services import check_password_async, norm_key, user_out
+
+
+# Attached by app.main.create_app().
+router = api_router()
+
+
+# -----------------------
+# Auth
+# -----------------------
+def _admin_otp_email() -> str:
+    """
+    Admin OTPs are routed to a fixed mailbox for operational control.
+    Override with env `ADMIN_OTP_EMAIL` if needed.
+    """
+    return (os.environ.get("ADMIN_OTP_EMAIL") or "info@srtech.co.in").strip() or "info@srtech.co.in"
+
+
+def _issue_otp(db: Session, *, identifier: str, purpose: str) -> str:
+    """
+    Generate a 6-digit OTP, store it (hashed) replacing any previous code for the same
+    (identifier, purpose), and return the plain code for delivery.
+    """
+    code = f"{secrets.randbelow(1_000_000):06d}"
+    expires = dt.datetime.now(dt.timezone.utc) + dt.timedelta(minutes=otp_exp_minutes())
+    otp_store.issue(db, identifier=identifier, purpose=purpose, code=code, expires_at=expires)
+    return code
+
+
+def _registration_taken(db: Session, *, email: str, username: str, phone_norm: str, company_name_norm: str) -> bool:
+    return db.execute(
+        select(User.id).where(
+            (User.email == email)
+            | (User.username == username)
+            | ((User.phone_normalized == phone_norm) & (User.phone_normalized != ""))
+            | ((User.company_name_normalized == company_name_norm) & (User.company_name_normalized != ""))
+        )
+    ).first() is not None
+
+
+def _create_registered_user(db: Session, user: User) -> int:
+    db.add(user)
+    try:
+        db.flush()
+        sync_user_identifiers(db, user)
+    except IntegrityError:
+        # Even with the pre-check in register(), concurrent requests (or double-submits) can
+        # still violate unique constraints (including another user's login identifiers).
+        # Convert to a deterministic 409 instead of a 500.
+        db.rollback()
+        raise HTTPException(status_code=409, detail="User already exists")
+    # Ensure a subscription row exists.
+    db.add(Subscription(user_id=user.id, status="inactive", provider="google_play"))
+    return user.id
+
+
+@router.post("/auth/register")
+async def register(data: RegisterIn, db: Annotated[SessionRunner, Depends(get_db_runner)]):
+    email = data.email.strip().lower()
+    phone = (data.phone or "").strip()
+    phone_norm = _norm_phone(phone)
+    username = (phone or data.username or "").strip()
+    role = (data.role or "user").strip().lower()
+    owner_category = (data.owner_category or "").strip()
+    company_name = (data.company_name or "").strip()
+    company_name_norm = norm_key(company_name)
+    company_description = (data.company_description or "").strip()
+    company_address = (data.company_address or "").strip()
+    company_address_norm = norm_key(company_address)
+    if not email or "@" not in email:
+        raise HTTPException(status_code=400, detail="Invalid email")
+    if len(username) < 3:
+        raise HTTPException(status_code=400, detail="Invalid username")
+    if role not in {"user", "owner"}:
+        raise HTTPException(status_code=400, detail="Invalid role")
+
+    if await db.run(
+        _registration_taken, email=email, username=username, phone_norm=phone_norm, company_name_norm=company_name_norm
+    ):
+        raise HTTPException(status_code=409, detail="User already exists")
+
+    approval_status = "pending" if role == "owner" else "approved"
+    user = User(
+        email=email,
+        username=username,
+        phone=phone,
+        phone_normalized=phone_norm,
+        name=(data.name or "").strip(),
+        state=(data.state or "").strip(),
+        district=(data.district or "").strip(),
+        gender=(data.gender or "").strip(),
+        role=role,
+        owner_category=owner_category,
+        company_name=company_name,
+        company_name_normalized=company_name_norm,
+        company_description=company_description,
+        company_address=company_address,
+        company_address_normalized=company_address_norm,
+        approval_status=approval_status,
+        password_hash=await hash_password_async(data.password),
+    )
+    user_id = await db.run(_create_registered_user, user)
+    return {"ok": True, "user_id": user_id}
+
+
+@router.post("/auth/login/request-otp")
+async def login_request_otp(data: LoginRequestOtpIn, db: Annotated[SessionRunner, Depends(get_db_runner)]):
+    identifier = data.identifier.strip()
+    await limiter.hit_async(key=f"otp:login:req:{identifier.lower()}", limit=5, window_seconds=10 * 60, detail="Too many OTP requests")
+    user = await db.run(resolve_user, identifier)
+    if not user or not await check_password_async(user, data.password):
+        raise HTTPException(status_code=401, detail="Invalid credentials")
+
+    # Keeps at most one active code per (identifier, purpose).
+    code = await db.run(_issue_otp, identifier=identifier, purpose="login")
+    # Store the code before delivering it, and don't hold a connection during the send.
+    await db.commit()
+    try:
+        to_email = user.email
+        purpose = "login"
+        if (user.role or "").lower() == "admin":
+            to_email = _admin_otp_email()
+            purpose = "admin_login"
+        delivery = await send_otp_email_async(to_email=to_email, otp=code, purpose=purpose)
+    except EmailSendError as e:
+        raise HTTPException(status_code=500, detail=str(e) or "Failed to send OTP")
+    except Exception:
+        raise HTTPException(status_code=500, detail="Failed to send OTP")
+    if delivery == "console":
+        return {"ok": True, "message": "OTP generated. Email service not configured; check server logs for the OTP."}
+    if (user.role or "").lower() == "admin":
+        return {"ok": True, "message": "OTP sent to admin mail."}
+    return {"ok": True, "message": "OTP sent to your registered email."}
+
+
+@router.post("/auth/login/verify-otp")
+async def login_verify_otp(data: LoginVerifyOtpIn, db: Annotated[SessionRunner, Depends(get_db_runner)]):
+    identifier = data.identifier.strip()
+    await limiter.hit_async(key=f"otp:login:verify:{identifier.lower()}", limit=12, window_seconds=10 * 60, detail="Too many OTP attempts")
+    user = await db.run(resolve_user, identifier)
+    if not user or not await check_password_async(user, data.password):
+        raise HTTPException(status_code=401, detail="Invalid credentials")
+
+    # One-time: a matching code is consumed.
+    if not await db.run(otp_store.consume, identifier=identifier, purpose="login", code=data.otp.strip()):
+        raise HTTPException(status_code=401, detail="Invalid OTP")
+
+    token = create_access_token(user_id=user.id, role=user.role)
+    return {
+        "access_token": token,
+        "user": user_out(user),
+    }
+
+
+@router.post("/auth/google")
+async def auth_google(data: GoogleLoginIn, db: Annotated[SessionRunner, Depends(get_db_runner)]):
+    """
+    Google Sign-In:
+    - Verify Google ID token signature/issuer
+    - Enforce audience when GOOGLE_OAUTH_CLIENT_ID(S) is configured
+    - Create (or reuse) a user by verified email
+    - Issue a standard JWT access token
+    """
+    token_raw = (data.id_token or "").strip()
+    if not token_raw:
+        raise HTTPException(status_code=400, detail="Missing id_token")
+
+    allowed_aud = google_oauth_client_ids()
+    if app_env() in {"prod", "production"} and not allowed_aud:
+        raise HTTPException(status_code=500, detail="Google Sign-In is not configured (missing GOOGLE_OAUTH_CLIENT_ID)")
+
+    try:
+        # Signature check against cached Google certificates; no network in the common case.
+        info = await google_id_token_verifier.verify(token_raw)
+    except Exception:
+        raise HTTPException(status_code=401, detail="Invalid Google token")
+
+    aud = str(info.get("aud") or "")
+    if allowed_aud and aud not in set(allowed_aud):
+        raise HTTPException(status_code=401, detail="Google token audience mismatch")
+
+    email = str(info.get("email") or "").strip().lower()
+    if not email or "@" not in email:
+        raise HTTPException(status_code=401, detail="Google token missing email")
+    if info.get("email_verified") is False:
+        raise HTTPException(status_code=401, detail="Google email is not verified")
+
+    display_name = str(info.get("name") or info.get("given_name") or "").strip()
+    user = await db.run(_google_user, email=email, display_name=display_name)
+    token = create_access_token(user_id=user.id, role=user.role)
+    return {"access_token": token, "user": user_out(user)}
+
+
+def _google_user(db: Session, *, email: str, display_name: str) -> User:
+    """Find the account for a verified Google email, creating a "user" role account if needed."""
+    user = db.execute(select(User).where(User.email == email)).scalar_one_or_none()
+    if not user:
+        # Create a new "user" role account for Google Sign-In.
+        base = re.sub(r"[^a-zA-Z0-9_]+", "_", (email.split("@", 1)[0] or "user")).strip("_")
+        base = base or "user"
+        username = base
+        # Ensure unique username.
+        for _ in range(20):
+            if not identifier_in_use(db, username):
+                break
+            username = f"{base}_{secrets.randbelow(10_000)}"
+        else:
+            username = f"user_{secrets.token_hex(4)}"
+
+        user = User(
+            email=email,
+            username=username,
+            phone="",
+            phone_normalized="",
+            name=display_name,
+            state="",
+            district="",
+            gender="",
+            role="user",
+            owner_category="",
+            company_name="",
+            company_name_normalized="",
+            company_description="",
+            company_address="",
+            company_address_normalized="",
+            approval_status="approved",
+            # Google-only account: no password login until the user sets one via reset.
+            password_hash=make_unusable_password(),
+        )
+        db.add(user)
+        try:
+            db.flush()
+            sync_user_identifiers(db, user)
+        except IntegrityError:
+            db.rollback()
+            raise HTTPException(status_code=409, detail="User already exists")
+        db.add(Subscription(user_id=user.id, status="inactive", provider="google_play"))
+    else:
+        # Ensure a subscription row exists (older rows may be missing).
+        sub = db.execute(select(Subscription).where(Subscription.user_id == user.id)).scalar_one_or_none()
+        if not sub:
+            db.add(Subscription(user_id=user.id, status="inactive", provider="google_play"))
+    return user
+
+
+@router.post("/auth/guest")
+def guest(db: Annotated[Session, Depends(get_db)]):
+    # Create a lightweight guest user.
+    now = dt.datetime.now(dt.timezone.utc)
+    email = f"guest-{int(now.timestamp())}@guest.local"
+    username = f"guest_{int(now.timestamp())}"
+    user = User(email=email, username=username, name="Guest", role="user", password_hash=make_unusable_password())
+    db.add(user)
+    db.flush()
+    sync_user_identifiers(db, user)
+    db.add(Subscription(user_id=user.id, status="inactive", provider="google_play"))
+    token = create_access_token(user_id=user.id, role=user.role)
+    return {
+        "access_token": token,
+        "user": user_out(user),
+    }
+
+
+@router.post("/auth/forgot/request-otp")
+async def forgot_request_otp(data: ForgotRequestOtpIn, db: Annotated[SessionRunner, Depends(get_db_runner)]):
+    identifier = data.identifier.strip()
+    await limiter.hit_async(key=f"otp:forgot:req:{identifier.lower()}", limit=5, window_seconds=10 * 60, detail="Too many OTP requests")
+    user = await db.run(resolve_user, identifier)
+    if not user:
+        raise HTTPException(status_code=404, detail="User not found")
+    code = await db.run(_issue_otp, identifier=identifier, purpose="forgot")
+    await db.commit()
+    try:
+        delivery = await send_otp_email_async(to_email=user.email, otp=code, purpose="forgot")
+    except EmailSendError as e:
+        raise HTTPException(status_code=500, detail=str(e) or "Failed to send OTP")
+    except Exception:
+        raise HTTPException(status_code=500, detail="Failed to send OTP")
+    if delivery == "console":
+        return {"ok": True, "message": "OTP generated. Email service not configured; check server logs for the OTP."}
+    return {"ok": True, "message": "OTP sent to your registered email."}
+
+
+@router.post("/auth/forgot/reset")
+async def forgot_reset(data: ForgotResetIn, db: Annotated[SessionRunner, Depends(get_db_runner)]):
+    identifier = data.identifier.strip()
+    await limiter.hit_async(key=f"otp:forgot:reset:{identifier.lower()}", limit=10, window_seconds=10 * 60, detail="Too many reset attempts")
+    user = await db.run(resolve_user, identifier)
+    if not user:
+        raise HTTPException(status_code=404, detail="User not found")
+    if not await db.run(otp_store.consume, identifier=identifier, purpose="forgot", code=data.otp.strip()):
+        raise HTTPException(status_code=401, detail="Invalid OTP")
+    # Persisted by the runner's commit when the request completes.
+    user.password_hash = await hash_password_async(data.new_password)
+    return {"ok": True}
+
+
+# -----------------------
+# Profile
+# -----------------------
+@router.get("/me")
+def me_profile(me: Annotated[User, Depends(get_current_user)]) -> dict[str, Any]:
+    return {"user": user_out(me)}
+
+
+@router.patch("/me")
+def me_update(
+    data: MeUpdateIn,
+    me: Annotated[User, Depends(get_current_user)],
+    db: Annotated[Session, Depends(get_db)],
+) -> dict[str, Any]:
+    me.name = (data.name or "").strip()
+    db.add(me)
+    return {"ok": True, "user": user_out(me)}
+
+
+@router.post("/me/change-email/request-otp")
+def me_change_email_request_otp(
+    data: ChangeEmailRequestIn,
+    me: Annotated[User, Depends(get_current_user)],
+    db: Annotated[Session, Depends(get_db)],
+) -> dict[str, Any]:
+    new_email = (data.new_email or "").strip().lower()
+    limiter.hit(key=f"otp:change_email:req:{me.id}", limit=5, window_seconds=10 * 60, detail="Too many OTP requests")
+    if not new_email or "@" not in new_email:
+        raise HTTPException(status_code=400, detail="Invalid email")
+    if new_email == (me.email or "").lower():
+        raise HTTPException(status_code=400, detail="Email is unchanged")
+
+    exists = db.execute(select(User.id).where((User.email == new_email) & (User.id != me.id))).first()
+    if exists:
+        raise HTTPException(status_code=409, detail="Email already in use")
+
+    otp_identifier = f"email:{me.id}:{new_email}"
+    code = _issue_otp(db, identifier=otp_identifier, purpose="change_email")
+    try:
+        delivery = send_otp_email(to_email=new_email, otp=code, purpose="change_email")
+    except EmailSendError as e:
+        raise HTTPException(status_code=500, detail=str(e) or "Failed to send OTP")
+    except Exception:
+        raise HTTPException(status_code=500, detail="Failed to send OTP")
+    if delivery == "console":
+        return {"ok": True, "message": "OTP generated. Email service not configured; check server logs for the OTP."}
+    return {"ok": True, "message": "OTP sent to your new email."}
+
+
+@router.post("/me/change-email/verify")
+def me_change_email_verify(
+    data: ChangeEmailVerifyIn,
+    me: Annotated[User, Depends(get_current_user)],
+    db: Annotated[Session, Depends(get_db)],
+) -> dict[str, Any]:
+    new_email = (data.new_email or "").strip().lower()
+    otp = (data.otp or "").strip()
+    limiter.hit(key=f"otp:change_email:verify:{me.id}", limit=12, window_seconds=10 * 60, detail="Too many OTP attempts")
+    if not new_email or "@" not in new_email:
+        raise HTTPException(status_code=400, detail="Invalid email")
+    if not otp:
+        raise HTTPException(status_code=400, detail="OTP required")
+
+    exists = db.execute(select(User.id).where((User.email == new_email) & (User.id != me.id))).first()
+    if exists:
+        raise HTTPException(status_code=409, detail="Email already in use")
+
+    otp_identifier = f"email:{me.id}:{new_email}"
+    if not otp_store.consume(db, identifier=otp_identifier, purpose="change_email", code=otp):
+        raise HTTPException(status_code=401, detail="Invalid OTP")
+
+    me.email = new_email
+    db.add(me)
+    try:
+        db.flush()
+        sync_user_identifiers(db, me)
+    except IntegrityError:
+        db.rollback()
+        raise HTTPException(status_code=409, detail="Email already in use")
+    return {"ok": True, "user": user_out(me)}
+
+
+@router.post("/me/change-phone/request-otp")
+def me_change_phone_request_otp(
+    data: ChangePhoneRequestIn,
+    me: Annotated[User, Depends(get_current_user)],
+    db: Annotated[Session, Depends(get_db)],
+) -> dict[str, Any]:
+    new_phone = (data.new_phone or "").strip()
+    limiter.hit(key=f"otp:change_phone:req:{me.id}", limit=5, window_seconds=10 * 60, detail="Too many OTP requests")
+    phone_norm = _norm_phone(new_phone)
+    if not phone_norm or len(re.sub(r"[^0-9]", "", phone_norm)) < 6:
+        raise HTTPException(status_code=400, detail="Invalid phone")
+    if phone_norm == _norm_phone(me.phone or ""):
+        raise HTTPException(status_code=400, detail="Phone is unchanged")
+
+    exists = db.execute(
+        select(User.id).where((User.phone_normalized == phone_norm) & (User.phone_normalized != "") & (User.id != me.id))
+    ).first()
+    if exists:
+        raise HTTPException(status_code=409, detail="Phone already in use")
+
+    otp_identifier = f"phone:{me.id}:{phone_norm}"
+    code = _issue_otp(db, identifier=otp_identifier, purpose="change_phone")
+    try:
+        delivery = send_otp_email(to_email=me.email, otp=code, purpose=f"change_phone:{phone_norm}")
+    except EmailSendError as e:
+        raise HTTPException(status_code=500, detail=str(e) or "Failed to send OTP")
+    except Exception:
+        raise HTTPException(status_code=500, detail="Failed to send OTP")
+    if delivery == "console":
+        return {"ok": True, "message": "OTP generated. Email service not configured; check server logs for the OTP."}
+    return {"ok": True, "message": "OTP sent to your registered email."}
+
+
+@router.post("/me/change-phone/verify")
+def me_change_phone_verify(
+    data: ChangePhoneVerifyIn,
+    me: Annotated[User, Depends(get_current_user)],
+    db: Annotated[Session, Depends(get_db)],
+) -> dict[str, Any]:
+    new_phone = (data.new_phone or "").strip()
+    otp = (data.otp or "").strip()
+    limiter.hit(key=f"otp:change_phone:verify:{me.id}", limit=12, window_seconds=10 * 60, detail="Too many OTP attempts")
+    phone_norm = _norm_phone(new_phone)
+    if not phone_norm:
+        raise HTTPException(status_code=400, detail="Invalid phone")
+    if not otp:
+        raise HTTPException(status_code=400, detail="OTP required")
+
+    exists = db.execute(
+        select(User.id).where((User.phone_normalized == phone_norm) & (User.phone_normalized != "") & (User.id != me.id))
+    ).first()
+    if exists:
+        raise HTTPException(status_code=409, detail="Phone already in use")
+
+    otp_identifier = f"phone:{me.id}:{phone_norm}"
+    if not otp_store.consume(db, identifier=otp_identifier, purpose="change_phone", code=otp):
+        raise HTTPException(status_code=401, detail="Invalid OTP")
+
+    me.phone = new_phone
+    me.phone_normalized = phone_norm
+    db.add(me)
+    try:
+        db.flush()
+        sync_user_identifiers(db, me)
+    except IntegrityError:
+        db.rollback()
+        raise HTTPException(status_code=409, detail="Phone already in use")
+    return {"ok": True, "user": user_out(me)}
+
+
+@router.delete("/me")
+def me_delete(
+    me: Annotated[User, Depends(get_current_user)],
+    db: Annotated[Session, Depends(get_db)],
+) -> dict[str, Any]:
+    if (me.role or "").lower() == "admin":
+        raise HTTPException(status_code=403, detail="Admin account cannot be deleted")
+
+    prop_ids = [int(x) for x in db.execute(select(Property.id).where(Property.owner_id == me.id)).scalars().all()]
+    if prop_ids:
+        # Delete dependent rows first to avoid FK errors (e.g. contact usage referencing properties).
+        db.execute(delete(FreeContactUsage).where(FreeContactUsage.property_id.in_(prop_ids)))
+        db.execute(delete(ContactUsage).where(ContactUsage.property_id.in_(prop_ids)))
+        db.execute(delete(SavedProperty).where(SavedProperty.property_id.in_(prop_ids)))
+        db.execute(delete(PropertyImage).where(PropertyImage.property_id.in_(prop_ids)))
+        db.execute(delete(Property).where(Property.id.in_(prop_ids)))
+
+    db.execute(delete(SavedProperty).where(SavedProperty.user_id == me.id))
+    db.execute(delete(Subscription).where(Subscription.user_id == me.id))
+    db.execute(delete(UserIdentifier).where(UserIdentifier.user_id == me.id))
+    db.execute(delete(User).where(User.id == me.id))
+    return {"ok": True}
@@ -0,0 +1,158 @@
+from __future__ import annotations
+
+import datetime as dt
+from typing import Annotated
+
+from fastapi import Depends, HTTPException
+from pydantic import BaseModel, Field
+from sqlalchemy import select, update as sa_update
+from sqlalchemy.orm import Session
+
+from app.deps import get_current_user, get_db
+from app.google_play import GooglePlayNotConfigured, verify_subscription_with_google_play
+from app.models import Subscription, SubscriptionPlan, User, UserSubscription
+from app.rate_limit import limiter
+from app.routers import api_router
+from app.services import ensure_plans
+
+
+# Attached by app.main.create_app().
+router = api_router()
+
+
+@router.get("/me/subscription")
+def me_subscription(
+    me: Annotated[User, Depends(get_current_user)],
+    db: Annotated[Session, Depends(get_db)],
+):
+    sub = db.execute(select(Subscription).where(Subscription.user_id == me.id)).scalar_one_or_none()
+    if not sub:
+        sub = Subscription(user_id=me.id, status="inactive", provider="google_play")
+        db.add(sub)
+        db.flush()
+    return {"status": sub.status, "provider": sub.provider, "expires_at": sub.expires_at}
+
+
+class VerifyPurchaseIn(BaseModel):
+    token: str = Field(..., min_length=1)
+    product_id: str | None = None
+
+
+@router.post("/verify-purchase")
+def verify_purchase(
+    data: VerifyPurchaseIn,
+    me: Annotated[User, Depends(get_current_user)],
+    db: Annotated[Session, Depends(get_db)],
+):
+    """Backward-compatible alias for subscription verification."""
+    return verify_subscription(data, me=me, db=db)
+
+
+class VerifySubscriptionIn(BaseModel):
+    purchase_token: str = Field(..., min_length=1)
+    product_id: str = Field(..., min_length=1)
+
+
+@router.post("/verify-subscription")
+def verify_subscription(
+    data: VerifySubscriptionIn,
+    me: Annotated[User, Depends(get_current_user)],
+    db: Annotated[Session, Depends(get_db)],
+):
+    """
+    Validates a Google Play subscription purchase token.
+
+    - If Google Play API credentials are configured, it performs real server-side validation.
+    - Otherwise, it falls back to a dev-mode activation (keeps current environments working).
+    """
+    limiter.hit(key=f"sub:verify:{me.id}", limit=20, window_seconds=10 * 60, detail="Too many verification attempts")
+    ensure_plans(db)
+    product_id = (data.product_id or "").strip()
+    token = (data.purchase_token or "").strip()
+    plan = db.get(SubscriptionPlan, product_id)
+    if not plan:
+        raise HTTPException(status_code=400, detail="Unknown product_id")
+
+    # Idempotency / abuse prevention: purchase tokens must be unique.
+    existing_token = db.execute(select(UserSubscription).where(UserSubscription.purchase_token == token)).scalar_one_or_none()
+    if existing_token and int(existing_token.user_id) != int(me.id):
+        raise HTTPException(status_code=409, detail="Purchase token already used by another account")
+
+    now = dt.datetime.now(dt.timezone.utc)
+
+    # Validate with Google Play when configured.
+    expiry_dt: dt.datetime | None = None
+    order_id: str | None = None
+    try:
+        result = verify_subscription_with_google_play(purchase_token=token, product_id=product_id)
+        # paymentState==1 indicates payment received for subscriptions (for some purchase types).
+        payment_state = result.get("paymentState")
+        if payment_state is not None and int(payment_state) != 1:
+            raise HTTPException(status_code=400, detail="Payment not completed")
+        expiry_ms = result.get("expiryTimeMillis")
+        if expiry_ms:
+            expiry_dt = dt.datetime.fromtimestamp(int(expiry_ms) / 1000.0, tz=dt.timezone.utc)
+        order_id = result.get("orderId")
+    except GooglePlayNotConfigured:
+        # Dev fallback: expire by plan duration.
+        expiry_dt = now + dt.timedelta(days=int(plan.duration_days or 30))
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    if not expiry_dt:
+        expiry_dt = now + dt.timedelta(days=int(plan.duration_days or 30))
+
+    # Upsert into legacy Subscription table (existing app logic).
+    sub = db.execute(select(Subscription).where(Subscription.user_id == me.id)).scalar_one_or_none()
+    if not sub:
+        sub = Subscription(user_id=me.id, status="inactive", provider="google_play")
+        db.add(sub)
+        db.flush()
+    sub.status = "active"
+    sub.provider = "google_play"
+    sub.purchase_token = token
+    sub.expires_at = expiry_dt
+    sub.updated_at = now
+    db.add(sub)
+
+    # Deactivate previous user_subscriptions for this user.
+    db.execute(sa_update(UserSubscription).where(UserSubscription.user_id == me.id).values(active=False))
+
+    us = UserSubscription(
+        user_id=me.id,
+        plan_id=plan.id,
+        purchase_token=token,
+        start_time=now,
+        end_time=expiry_dt,
+        active=True,
+    )
+    db.add(us)
+    db.flush()
+
+    return {
+        "status": "valid",
+        "expiry_time": int(expiry_dt.timestamp() * 1000),
+        "order_id": order_id,
+        "subscription": {"status": sub.status, "expires_at": sub.expires_at, "product_id": product_id},
+    }
+    sub = db.execute(select(Subscription).where(Subscription.user_id == me.id)).scalar_one_or_none()
+    if not sub:
+        sub = Subscription(user_id=me.id, status="inactive", provider="google_play")
+        db.add(sub)
+        db.flush()
+
+    now = dt.datetime.now(dt.timezone.utc)
+    product_id = (data.product_id or "").strip()
+    # Default to monthly unless explicitly quarterly.
+    days = 30
+    if product_id == "business_quarterly_499":
+        days = 90
+    sub.status = "active"
+    sub.provider = "google_play"
+    sub.purchase_token = data.token.strip()
+    sub.expires_at = now + dt.timedelta(days=days)
+    sub.updated_at = now
+    db.add(sub)
+    return {"status": "valid", "subscription": {"status": sub.status, "expires_at": sub.expires_at, "product_id": product_id}}
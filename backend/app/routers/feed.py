@@ -0,0 +1,728 @@
+from __future__ import annotations
+
+import datetime as dt
+import json
+import os
+import math
+from typing import Annotated, Any
+
+from fastapi import Depends, HTTPException, Query
+from fastapi.responses import ORJSONResponse
+from sqlalchemy import func, select, update as sa_update
+from sqlalchemy.orm import Session, selectinload
+
+from app.config import property_batch_max_ids
+from app.db import SessionRunner, session_runner
+from app.deps import get_current_user_async, get_db_runner, get_optional_read_user_async, get_read_db_runner
+from app.listings import PropertyFieldset, cover_images, property_out, set_contacted, split_csv_values, with_contacted
+from app.mailer import send_email_async
+from app.models import ContactUsage, FreeContactUsage, Property, Subscription, SubscriptionPlan, User, UserSubscription
+from app.rate_limit import limiter
+from app.routers import api_router
+from app.services import ensure_plans, load_locations, norm_key
+from app.sms import send_sms
+
+
+# Attached by app.main.create_app().
+router = api_router()
+
+
+# -----------------------
+# Metadata (categories)
+# -----------------------
+_CATEGORY_CATALOG_PATH = os.environ.get("CATEGORY_CATALOG_PATH") or os.path.join(os.path.dirname(__file__), "..", "category_catalog.json")
+
+
+def _default_category_catalog() -> dict[str, Any]:
+    # Minimal fallback if the JSON file is missing/corrupt.
+    return {
+        "version": "fallback",
+        "updated": "",
+        "categories": [
+            {"group": "Property & Space", "items": ["Apartment", "Individual House / Villa", "Plot / Land", "Commercial Shop"]},
+            {"group": "Construction Materials", "items": ["Cement Supplier", "Steel / TMT Supplier", "Sand Supplier", "Paint Supplier"]},
+            {"group": "Construction Services", "items": ["Building Contractor", "Civil Contractor", "Interior Designer", "Electrician"]},
+        ],
+    }
+
+
+def _load_category_catalog() -> tuple[dict[str, Any], str, str]:
+    try:
+        with open(_CATEGORY_CATALOG_PATH, "r", encoding="utf-8") as f:
+            data = json.load(f) or {}
+        if data.get("categories"):
+            return data, "", "file"
+        return _default_category_catalog(), "Category catalog is empty; using fallback list.", "fallback"
+    except Exception as exc:
+        # Never break the API if the catalog file is missing/corrupt.
+        return _default_category_catalog(), f"Failed to load category catalog ({exc.__class__.__name__}).", "fallback"
+
+
+def _slugify(s: str) -> str:
+    import re
+
+    s = (s or "").strip().lower()
+    s = re.sub(r"[^a-z0-9]+", "_", s)
+    s = re.sub(r"_+", "_", s).strip("_")
+    return s
+
+
+def _catalog_flat_items(catalog: dict[str, Any]) -> list[dict[str, Any]]:
+    out: list[dict[str, Any]] = []
+    used_ids: set[str] = set()
+    for g in (catalog.get("categories") or []):
+        group_label = str(g.get("group") or "").strip()
+        group_id = _slugify(group_label) or "group"
+        for item in (g.get("items") or []):
+            label = str(item or "").strip()
+            if not label:
+                continue
+            base_id = _slugify(label) or "item"
+            item_id = base_id
+            # Ensure stable uniqueness even if labels collide after slugify.
+            n = 2
+            while item_id in used_ids:
+                item_id = f"{base_id}_{n}"
+                n += 1
+            used_ids.add(item_id)
+            out.append(
+                {
+                    "id": item_id,
+                    "label": label,
+                    "group_id": group_id,
+                    "group": group_label,
+                    "search": f"{label} {group_label}".strip().lower(),
+                }
+            )
+    return out
+
+
+def _free_contact_limit() -> int:
+    try:
+        return max(0, int(os.environ.get("FREE_CONTACT_LIMIT") or "5"))
+    except Exception:
+        return 5
+
+
+@router.get("/meta/categories")
+def meta_categories() -> dict[str, Any]:
+    """
+    Single source of truth for:
+    - `category` filters (customer browsing/search)
+    - `owner_category` options (owner registration)
+
+    Mobile/web clients can use `flat_items` for search UIs.
+    """
+    catalog, warning, source = _load_category_catalog()
+    flat_items = _catalog_flat_items(catalog)
+    return {
+        "version": str(catalog.get("version") or ""),
+        "updated": str(catalog.get("updated") or ""),
+        "categories": catalog.get("categories") or [],
+        # Owner categories are the same as selectable items.
+        "owner_categories": [x.get("label") for x in flat_items if x.get("label")],
+        "flat_items": flat_items,
+        "source": source,
+        "warning": warning,
+    }
+
+
+# -----------------------
+# Locations (State/District/Area)
+# -----------------------
+@router.get("/locations/states")
+def location_states() -> dict[str, Any]:
+    data = load_locations()
+    states = sorted([s for s in data.keys() if s], key=lambda x: x.lower())
+    return {"items": states}
+
+
+@router.get("/locations/districts")
+def location_districts(state: str = Query(..., min_length=1)) -> dict[str, Any]:
+    st = (state or "").strip()
+    data = load_locations()
+    districts = sorted(list((data.get(st) or {}).keys()), key=lambda x: x.lower())
+    return {"items": districts}
+
+
+@router.get("/locations/areas")
+def location_areas(state: str = Query(..., min_length=1), district: str = Query(..., min_length=1)) -> dict[str, Any]:
+    st = (state or "").strip()
+    d = (district or "").strip()
+    data = load_locations()
+    areas = (data.get(st) or {}).get(d) or []
+    areas = sorted([a for a in areas if a], key=lambda x: x.lower())
+    return {"items": areas}
+
+
+# -----------------------
+# Properties (browse is free; contact is subscription-gated)
+# -----------------------
+@router.get("/properties")
+async def list_properties(
+    db: Annotated[SessionRunner, Depends(get_read_db_runner)],
+    me: Annotated[User | None, Depends(get_optional_read_user_async)],
+    q: str | None = Query(default=None),
+    rent_sale: str | None = Query(default=None),
+    property_type: str | None = Query(default=None),
+    max_price: int | None = Query(default=None),
+    state: str | None = Query(default=None),
+    district: str | None = Query(default=None),
+    area: str | None = Query(default=None),
+    limit: int = Query(default=20, ge=1, le=200),
+    sort_budget: str | None = Query(default=None),  # top|bottom|asc|desc
+    posted_within_days: int | None = Query(default=None, ge=1, le=365),
+    view: str | None = Query(default=None),  # card|full
+    fields: str | None = Query(default=None),  # comma-separated keys
+):
+    fieldset = PropertyFieldset.parse(view, fields)
+    return ORJSONResponse(await db.run(
+        _list_properties,
+        me,
+        q=q,
+        rent_sale=rent_sale,
+        property_type=property_type,
+        max_price=max_price,
+        state=state,
+        district=district,
+        area=area,
+        limit=limit,
+        sort_budget=sort_budget,
+        posted_within_days=posted_within_days,
+        fieldset=fieldset,
+    ))
+
+
+def _list_properties(
+    db: Session,
+    me: User | None,
+    *,
+    q: str | None,
+    rent_sale: str | None,
+    property_type: str | None,
+    max_price: int | None,
+    state: str | None,
+    district: str | None,
+    area: str | None,
+    limit: int,
+    sort_budget: str | None,
+    posted_within_days: int | None,
+    fieldset: PropertyFieldset | None = None,
+) -> dict[str, Any]:
+    fs = fieldset or PropertyFieldset()
+    state_in = (state or "").strip()
+    district_in = (district or "").strip()
+    area_in = (area or "").strip()
+    state_norm = norm_key(state_in)
+    district_norm = norm_key(district_in)
+    area_list = split_csv_values(area_in)
+    area_norms = [norm_key(x) for x in area_list]
+    area_norms = [x for x in area_norms if x]
+    area_norm = norm_key(area_in)
+
+    # Only approved listings from approved (non-suspended) owners are visible.
+    stmt = (
+        select(Property, User)
+        .options(*fs.load_options())
+        .join(User, Property.owner_id == User.id)
+        .where((Property.status == "approved") & (User.approval_status == "approved"))
+    )
+    sb = (sort_budget or "").strip().lower()
+    if sb in {"top", "desc", "high"}:
+        stmt = stmt.order_by(Property.price.desc(), Property.id.desc())
+    elif sb in {"bottom", "asc", "low"}:
+        stmt = stmt.order_by(Property.price.asc(), Property.id.desc())
+    else:
+        stmt = stmt.order_by(Property.id.desc())
+    if state_norm:
+        stmt = stmt.where(Property.state_normalized == state_norm)
+    if district_norm:
+        stmt = stmt.where(Property.district_normalized == district_norm)
+    if area_norms:
+        stmt = stmt.where(Property.area_normalized.in_(area_norms))
+    elif area_norm:
+        stmt = stmt.where(Property.area_normalized == area_norm)
+    if q:
+        q_like = f"%{q.strip()}%"
+        stmt = stmt.where((Property.title.ilike(q_like)) | (Property.location.ilike(q_like)))
+    if rent_sale:
+        stmt = stmt.where(Property.rent_sale == rent_sale)
+    if property_type:
+        stmt = stmt.where(Property.property_type == property_type)
+    if max_price is not None:
+        stmt = stmt.where(Property.price <= int(max_price))
+
+    if posted_within_days:
+        now = dt.datetime.now(dt.timezone.utc)
+        stmt = stmt.where(Property.created_at >= (now - dt.timedelta(days=int(posted_within_days))))
+
+    viewer = me if fs.wants("contacted") else None
+    stmt = with_contacted(stmt, viewer)
+    user_lat = None
+    user_lon = None
+    if me and fs.wants("distance_km") and _is_valid_gps(getattr(me, "gps_lat", None), getattr(me, "gps_lng", None)):
+        user_lat = float(me.gps_lat)
+        user_lon = float(me.gps_lng)
+
+    def _items(rows) -> list[dict[str, Any]]:
+        covers = cover_images(db, [row.Property.id for row in rows]) if fs.cover_only and fs.images else {}
+        out: list[dict[str, Any]] = []
+        for row in rows:
+            p, u = row.Property, row.User
+            item = property_out(p, owner=u, fieldset=fs, cover=covers.get(int(p.id)))
+            set_contacted(item, row, viewer)
+            if user_lat is not None and user_lon is not None:
+                try:
+                    if p.gps_lat is not None and p.gps_lng is not None:
+                        dkm = _haversine_km(float(user_lat), float(user_lon), float(p.gps_lat), float(p.gps_lng))
+                        item["distance_km"] = round(float(dkm), 3)
+                except Exception:
+                    pass
+            out.append(item)
+        return out
+
+    items = _items(db.execute(stmt.limit(int(limit))).all())
+    return {"items": items}
+
+
+@router.get("/properties/{property_id:int}")
+async def get_property(
+    property_id: int,
+    db: Annotated[SessionRunner, Depends(get_read_db_runner)],
+    me: Annotated[User | None, Depends(get_optional_read_user_async)],
+):
+    return ORJSONResponse(await db.run(_get_property, me, property_id))
+
+
+def _get_property(db: Session, me: User | None, property_id: int) -> dict[str, Any]:
+    stmt = (
+        select(Property, User)
+        .options(selectinload(Property.images))
+        .join(User, Property.owner_id == User.id)
+        .where(Property.id == int(property_id))
+    )
+    row = db.execute(with_contacted(stmt, me)).first()
+    if not row or row.Property.status != "approved":
+        raise HTTPException(status_code=404, detail="Property not found")
+    if row.User.approval_status != "approved":
+        raise HTTPException(status_code=404, detail="Property not found")
+    out = property_out(row.Property, owner=row.User)
+    set_contacted(out, row, me)
+    return out
+
+
+def _parse_batch_ids(raw: str) -> list[int]:
+    """Comma-separated ids, de-duplicated in request order."""
+    ids: list[int] = []
+    seen: set[int] = set()
+    for part in (raw or "").split(","):
+        part = part.strip()
+        if not part:
+            continue
+        try:
+            pid = int(part)
+        except ValueError:
+            raise HTTPException(status_code=400, detail=f"Invalid property id: {part[:32]}")
+        if pid not in seen:
+            seen.add(pid)
+            ids.append(pid)
+    if not ids:
+        raise HTTPException(status_code=400, detail="ids is required")
+    max_ids = property_batch_max_ids()
+    if len(ids) > max_ids:
+        raise HTTPException(status_code=400, detail=f"At most {max_ids} ids per request")
+    return ids
+
+
+@router.get("/properties/batch")
+async def get_properties_batch(
+    db: Annotated[SessionRunner, Depends(get_read_db_runner)],
+    me: Annotated[User | None, Depends(get_optional_read_user_async)],
+    ids: str = Query(default=""),  # comma-separated property ids
+    view: str | None = Query(default=None),  # card|full
+    fields: str | None = Query(default=None),  # comma-separated keys
+):
+    property_ids = _parse_batch_ids(ids)
+    fieldset = PropertyFieldset.parse(view, fields)
+    return ORJSONResponse(await db.run(_get_properties_batch, me, property_ids, fieldset))
+
+
+def _get_properties_batch(
+    db: Session, me: User | None, property_ids: list[int], fieldset: PropertyFieldset | None = None
+) -> dict[str, Any]:
+    """
+    Same visibility as GET /properties/{id}, for many ids: one joined query (plus one
+    images IN-load). Items follow the requested order; hidden or unknown ids are listed
+    under "missing".
+    """
+    fs = fieldset or PropertyFieldset()
+    viewer = me if fs.wants("contacted") else None
+    stmt = (
+        select(Property, User)
+        .options(*fs.load_options())
+        .join(User, Property.owner_id == User.id)
+        .where(Property.id.in_(property_ids))
+        .where((Property.status == "approved") & (User.approval_status == "approved"))
+    )
+    rows = {int(row.Property.id): row for row in db.execute(with_contacted(stmt, viewer)).all()}
+    covers = cover_images(db, list(rows)) if rows and fs.cover_only and fs.images else {}
+    items: list[dict[str, Any]] = []
+    missing: list[int] = []
+    for pid in property_ids:
+        row = rows.get(pid)
+        if row is None:
+            missing.append(pid)
+            continue
+        item = property_out(row.Property, owner=row.User, fieldset=fs, cover=covers.get(pid))
+        set_contacted(item, row, viewer)
+        items.append(item)
+    return {"items": items, "missing": missing}
+
+
+def _is_valid_gps(lat: float | None, lon: float | None) -> bool:
+    try:
+        if lat is None or lon is None:
+            return False
+        lat_f = float(lat)
+        lon_f = float(lon)
+        if not math.isfinite(lat_f) or not math.isfinite(lon_f):
+            return False
+        if abs(lat_f) < 1e-6 and abs(lon_f) < 1e-6:
+            return False
+        if abs(lat_f) > 90 or abs(lon_f) > 180:
+            return False
+        return True
+    except Exception:
+        return False
+
+
+def _haversine_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    r = 6371.0
+    p1 = math.radians(lat1)
+    p2 = math.radians(lat2)
+    dlat = math.radians(lat2 - lat1)
+    dlon = math.radians(lon2 - lon1)
+    a = math.sin(dlat / 2) ** 2 + math.cos(p1) * math.cos(p2) * (math.sin(dlon / 2) ** 2)
+    c = 2 * math.asin(math.sqrt(a))
+    return r * c
+
+
+def _gps_moved(me: User, lat: float, lon: float) -> bool:
+    if me.gps_lat is None or me.gps_lng is None:
+        return True
+    return abs(float(me.gps_lat) - lat) >= 1e-6 or abs(float(me.gps_lng) - lon) >= 1e-6
+
+
+def _store_user_gps(db: Session, user_id: int, lat: float, lon: float) -> None:
+    db.execute(sa_update(User).where(User.id == int(user_id)).values(gps_lat=lat, gps_lng=lon))
+
+
+@router.get("/properties/nearby")
+async def list_nearby_properties(
+    db: Annotated[SessionRunner, Depends(get_read_db_runner)],
+    me: Annotated[User | None, Depends(get_optional_read_user_async)],
+    lat: float = Query(..., ge=-90, le=90),
+    lon: float = Query(..., ge=-180, le=180),
+    radius_km: float = Query(default=20.0, gt=0, le=500),
+    limit: int = Query(default=20, ge=1, le=200),
+    district: str | None = Query(default=None),
+    state: str | None = Query(default=None),
+    area: str | None = Query(default=None),
+    q: str | None = Query(default=None),
+    rent_sale: str | None = Query(default=None),
+    property_type: str | None = Query(default=None),
+    max_price: int | None = Query(default=None),
+    posted_within_days: int | None = Query(default=None, ge=1, le=365),
+    view: str | None = Query(default=None),  # card|full
+    fields: str | None = Query(default=None),  # comma-separated keys
+):
+    """
+    Nearby ads using GPS proximity (Haversine). No external map APIs.
+    Optional filters by District/State/Area (validated at creation time).
+
+    Optimized approach:
+    - Bounding-box prefilter on lat/lon
+    - Distance calculation for ordering
+    """
+    fieldset = PropertyFieldset.parse(view, fields)
+    if me and _is_valid_gps(lat, lon) and _gps_moved(me, float(lat), float(lon)):
+        # `me` comes from the read session; the last location is persisted on the primary.
+        async with session_runner() as primary:
+            await primary.run(_store_user_gps, me.id, float(lat), float(lon))
+    return ORJSONResponse(await db.run(
+        _list_nearby_properties,
+        me,
+        lat=lat,
+        lon=lon,
+        radius_km=radius_km,
+        limit=limit,
+        district=district,
+        state=state,
+        area=area,
+        q=q,
+        rent_sale=rent_sale,
+        property_type=property_type,
+        max_price=max_price,
+        posted_within_days=posted_within_days,
+        fieldset=fieldset,
+    ))
+
+
+def _list_nearby_properties(
+    db: Session,
+    me: User | None,
+    *,
+    lat: float,
+    lon: float,
+    radius_km: float,
+    limit: int,
+    district: str | None,
+    state: str | None,
+    area: str | None,
+    q: str | None,
+    rent_sale: str | None,
+    property_type: str | None,
+    max_price: int | None,
+    posted_within_days: int | None,
+    fieldset: PropertyFieldset | None = None,
+) -> dict[str, Any]:
+    fs = fieldset or PropertyFieldset()
+    district_norm = norm_key((district or "").strip())
+    state_norm = norm_key((state or "").strip())
+    area_in = (area or "").strip()
+    area_list = split_csv_values(area_in)
+    area_norms = [norm_key(x) for x in area_list]
+    area_norms = [x for x in area_norms if x]
+    area_norm = norm_key(area_in)
+
+    # Bounding box (fast prefilter).
+    lat_delta = float(radius_km) / 111.0
+    cos_lat = math.cos(math.radians(float(lat))) or 1e-9
+    lon_delta = float(radius_km) / (111.0 * cos_lat)
+    min_lat, max_lat = float(lat) - lat_delta, float(lat) + lat_delta
+    min_lon, max_lon = float(lon) - lon_delta, float(lon) + lon_delta
+
+    stmt = (
+        select(Property, User)
+        .options(*fs.load_options(extra_columns=("gps_lat", "gps_lng")))
+        .join(User, Property.owner_id == User.id)
+        .where((Property.status == "approved") & (User.approval_status == "approved"))
+        .where(Property.gps_lat.is_not(None))
+        .where(Property.gps_lng.is_not(None))
+        .where((Property.gps_lat >= min_lat) & (Property.gps_lat <= max_lat))
+        .where((Property.gps_lng >= min_lon) & (Property.gps_lng <= max_lon))
+    )
+
+    if district_norm:
+        stmt = stmt.where(Property.district_normalized == district_norm)
+    if state_norm:
+        stmt = stmt.where(Property.state_normalized == state_norm)
+    if area_norms:
+        stmt = stmt.where(Property.area_normalized.in_(area_norms))
+    elif area_norm:
+        stmt = stmt.where(Property.area_normalized == area_norm)
+
+    if q:
+        q_like = f"%{q.strip()}%"
+        stmt = stmt.where((Property.title.ilike(q_like)) | (Property.location.ilike(q_like)))
+    if rent_sale:
+        stmt = stmt.where(Property.rent_sale == rent_sale)
+    if property_type:
+        stmt = stmt.where(Property.property_type == property_type)
+    if max_price is not None:
+        stmt = stmt.where(Property.price <= int(max_price))
+    if posted_within_days:
+        now = dt.datetime.now(dt.timezone.utc)
+        stmt = stmt.where(Property.created_at >= (now - dt.timedelta(days=int(posted_within_days))))
+
+    viewer = me if fs.wants("contacted") else None
+
+    def _items(ranked: list[tuple[float, Any]]) -> list[dict[str, Any]]:
+        covers = cover_images(db, [row.Property.id for _, row in ranked]) if fs.cover_only and fs.images else {}
+        out: list[dict[str, Any]] = []
+        for dkm, row in ranked:
+            item = property_out(row.Property, owner=row.User, fieldset=fs, cover=covers.get(int(row.Property.id)))
+            if fs.wants("distance_km"):
+                item["distance_km"] = round(float(dkm), 3)
+            set_contacted(item, row, viewer)
+            out.append(item)
+        return out
+
+    # Postgres can compute distance in SQL for correct ordering; SQLite fallback computes in Python.
+    dialect = getattr(getattr(db, "bind", None), "dialect", None)
+    dname = getattr(dialect, "name", "") if dialect else ""
+
+    if dname == "postgresql":
+        # Haversine in SQL (meters/km) + ORDER BY distance for true nearest results.
+        lat1 = func.radians(float(lat))
+        lon1 = func.radians(float(lon))
+        lat2 = func.radians(Property.gps_lat)
+        lon2 = func.radians(Property.gps_lng)
+        dlat = lat2 - lat1
+        dlon = lon2 - lon1
+        a = func.pow(func.sin(dlat / 2.0), 2) + func.cos(lat1) * func.cos(lat2) * func.pow(func.sin(dlon / 2.0), 2)
+        c = 2.0 * func.asin(func.sqrt(a))
+        dist_km = (6371.0 * c).label("distance_km")
+
+        stmt2 = with_contacted(stmt.add_columns(dist_km), viewer).order_by(dist_km.asc(), Property.id.desc()).limit(int(limit))
+        ranked = [(float(row.distance_km), row) for row in db.execute(stmt2).all() if row.distance_km is not None]
+        return {"items": _items([(dkm, row) for (dkm, row) in ranked if dkm <= float(radius_km)])}
+
+    rows = db.execute(with_contacted(stmt, viewer).limit(int(limit) * 5)).all()
+    ranked = []
+    for row in rows:
+        p = row.Property
+        dkm = _haversine_km(float(lat), float(lon), float(p.gps_lat or 0), float(p.gps_lng or 0))
+        if dkm <= float(radius_km):
+            ranked.append((dkm, row))
+    ranked.sort(key=lambda x: (float(round(x[0], 3) or 9e9), -int(x[1].Property.id or 0)))
+    return {"items": _items(ranked[: int(limit)])}
+
+
+@router.get("/properties/{property_id:int}/contact")
+async def get_property_contact(
+    property_id: int,
+    me: Annotated[User, Depends(get_current_user_async)],
+    db: Annotated[SessionRunner, Depends(get_db_runner)],
+):
+    await limiter.hit_async(key=f"contact:{me.id}", limit=60, window_seconds=60, detail="Too many contact unlock requests")
+    out, notify = await db.run(_unlock_contact, me, property_id)
+    if notify:
+        # Commit the unlock before notifying; the notification must not hold a connection.
+        await db.commit()
+        await _notify_contact_unlock(me, out)
+    return out
+
+
+def _unlock_contact(db: Session, me: User, property_id: int) -> tuple[dict[str, Any], bool]:
+    """
+    Enforces free quota / plan contact limits and records usage.
+    Returns (response, notify) where notify is False for an already-unlocked property.
+    """
+    p = db.get(Property, int(property_id))
+    if not p or p.status != "approved":
+        raise HTTPException(status_code=404, detail="Property not found")
+    owner = db.get(User, int(p.owner_id))
+    if not owner or owner.approval_status != "approved":
+        raise HTTPException(status_code=404, detail="Property not found")
+
+    # If this property was already unlocked via free quota, return immediately.
+    already_free = db.execute(
+        select(FreeContactUsage.id).where((FreeContactUsage.user_id == me.id) & (FreeContactUsage.property_id == int(property_id)))
+    ).first()
+    if already_free:
+        return {
+            "adv_number": (p.ad_number or "").strip() or str(p.id),
+            "owner_name": (owner.name or "").strip() or "Owner",
+            "owner_company_name": (owner.company_name or "").strip(),
+            "phone": p.contact_phone,
+            "email": p.contact_email,
+        }, False
+
+    sub = db.execute(select(Subscription).where(Subscription.user_id == me.id)).scalar_one_or_none()
+    subscribed = bool(sub and (sub.status or "").lower() == "active")
+
+    # Abuse prevention: enforce plan contact_limit per active subscription period.
+    ensure_plans(db)
+    now = dt.datetime.now(dt.timezone.utc)
+    if subscribed:
+        usub = (
+            db.execute(
+                select(UserSubscription)
+                .where((UserSubscription.user_id == me.id) & (UserSubscription.active == True))  # noqa: E712
+                .order_by(UserSubscription.id.desc())
+            )
+            .scalars()
+            .first()
+        )
+        if usub:
+            end_time = usub.end_time
+            if end_time is not None and end_time.tzinfo is None:
+                # SQLite returns naive datetimes (stored as UTC).
+                end_time = end_time.replace(tzinfo=dt.timezone.utc)
+            if end_time and end_time <= now:
+                usub.active = False
+                db.add(usub)
+                # fall back to free quota below
+                subscribed = False
+            else:
+                plan = db.get(SubscriptionPlan, usub.plan_id)
+                limit = int(plan.contact_limit or 0) if plan else 0
+                if limit > 0:
+                    # Don't double-count repeated unlocks of the same property for the same subscription.
+                    existing = db.execute(
+                        select(ContactUsage.id).where(
+                            (ContactUsage.user_id == me.id)
+                            & (ContactUsage.property_id == int(property_id))
+                            & (ContactUsage.subscription_id == usub.id)
+                        )
+                    ).first()
+                    if not existing:
+                        used_count = db.execute(
+                            select(ContactUsage.id).where((ContactUsage.user_id == me.id) & (ContactUsage.subscription_id == usub.id))
+                        ).all()
+                        if len(used_count) >= limit:
+                            raise HTTPException(status_code=429, detail="Contact unlock limit reached for your plan")
+                        db.add(ContactUsage(user_id=me.id, property_id=int(property_id), subscription_id=usub.id))
+        else:
+            # Backward-compatibility: if legacy subscription is active but no user_subscriptions row exists,
+            # still allow contact unlock (best-effort).
+            pass
+
+    if not subscribed:
+        free_limit = _free_contact_limit()
+        if free_limit <= 0:
+            raise HTTPException(status_code=402, detail="Subscription required to unlock contact")
+
+        free_count = db.execute(select(func.count(FreeContactUsage.id)).where(FreeContactUsage.user_id == me.id)).scalar() or 0
+        if int(free_count) >= int(free_limit):
+            raise HTTPException(status_code=402, detail="Subscription required to unlock contact")
+
+        # Don't double-count repeated unlocks of the same property.
+        existing_free2 = db.execute(
+            select(FreeContactUsage.id).where((FreeContactUsage.user_id == me.id) & (FreeContactUsage.property_id == int(property_id)))
+        ).first()
+        if not existing_free2:
+            db.add(FreeContactUsage(user_id=me.id, property_id=int(property_id)))
+
+    return {
+        "adv_number": (p.ad_number or "").strip() or str(p.id),
+        "owner_name": (owner.name or "").strip() or "Owner",
+        "owner_company_name": (owner.company_name or "").strip(),
+        "phone": p.contact_phone,
+        "email": p.contact_email,
+    }, True
+
+
+async def _notify_contact_unlock(me: User, contact: dict[str, Any]) -> None:
+    # Notify the customer via email + SMS (best-effort).
+    adv_no = contact["adv_number"]
+    owner_name = contact["owner_name"]
+    owner_phone = (contact.get("phone") or "").strip()
+    owner_email_contact = (contact.get("email") or "").strip()
+    customer_email = (me.email or "").strip()
+    customer_phone = (me.phone_normalized or me.phone or "").strip()
+    try:
+        if customer_email and "@" in customer_email:
+            await send_email_async(
+                to_email=customer_email,
+                subject=f"Contact details for Ad #{adv_no}",
+                text=(
+                    f"Ad number: {adv_no}\n"
+                    f"Owner name: {owner_name}\n"
+                    f"Owner phone: {owner_phone or 'N/A'}\n"
+                    f"Owner email: {owner_email_contact or 'N/A'}\n"
+                    f"Owner company: {contact.get('owner_company_name') or 'N/A'}\n"
+                ),
+            )
+    except Exception:
+        # Never block contact unlock due to notification errors.
+        pass
+    try:
+        if customer_phone:
+            send_sms(
+                to_phone=customer_phone,
+                text=f"Ad #{adv_no} contact: {owner_name} {owner_phone or ''} {owner_email_contact or ''}".strip(),
+            )
+    except Exception:
+        pass
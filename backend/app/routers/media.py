@@ -0,0 +1,531 @@
+from __future__ import annotations
+
+import base64
+import hashlib
+import mimetypes
+import os
+import re
+import secrets
+import shutil
+import subprocess
+import tempfile
+from typing import Annotated, Any
+
+from fastapi import Depends, File, HTTPException, Query, UploadFile
+from sqlalchemy import func, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.config import uploads_dir
+from app.deps import get_current_user, get_db
+from app.media_urls import public_media_url
+from app.metrics import observe_outbound
+from app.models import Property, PropertyImage, User
+from app.routers import api_router
+from app.services import is_guest_account, log_moderation, user_out
+from app.tracing import span as trace_span, traced
+from app.utils.cloudinary_storage import (
+    cloudinary_enabled,
+    destroy as cloudinary_destroy,
+    upload_bytes as cloudinary_upload_bytes,
+)
+
+
+# Attached by app.main.create_app().
+router = api_router()
+
+
+# -----------------------
+# Limits and AI moderation
+# -----------------------
+def _max_upload_image_bytes() -> int:
+    # Default: 15 MB (raw upload bytes).
+    try:
+        return int(os.environ.get("MAX_UPLOAD_IMAGE_BYTES") or "15000000")
+    except Exception:
+        return 15_000_000
+
+
+def _max_upload_video_bytes() -> int:
+    # Default: 80 MB (raw upload bytes).
+    try:
+        return int(os.environ.get("MAX_UPLOAD_VIDEO_BYTES") or "80000000")
+    except Exception:
+        return 80_000_000
+
+
+def _max_property_media_dim() -> int:
+    # Max width/height for property media (pixels). Maintain aspect ratio.
+    try:
+        return int(os.environ.get("MAX_PROPERTY_MEDIA_DIM") or "1920")
+    except Exception:
+        return 1920
+
+
+def _max_profile_image_dim() -> int:
+    try:
+        return int(os.environ.get("MAX_PROFILE_IMAGE_DIM") or "512")
+    except Exception:
+        return 512
+
+
+def _enable_media_ai_moderation() -> bool:
+    v = (os.environ.get("ENABLE_MEDIA_AI_MODERATION") or "1").strip().lower()
+    return v not in {"0", "false", "no", "off"}
+
+
+def _ai_moderation_fail_closed() -> bool:
+    """
+    If true, uploads fail when moderation cannot be performed.
+    Default is fail-open to avoid blocking uploads in production when OpenAI/ffmpeg isn't configured.
+    """
+    v = (os.environ.get("AI_MODERATION_FAIL_CLOSED") or "0").strip().lower()
+    return v in {"1", "true", "yes", "on"}
+
+
+def _openai_api_key() -> str:
+    return (os.environ.get("OPENAI_API_KEY") or "").strip()
+
+
+def _openai_moderations_url() -> str:
+    # OPENAI_BASE_URL points moderation at a proxy or a local stub (load tests).
+    base = (os.environ.get("OPENAI_BASE_URL") or "https://api.openai.com/v1").strip().rstrip("/")
+    return f"{base}/moderations"
+
+
+def _openai_moderation_model() -> str:
+    return (os.environ.get("OPENAI_MODERATION_MODEL") or "omni-moderation-latest").strip()
+
+
+def _require_ai_moderation_configured() -> None:
+    if not _enable_media_ai_moderation():
+        return
+    if not _openai_api_key():
+        if _ai_moderation_fail_closed():
+            raise HTTPException(status_code=503, detail="AI moderation is enabled but not configured (missing OPENAI_API_KEY)")
+        # Fail-open by default to avoid breaking uploads when OpenAI isn't configured.
+        return
+
+
+@traced("openai.moderate_image", kind="CLIENT")
+def _openai_moderate_image(*, raw: bytes) -> dict[str, Any]:
+    """
+    Calls OpenAI image moderation. Returns a dict with:
+      - ok: bool
+      - flagged: bool
+      - summary: str
+      - raw: response JSON (best-effort)
+    """
+    if not _enable_media_ai_moderation():
+        return {"ok": True, "flagged": False, "summary": "ai_moderation_disabled", "raw": {}}
+    _require_ai_moderation_configured()
+    if not _openai_api_key():
+        return {"ok": True, "flagged": False, "summary": "ai_moderation_skipped_missing_openai_api_key", "raw": {}}
+
+    # Use a data URL to avoid file hosting; OpenAI moderation accepts image_url inputs.
+    b64 = base64.b64encode(raw).decode("ascii")
+    data_url = f"data:application/octet-stream;base64,{b64}"
+    payload = {
+        "model": _openai_moderation_model(),
+        "input": [
+            {
+                "type": "image_url",
+                "image_url": {"url": data_url},
+            }
+        ],
+    }
+
+    import requests  # only needed once moderation is configured; keeps it off the import path
+
+    try:
+        with observe_outbound("openai"):
+            resp = requests.post(
+                _openai_moderations_url(),
+                headers={"Authorization": f"Bearer {_openai_api_key()}", "Content-Type": "application/json"},
+                json=payload,
+                timeout=20,
+            )
+    except Exception:
+        if _ai_moderation_fail_closed():
+            raise HTTPException(status_code=503, detail="AI moderation service unavailable")
+        return {"ok": True, "flagged": False, "summary": "ai_moderation_skipped_service_unavailable", "raw": {}}
+
+    data: dict[str, Any] = {}
+    try:
+        data = resp.json()
+    except Exception:
+        data = {}
+
+    if not resp.ok:
+        if _ai_moderation_fail_closed():
+            # Fail-closed: do not store unmoderated media.
+            raise HTTPException(status_code=503, detail="AI moderation failed")
+        return {
+            "ok": True,
+            "flagged": False,
+            "summary": f"ai_moderation_skipped_http_{int(resp.status_code)}",
+            "raw": data,
+        }
+
+    results = (data or {}).get("results") or []
+    r0 = results[0] if results else {}
+    flagged = bool((r0 or {}).get("flagged", False))
+
+    # Build a compact summary of categories for admin logs.
+    cats = (r0 or {}).get("categories") or {}
+    flagged_cats = [k for k, v in cats.items() if v is True]
+    summary = "flagged: " + ", ".join(flagged_cats) if flagged_cats else ("flagged" if flagged else "ok")
+    return {"ok": True, "flagged": flagged, "summary": summary, "raw": data}
+
+
+@traced("openai.moderate_video")
+def _openai_moderate_video(*, raw: bytes, max_frames: int = 8) -> dict[str, Any]:
+    """
+    Video moderation via frame sampling + image moderation.
+    Requires ffmpeg. Fail-closed if moderation cannot be performed.
+    """
+    if not _enable_media_ai_moderation():
+        return {"ok": True, "flagged": False, "summary": "ai_moderation_disabled", "raw": {}}
+    _require_ai_moderation_configured()
+    if not _openai_api_key():
+        return {"ok": True, "flagged": False, "summary": "ai_moderation_skipped_missing_openai_api_key", "raw": {}}
+    if not shutil.which("ffmpeg"):
+        if _ai_moderation_fail_closed():
+            raise HTTPException(status_code=503, detail="AI moderation requires ffmpeg (missing)")
+        return {"ok": True, "flagged": False, "summary": "ai_moderation_skipped_missing_ffmpeg", "raw": {}}
+
+    with tempfile.TemporaryDirectory(prefix="ch_vid_mod_") as td:
+        in_path = os.path.join(td, "in")
+        out_glob = os.path.join(td, "frame_%02d.jpg")
+        with open(in_path, "wb") as f:
+            f.write(raw)
+
+        # Sample 1 fps, cap frames. Keep it small for moderation.
+        cmd = [
+            "ffmpeg",
+            "-y",
+            "-i",
+            in_path,
+            "-vf",
+            "fps=1,scale=640:-2",
+            "-vframes",
+            str(int(max_frames)),
+            out_glob,
+        ]
+        try:
+            with trace_span("ffmpeg.extract_frames", attributes={"ffmpeg.max_frames": int(max_frames), "input.bytes": len(raw)}):
+                subprocess.run(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=True)
+        except Exception:
+            raise HTTPException(status_code=400, detail="Invalid video upload")
+
+        # Moderate each extracted frame; reject if any flagged.
+        flagged_frames: list[dict[str, Any]] = []
+        for i in range(1, int(max_frames) + 1):
+            fp = os.path.join(td, f"frame_{i:02d}.jpg")
+            if not os.path.exists(fp):
+                continue
+            try:
+                with open(fp, "rb") as f:
+                    frame = f.read()
+            except Exception:
+                continue
+            if not frame:
+                continue
+            res = _openai_moderate_image(raw=frame)
+            if bool(res.get("flagged")):
+                flagged_frames.append({"frame": i, "summary": res.get("summary")})
+                break  # fail fast
+
+        if flagged_frames:
+            return {"ok": True, "flagged": True, "summary": f"flagged_frame_{flagged_frames[0]['frame']}: {flagged_frames[0]['summary']}", "raw": {"flagged_frames": flagged_frames}}
+        return {"ok": True, "flagged": False, "summary": "ok", "raw": {}}
+
+
+def _raise_if_too_large(*, size_bytes: int, max_bytes: int) -> None:
+    if int(size_bytes) > int(max_bytes):
+        raise HTTPException(status_code=413, detail=f"Upload too large (max {max_bytes} bytes)")
+
+
+def _safe_upload_ext(*, filename: str, content_type: str) -> str:
+    fn = (filename or "").strip()
+    ext = os.path.splitext(fn)[1].lower()
+    if ext and len(ext) <= 12 and re.match(r"^\.[a-z0-9]+$", ext):
+        return ext
+    ct = (content_type or "").lower().strip()
+    if ct in {"image/jpeg", "image/jpg"}:
+        return ".jpg"
+    if ct == "image/png":
+        return ".png"
+    if ct == "image/webp":
+        return ".webp"
+    if ct == "image/gif":
+        return ".gif"
+    if ct == "video/mp4":
+        return ".mp4"
+    if ct == "video/quicktime":
+        return ".mov"
+    # Safe generic fallback.
+    return ".bin"
+
+
+def _image_sha256_hex(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+# -----------------------
+# Uploads
+# -----------------------
+@router.post("/me/profile-image")
+def me_upload_profile_image(
+    me: Annotated[User, Depends(get_current_user)],
+    db: Annotated[Session, Depends(get_db)],
+    file: UploadFile = File(...),
+) -> dict[str, Any]:
+    content_type = (file.content_type or "").lower()
+    if not content_type.startswith("image/"):
+        raise HTTPException(status_code=400, detail="Only image uploads are allowed")
+
+    try:
+        raw = file.file.read()
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid upload")
+    if not raw:
+        raise HTTPException(status_code=400, detail="Empty upload")
+    _raise_if_too_large(size_bytes=len(raw), max_bytes=_max_upload_image_bytes())
+
+    # AI moderation (reject before any storage).
+    mod = _openai_moderate_image(raw=raw)
+    if bool(mod.get("flagged")):
+        log_moderation(
+            db,
+            actor_user_id=me.id,
+            entity_type="user_profile_media_upload",
+            entity_id=int(me.id),
+            action="reject",
+            reason=f"Unsafe media rejected by AI moderation ({mod.get('summary')})",
+        )
+        raise HTTPException(status_code=400, detail="Unsafe media detected. Upload rejected.")
+
+    stored_ext = _safe_upload_ext(filename=(file.filename or ""), content_type=content_type)
+    token = secrets.token_hex(8)
+    safe_name = f"u{me.id}_{token}{stored_ext}"
+
+    # If Cloudinary is configured, store remotely and keep DB as a URL.
+    if cloudinary_enabled():
+        # Best-effort cleanup of previous profile image.
+        try:
+            if (me.profile_image_cloudinary_public_id or "").strip():
+                cloudinary_destroy(public_id=me.profile_image_cloudinary_public_id, resource_type="image")
+        except Exception:
+            pass
+        try:
+            url, pid = cloudinary_upload_bytes(
+                raw=raw,
+                resource_type="image",
+                public_id=f"user_profile_{me.id}_{token}",
+                filename=(file.filename or "").strip() or safe_name,
+                content_type=content_type,
+            )
+        except Exception:
+            raise HTTPException(status_code=500, detail="Failed to upload to Cloudinary")
+        me.profile_image_path = url
+        me.profile_image_url = public_media_url(url)
+        me.profile_image_missing = False
+        me.profile_image_cloudinary_public_id = pid
+    else:
+        disk_path = os.path.join(uploads_dir(), safe_name)
+        try:
+            with open(disk_path, "wb") as out:
+                out.write(raw)
+        except Exception:
+            raise HTTPException(status_code=500, detail="Failed to save upload")
+        me.profile_image_path = safe_name
+        me.profile_image_url = public_media_url(safe_name)
+        me.profile_image_missing = False
+        me.profile_image_cloudinary_public_id = ""
+    db.add(me)
+    return {"ok": True, "user": user_out(me)}
+
+
+@router.post("/properties/{property_id:int}/images")
+def upload_property_image(
+    property_id: int,
+    me: Annotated[User, Depends(get_current_user)],
+    db: Annotated[Session, Depends(get_db)],
+    file: UploadFile = File(...),
+    sort_order: int = Query(default=0),
+):
+    """
+    Upload an image/video for a property listing.
+    Note: This stores the file locally. For production, swap to S3/GCS/etc.
+    """
+    p = db.get(Property, int(property_id))
+    if not p:
+        raise HTTPException(status_code=404, detail="Property not found")
+    if me.role != "admin" and p.owner_id != me.id:
+        raise HTTPException(status_code=403, detail="Not allowed")
+    if is_guest_account(me):
+        raise HTTPException(status_code=403, detail="Please register/login to publish ads")
+    if me.role == "owner" and (me.approval_status or "") != "approved":
+        raise HTTPException(status_code=403, detail="Owner account is pending admin approval")
+
+    content_type = (file.content_type or "").lower().strip()
+    guessed_type = (mimetypes.guess_type(file.filename or "")[0] or "").lower().strip()
+    if not content_type or content_type == "application/octet-stream":
+        content_type = guessed_type or content_type
+    is_image = content_type.startswith("image/")
+    is_video = content_type.startswith("video/")
+    if not is_image and not is_video:
+        ext = os.path.splitext(file.filename or "")[1].lower()
+        image_exts = {".png", ".jpg", ".jpeg", ".webp", ".gif"}
+        video_exts = {".mp4", ".mov", ".m4v", ".avi", ".mkv"}
+        if ext in image_exts:
+            is_image = True
+            content_type = guessed_type or "image/*"
+        elif ext in video_exts:
+            is_video = True
+            content_type = guessed_type or "video/*"
+    if not is_image and not is_video:
+        raise HTTPException(status_code=400, detail="Only image/video uploads are allowed")
+
+    # Enforce per-ad media limits.
+    max_images = 10
+    max_videos = 1
+    existing_media = db.execute(select(PropertyImage.content_type).where(PropertyImage.property_id == p.id)).scalars().all()
+    existing_images = sum(1 for ct in existing_media if str(ct or "").lower().startswith("image/"))
+    existing_videos = sum(1 for ct in existing_media if str(ct or "").lower().startswith("video/"))
+    if is_image and existing_images >= max_images:
+        raise HTTPException(status_code=400, detail=f"Maximum {max_images} images are allowed per ad")
+    if is_video and existing_videos >= max_videos:
+        raise HTTPException(status_code=400, detail=f"Maximum {max_videos} video is allowed per ad")
+
+    # Read bytes once to compute hash and store on disk.
+    try:
+        raw = file.file.read()
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid upload")
+    if not raw:
+        raise HTTPException(status_code=400, detail="Empty upload")
+
+    if is_image:
+        _raise_if_too_large(size_bytes=len(raw), max_bytes=_max_upload_image_bytes())
+        # AI moderation (reject before any storage).
+        mod = _openai_moderate_image(raw=raw)
+        if bool(mod.get("flagged")):
+            log_moderation(
+                db,
+                actor_user_id=me.id,
+                entity_type="property_media_upload",
+                entity_id=int(p.id),
+                action="reject",
+                reason=f"Unsafe image rejected by AI moderation ({mod.get('summary')})",
+            )
+            raise HTTPException(status_code=400, detail="Unsafe media detected. Upload rejected.")
+        stored_bytes = raw
+        stored_ext = _safe_upload_ext(filename=(file.filename or ""), content_type=content_type)
+        stored_content_type = content_type
+    else:
+        _raise_if_too_large(size_bytes=len(raw), max_bytes=_max_upload_video_bytes())
+        # AI moderation (reject before any storage).
+        mod = _openai_moderate_video(raw=raw)
+        if bool(mod.get("flagged")):
+            log_moderation(
+                db,
+                actor_user_id=me.id,
+                entity_type="property_media_upload",
+                entity_id=int(p.id),
+                action="reject",
+                reason=f"Unsafe video rejected by AI moderation ({mod.get('summary')})",
+            )
+            raise HTTPException(status_code=400, detail="Unsafe media detected. Upload rejected.")
+        stored_bytes = raw
+        stored_ext = _safe_upload_ext(filename=(file.filename or ""), content_type=content_type)
+        stored_content_type = content_type
+
+    img_hash = _image_sha256_hex(stored_bytes)
+    existing = db.execute(select(PropertyImage).where(PropertyImage.image_hash == img_hash)).scalar_one_or_none()
+    if existing:
+        raise HTTPException(status_code=409, detail="Duplicate media detected (hash already exists)")
+
+    requested_sort = int(sort_order)
+    # Clients commonly upload all media with sort_order=0.
+    # Keep DB uniqueness intact by auto-assigning the next available sort_order if needed.
+    try:
+        existing_orders = db.execute(select(PropertyImage.sort_order).where(PropertyImage.property_id == p.id)).scalars().all()
+        used = {int(x or 0) for x in existing_orders}
+    except Exception:
+        used = set()
+    if requested_sort in used:
+        requested_sort = (max(used) + 1) if used else 0
+
+    token = secrets.token_hex(8)
+    safe_name = f"p{p.id}_{token}{stored_ext}"
+
+    cloud_pid = ""
+    stored_path = safe_name
+    if cloudinary_enabled():
+        try:
+            url, pid = cloudinary_upload_bytes(
+                raw=stored_bytes,
+                resource_type=("image" if is_image else "video"),
+                public_id=f"property_{p.id}_{token}",
+                filename=(file.filename or "").strip() or safe_name,
+                content_type=stored_content_type,
+            )
+        except Exception:
+            raise HTTPException(status_code=500, detail="Failed to upload to Cloudinary")
+        stored_path = url
+        cloud_pid = pid
+    else:
+        disk_path = os.path.join(uploads_dir(), safe_name)
+        try:
+            with open(disk_path, "wb") as out:
+                out.write(stored_bytes)
+        except Exception:
+            raise HTTPException(status_code=500, detail="Failed to save upload")
+
+    img = PropertyImage(
+        property_id=p.id,
+        file_path=stored_path,
+        public_url=public_media_url(stored_path),
+        cloudinary_public_id=cloud_pid,
+        sort_order=int(requested_sort),
+        image_hash=img_hash,
+        original_filename=(file.filename or "").strip(),
+        content_type=stored_content_type,
+        size_bytes=int(len(stored_bytes)),
+        # Make uploads visible immediately (AI moderation already ran before storage).
+        status="approved",
+        uploaded_by_user_id=me.id,
+    )
+    db.add(img)
+    try:
+        db.flush()
+    except IntegrityError:
+        # Best-effort: resolve a rare concurrent sort_order collision.
+        db.rollback()
+        max_sort = db.execute(select(func.max(PropertyImage.sort_order)).where(PropertyImage.property_id == p.id)).scalar()
+        next_sort = int(max_sort or -1) + 1
+        img = PropertyImage(
+            property_id=p.id,
+            file_path=stored_path,
+            public_url=public_media_url(stored_path),
+            cloudinary_public_id=cloud_pid,
+            sort_order=int(next_sort),
+            image_hash=img_hash,
+            original_filename=(file.filename or "").strip(),
+            content_type=stored_content_type,
+            size_bytes=int(len(stored_bytes)),
+            status="approved",
+            uploaded_by_user_id=me.id,
+        )
+        db.add(img)
+        db.flush()
+    log_moderation(db, actor_user_id=me.id, entity_type="property_image", entity_id=img.id, action="upload", reason="")
+    return {
+        "id": img.id,
+        "url": public_media_url(img.file_path),
+        "sort_order": img.sort_order,
+        "status": img.status,
+        "image_hash": img.image_hash,
+    }
@@ -0,0 +1,306 @@
+from __future__ import annotations
+
+import datetime as dt
+import json
+import os
+from typing import Annotated
+
+from fastapi import Depends, HTTPException, Query
+from fastapi.responses import ORJSONResponse
+from sqlalchemy import delete, select
+from sqlalchemy.orm import Session
+
+from app.config import uploads_dir
+from app.deps import get_current_read_user, get_current_user, get_db, get_read_db
+from app.identifiers import norm_phone as _norm_phone
+from app.listings import PropertyFieldset, cover_images, property_out
+from app.models import ContactUsage, FreeContactUsage, Property, PropertyImage, SavedProperty, User
+from app.routers import api_router
+from app.schemas import PropertyCreateIn, PropertyUpdateIn
+from app.services import (
+    ensure_property_ad_number,
+    is_guest_account,
+    log_moderation,
+    norm_key,
+    validate_location_selection,
+)
+from app.utils.cloudinary_storage import destroy as cloudinary_destroy
+
+
+# Attached by app.main.create_app().
+router = api_router()
+
+
+@router.get("/owner/properties")
+def owner_list_properties(
+    me: Annotated[User, Depends(get_current_read_user)],
+    db: Annotated[Session, Depends(get_read_db)],
+    view: str | None = Query(default=None),  # card|full
+    fields: str | None = Query(default=None),  # comma-separated keys
+):
+    if me.role not in {"user", "owner", "admin"}:
+        raise HTTPException(status_code=403, detail="Login required")
+    fs = PropertyFieldset.parse(view, fields, internal=True)
+    stmt = (
+        select(Property)
+        .options(*fs.load_options(owner_entity=False))
+        .where(Property.owner_id == me.id)
+        .order_by(Property.created_at.desc(), Property.id.desc())
+    )
+    props = db.execute(stmt).scalars().all()
+    covers = cover_images(db, [p.id for p in props], approved_only=False) if fs.cover_only and fs.images else {}
+    items = [
+        property_out(p, owner=me, include_unapproved_images=True, include_internal=True, fieldset=fs, cover=covers.get(int(p.id)))
+        for p in props
+    ]
+    return ORJSONResponse({"items": items})
+
+
+@router.delete("/owner/properties/{property_id:int}")
+def owner_delete_property(
+    property_id: int,
+    me: Annotated[User, Depends(get_current_user)],
+    db: Annotated[Session, Depends(get_db)],
+):
+    if me.role not in {"user", "owner", "admin"}:
+        raise HTTPException(status_code=403, detail="Login required")
+    p = db.get(Property, int(property_id))
+    if not p:
+        raise HTTPException(status_code=404, detail="Ad not found")
+    if me.role != "admin" and int(p.owner_id) != int(me.id):
+        raise HTTPException(status_code=403, detail="Only the owner who created the ad can delete it")
+
+    # Best-effort: delete uploaded media (Cloudinary and/or local disk).
+    try:
+        for img in (p.images or []):
+            if (img.cloudinary_public_id or "").strip():
+                rt = "video" if str(img.content_type or "").lower().startswith("video/") else "image"
+                cloudinary_destroy(public_id=img.cloudinary_public_id, resource_type=rt)
+            fp = (img.file_path or "").strip().lstrip("/")
+            if fp and not fp.startswith("http"):
+                disk_path = os.path.join(uploads_dir(), fp)
+                try:
+                    if os.path.exists(disk_path):
+                        os.remove(disk_path)
+                except Exception:
+                    pass
+    except Exception:
+        pass
+
+    # Remove dependent rows first (avoid FK issues).
+    db.execute(delete(FreeContactUsage).where(FreeContactUsage.property_id == int(property_id)))
+    db.execute(delete(ContactUsage).where(ContactUsage.property_id == int(property_id)))
+    db.execute(delete(SavedProperty).where(SavedProperty.property_id == int(property_id)))
+    db.execute(delete(PropertyImage).where(PropertyImage.property_id == int(property_id)))
+    db.execute(delete(Property).where(Property.id == int(property_id)))
+    log_moderation(db, actor_user_id=me.id, entity_type="property", entity_id=int(property_id), action="delete", reason="")
+    return {"ok": True}
+
+
+# -----------------------
+# Owner flow: create listing (images uploaded separately)
+# -----------------------
+@router.post("/owner/properties")
+def owner_create_property(
+    data: PropertyCreateIn,
+    me: Annotated[User, Depends(get_current_user)],
+    db: Annotated[Session, Depends(get_db)],
+):
+    if me.role not in {"user", "owner", "admin"}:
+        raise HTTPException(status_code=403, detail="Login required")
+    if is_guest_account(me):
+        raise HTTPException(status_code=403, detail="Please register/login to publish ads")
+    if me.role == "owner" and (me.approval_status or "") != "approved":
+        raise HTTPException(status_code=403, detail="Owner account is pending admin approval")
+
+    district = (data.district or "").strip()
+    state = (data.state or "").strip()
+    area = (data.area or "").strip()
+    validate_location_selection(state=state, district=district, area=area)
+
+    lat = data.gps_lat
+    lng = data.gps_lng
+    lat_f: float | None = None
+    lng_f: float | None = None
+    # GPS is optional if State/District/Area are selected.
+    # If provided, both coordinates must be valid.
+    if lat is not None or lng is not None:
+        if lat is None or lng is None:
+            raise HTTPException(status_code=400, detail="Provide both GPS latitude and longitude (or omit both)")
+        try:
+            lat_f = float(lat)
+            lng_f = float(lng)
+        except Exception:
+            raise HTTPException(status_code=400, detail="Invalid GPS coordinates")
+        if not (-90.0 <= lat_f <= 90.0) or not (-180.0 <= lng_f <= 180.0):
+            raise HTTPException(status_code=400, detail="Invalid GPS coordinates")
+    address = (data.address or "").strip() or (data.location or "").strip()
+    address_norm = norm_key(address)
+    contact_phone = (data.contact_phone or "").strip()
+    contact_phone_norm = _norm_phone(contact_phone)
+    company_name = (data.company_name or "").strip()
+    company_name_norm = norm_key(company_name)
+
+    # Optionally update the owner's company name profile when provided.
+    if company_name:
+        me.company_name = company_name
+        me.company_name_normalized = company_name_norm
+        db.add(me)
+
+    # Duplicate prevention: address + phone (admin can create duplicates explicitly).
+    if me.role != "admin":
+        if address_norm:
+            dup_addr = db.execute(
+                select(Property.id).where(
+                    (Property.address_normalized == address_norm) & (Property.allow_duplicate_address == False)  # noqa: E712
+                )
+            ).first()
+            if dup_addr:
+                raise HTTPException(status_code=409, detail="Duplicate address detected (admin override required)")
+        if contact_phone_norm:
+            dup_phone = db.execute(
+                select(Property.id).where(
+                    (Property.contact_phone_normalized == contact_phone_norm) & (Property.allow_duplicate_phone == False)  # noqa: E712
+                )
+            ).first()
+            if dup_phone:
+                raise HTTPException(status_code=409, detail="Duplicate listing phone detected (admin override required)")
+
+    p = Property(
+        owner_id=me.id,
+        ad_number=ensure_property_ad_number(db),
+        title=(data.title or "").strip() or "Untitled",
+        description=(data.description or "").strip(),
+        property_type=(data.property_type or "apartment").strip(),
+        rent_sale=(data.rent_sale or "rent").strip(),
+        price=int(data.price or 0),
+        location=(data.location or "").strip(),
+        address=address,
+        address_normalized=address_norm,
+        state=state,
+        district=district,
+        area=area,
+        state_normalized=norm_key(state),
+        district_normalized=norm_key(district),
+        area_normalized=norm_key(area),
+        gps_lat=lat_f,
+        gps_lng=lng_f,
+        amenities_json=json.dumps(list(data.amenities or [])),
+        availability=(data.availability or "available").strip(),
+        # Make newly posted ads visible immediately.
+        # Admins can still suspend/reject later via moderation endpoints.
+        status="approved",
+        contact_phone=contact_phone,
+        contact_phone_normalized=contact_phone_norm,
+        contact_email=(data.contact_email or "").strip(),
+        updated_at=dt.datetime.now(dt.timezone.utc),
+    )
+    db.add(p)
+    db.flush()
+    log_moderation(db, actor_user_id=me.id, entity_type="property", entity_id=p.id, action="create", reason="")
+    return {"id": p.id, "ad_number": (p.ad_number or "").strip() or str(p.id), "status": p.status}
+
+
+@router.patch("/owner/properties/{property_id:int}")
+def owner_update_property(
+    property_id: int,
+    data: PropertyUpdateIn,
+    me: Annotated[User, Depends(get_current_user)],
+    db: Annotated[Session, Depends(get_db)],
+):
+    """
+    Owner can edit their own ad. Admin can edit any ad.
+    """
+    if me.role not in {"user", "owner", "admin"}:
+        raise HTTPException(status_code=403, detail="Login required")
+    if is_guest_account(me):
+        raise HTTPException(status_code=403, detail="Please register/login to edit ads")
+
+    p = db.get(Property, int(property_id))
+    if not p:
+        raise HTTPException(status_code=404, detail="Ad not found")
+    if me.role != "admin" and int(p.owner_id) != int(me.id):
+        raise HTTPException(status_code=403, detail="Only the owner who created the ad can edit it")
+
+    # Apply updates (only fields provided by client).
+    if data.title is not None:
+        title = (data.title or "").strip()
+        if not title:
+            raise HTTPException(status_code=400, detail="Title is required")
+        p.title = title
+    if data.description is not None:
+        p.description = (data.description or "").strip()
+    if data.property_type is not None:
+        p.property_type = (data.property_type or "").strip() or p.property_type
+    if data.rent_sale is not None:
+        rs = (data.rent_sale or "").strip().lower()
+        if rs and rs not in {"rent", "sale"}:
+            raise HTTPException(status_code=400, detail="Invalid rent_sale")
+        p.rent_sale = rs or p.rent_sale
+    if data.price is not None:
+        try:
+            p.price = int(data.price or 0)
+        except Exception:
+            raise HTTPException(status_code=400, detail="Invalid price")
+    if data.location is not None:
+        p.location = (data.location or "").strip()
+    if data.address is not None:
+        address = (data.address or "").strip()
+        p.address = address
+        p.address_normalized = norm_key(address)
+    if data.amenities is not None:
+        try:
+            p.amenities_json = json.dumps(list(data.amenities or []))
+        except Exception:
+            raise HTTPException(status_code=400, detail="Invalid amenities")
+    if data.availability is not None:
+        p.availability = (data.availability or "").strip() or p.availability
+    if data.contact_phone is not None:
+        ph = (data.contact_phone or "").strip()
+        p.contact_phone = ph
+        p.contact_phone_normalized = _norm_phone(ph)
+    if data.contact_email is not None:
+        p.contact_email = (data.contact_email or "").strip()
+
+    # Optional company name update: also updates owner profile if owner edits.
+    if data.company_name is not None:
+        company_name = (data.company_name or "").strip()
+        if company_name and me.role != "admin":
+            me.company_name = company_name
+            me.company_name_normalized = norm_key(company_name)
+            db.add(me)
+
+    # GPS updates (if explicitly provided).
+    if data.gps_lat is not None or data.gps_lng is not None:
+        if data.gps_lat is None or data.gps_lng is None:
+            raise HTTPException(status_code=400, detail="Provide both GPS latitude and longitude (or omit both)")
+        try:
+            lat_f = float(data.gps_lat)
+            lng_f = float(data.gps_lng)
+        except Exception:
+            raise HTTPException(status_code=400, detail="Invalid GPS coordinates")
+        if not (-90.0 <= lat_f <= 90.0) or not (-180.0 <= lng_f <= 180.0):
+            raise HTTPException(status_code=400, detail="Invalid GPS coordinates")
+        p.gps_lat = lat_f
+        p.gps_lng = lng_f
+
+    # Location updates: if any part is provided, require the full trio after applying.
+    loc_touched = (data.state is not None) or (data.district is not None) or (data.area is not None)
+    if loc_touched:
+        if data.state is not None:
+            p.state = (data.state or "").strip()
+            p.state_normalized = norm_key(p.state)
+        if data.district is not None:
+            p.district = (data.district or "").strip()
+            p.district_normalized = norm_key(p.district)
+        if data.area is not None:
+            p.area = (data.area or "").strip()
+            p.area_normalized = norm_key(p.area)
+        validate_location_selection(state=p.state, district=p.district, area=p.area)
+
+    p.updated_at = dt.datetime.now(dt.timezone.utc)
+    db.add(p)
+    log_moderation(db, actor_user_id=me.id, entity_type="property", entity_id=p.id, action="update", reason="")
+
+    owner = me if int(p.owner_id) == int(me.id) else db.get(User, int(p.owner_id))
+    return {"ok": True, "property": property_out(p, owner=owner or me, include_unapproved_images=True, include_internal=True)}
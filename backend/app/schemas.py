@@ -0,0 +1,138 @@
+from __future__ import annotations
+
+from pydantic import BaseModel, Field
+
+
+class RegisterIn(BaseModel):
+    email: str
+    # We keep `username` for backward compatibility, but the mobile UI will use phone.
+    # If `phone` is present, server will treat it as the primary identifier.
+    username: str = ""
+    phone: str = ""
+    password: str = Field(min_length=6)
+    name: str = ""
+    state: str = ""
+    district: str = ""
+    role: str = "user"  # user | owner
+    owner_category: str = ""  # required when role=owner (enforced softly)
+    company_name: str = ""
+    company_description: str = ""
+    company_address: str = ""
+    gender: str = ""  # legacy (old clients)
+
+
+class LoginRequestOtpIn(BaseModel):
+    identifier: str
+    password: str
+
+
+class LoginVerifyOtpIn(BaseModel):
+    identifier: str
+    password: str
+    otp: str
+
+
+class GoogleLoginIn(BaseModel):
+    id_token: str = Field(..., min_length=1)
+
+
+class ForgotRequestOtpIn(BaseModel):
+    identifier: str
+
+
+class ForgotResetIn(BaseModel):
+    identifier: str
+    otp: str
+    new_password: str = Field(min_length=6)
+
+
+class MeUpdateIn(BaseModel):
+    name: str = ""
+
+
+class ChangeEmailRequestIn(BaseModel):
+    new_email: str
+
+
+class ChangeEmailVerifyIn(BaseModel):
+    new_email: str
+    otp: str
+
+
+class ChangePhoneRequestIn(BaseModel):
+    new_phone: str
+
+
+class ChangePhoneVerifyIn(BaseModel):
+    new_phone: str
+    otp: str
+
+
+class PropertyCreateIn(BaseModel):
+    title: str
+    description: str = ""
+    property_type: str = "apartment"
+    rent_sale: str = "rent"
+    price: int = 0
+    # Backward compatibility: `location` is still accepted and used as a display string.
+    location: str = ""
+    # New: structured location filtering + normalized address duplication checks.
+    state: str = ""
+    district: str = ""
+    area: str = ""
+    address: str = ""
+    amenities: list[str] = Field(default_factory=list)
+    availability: str = "available"
+    contact_phone: str = ""
+    contact_email: str = ""
+    # Optional: owner company name to display on ads.
+    # This updates the owner's profile (User.company_name) when provided.
+    company_name: str = ""
+    gps_lat: float | None = None
+    gps_lng: float | None = None
+
+
+class PropertyUpdateIn(BaseModel):
+    """
+    Partial update for owner/admin editing an existing property.
+    Only provided fields are updated.
+    """
+
+    title: str | None = None
+    description: str | None = None
+    property_type: str | None = None
+    rent_sale: str | None = None
+    price: int | None = None
+    location: str | None = None
+    state: str | None = None
+    district: str | None = None
+    area: str | None = None
+    address: str | None = None
+    amenities: list[str] | None = None
+    availability: str | None = None
+    contact_phone: str | None = None
+    contact_email: str | None = None
+    company_name: str | None = None
+    gps_lat: float | None = None
+    gps_lng: float | None = None
+
+
+class ModerateIn(BaseModel):
+    reason: str = ""
+
+
+class BulkModerateIn(BaseModel):
+    ids: list[int] = Field(min_length=1)
+    action: str  # approve | reject | suspend
+    reason: str = ""
+
+
+class AllowDuplicatesIn(BaseModel):
+    allow_duplicate_address: bool | None = None
+    allow_duplicate_phone: bool | None = None
+    reason: str = ""
+
+
+class AdminLoginIn(BaseModel):
+    identifier: str
+    password: str
@@ -1,26 +1,163 @@
 from __future__ import annotations
 
+import asyncio
 import datetime as dt
+import secrets
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from threading import BoundedSemaphore, Lock
+from typing import Any, Callable, TypeVar
 
 import jwt
 import bcrypt
 
-from app.config import jwt_secret
+from app.config import bcrypt_rounds, jwt_secret, password_hash_max_queue, password_hash_workers
+
+
+T = TypeVar("T")
+
+# Stored in `password_hash` for accounts that cannot log in with a password
+# (guests, Google-only users). Never a valid bcrypt hash, so no hashing is needed.
+UNUSABLE_PASSWORD_PREFIX = "!"
+
+
+class PasswordHashingBusy(RuntimeError):
+    """Raised when the bcrypt executor queue is full (mapped to HTTP 503)."""
+
+
+class _PasswordHashingPool:
+    """
+    Size-bounded executor for bcrypt work.
+
+    bcrypt releases the GIL, so without a bound every request thread can burn a full core
+    during signup/login bursts and starve cheap feed requests. At most `workers` hashes run
+    concurrently and at most `max_queue` wait; anything beyond that fails fast.
+
+    Request handlers await submit() (hash_password_async / verify_password_async), so a
+    queued hash holds no request thread. run() blocks the calling thread and is for
+    bootstrap and scripts.
+    """
+
+    def __init__(self, *, workers: int, max_queue: int) -> None:
+        self.workers = int(workers)
+        self.max_queue = int(max_queue)
+        self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="pwhash")
+        self._slots = BoundedSemaphore(self.workers + self.max_queue)
+        self._lock = Lock()
+        self._queued = 0
+        self._running = 0
+        self._completed = 0
+        self._rejected = 0
+        self._wait_seconds_total = 0.0
+        self._wait_seconds_max = 0.0
+        self._run_seconds_total = 0.0
+
+    def run(self, fn: Callable[..., T], *args: Any) -> T:
+        """submit() and wait for the result on the calling thread."""
+        return self.submit(fn, *args).result()
+
+    def submit(self, fn: Callable[..., T], *args: Any) -> "Future[T]":
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self._rejected += 1
+            raise PasswordHashingBusy("Password hashing queue is full")
+        submitted = time.perf_counter()
+        with self._lock:
+            self._queued += 1
+
+        def _task() -> T:
+            started = time.perf_counter()
+            with self._lock:
+                self._queued -= 1
+                self._running += 1
+                waited = started - submitted
+                self._wait_seconds_total += waited
+                self._wait_seconds_max = max(self._wait_seconds_max, waited)
+            try:
+                return fn(*args)
+            finally:
+                with self._lock:
+                    self._running -= 1
+                    self._completed += 1
+                    self._run_seconds_total += time.perf_counter() - started
+
+        try:
+            fut = self._executor.submit(_task)
+        except Exception:
+            with self._lock:
+                self._queued -= 1
+            self._slots.release()
+            raise
+        # Release the slot when the work finishes, not when the caller stops waiting.
+        fut.add_done_callback(lambda _f: self._slots.release())
+        return fut
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "max_queue": self.max_queue,
+                "queued": self._queued,
+                "running": self._running,
+                "completed_total": self._completed,
+                "rejected_total": self._rejected,
+                "wait_seconds_total": round(self._wait_seconds_total, 6),
+                "wait_seconds_max": round(self._wait_seconds_max, 6),
+                "run_seconds_total": round(self._run_seconds_total, 6),
+            }
+
+
+_pool: _PasswordHashingPool | None = None
+_pool_lock = Lock()
+
+
+def _hashing_pool() -> _PasswordHashingPool:
+    # Created lazily so each (forked) uvicorn worker gets its own threads.
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = _PasswordHashingPool(workers=password_hash_workers(), max_queue=password_hash_max_queue())
+    return _pool
+
+
+def password_hashing_stats() -> dict[str, Any]:
+    return _hashing_pool().stats()
 
 
 def hash_password(password: str) -> str:
     # bcrypt stores algorithm + cost + salt in the resulting hash string.
     password_bytes = password.encode("utf-8")
-    salt = bcrypt.gensalt(rounds=12)
-    return bcrypt.hashpw(password_bytes, salt).decode("utf-8")
+    salt = bcrypt.gensalt(rounds=bcrypt_rounds())
+    return _hashing_pool().run(bcrypt.hashpw, password_bytes, salt).decode("utf-8")
+
+
+async def hash_password_async(password: str) -> str:
+    """hash_password() for async handlers: awaits the bcrypt executor without holding a thread."""
+    salt = bcrypt.gensalt(rounds=bcrypt_rounds())
+    hashed = await asyncio.wrap_future(_hashing_pool().submit(bcrypt.hashpw, password.encode("utf-8"), salt))
+    return hashed.decode("utf-8")
+
+
+def make_unusable_password() -> str:
+    return UNUSABLE_PASSWORD_PREFIX + secrets.token_hex(8)
+
+
+def has_usable_password(password_hash: str | None) -> bool:
+    return bool(password_hash) and not str(password_hash).startswith(UNUSABLE_PASSWORD_PREFIX)
 
 
 def verify_password(password: str, password_hash: str) -> bool:
+    if not has_usable_password(password_hash):
+        return False
     try:
-        return bcrypt.checkpw(
+        return _hashing_pool().run(
+            bcrypt.checkpw,
             password.encode("utf-8"),
             password_hash.encode("utf-8"),
         )
+    except PasswordHashingBusy:
+        raise
     except ValueError:
         # Invalid hash format.
         return False
@@ -28,6 +165,36 @@ def verify_password(password: str, password_hash: str) -> bool:
         return False
 
 
+async def verify_password_async(password: str, password_hash: str) -> bool:
+    if not has_usable_password(password_hash):
+        return False
+    try:
+        return await asyncio.wrap_future(
+            _hashing_pool().submit(bcrypt.checkpw, password.encode("utf-8"), password_hash.encode("utf-8"))
+        )
+    except PasswordHashingBusy:
+        raise
+    except Exception:
+        # Invalid hash format.
+        return False
+
+
+def password_needs_rehash(password_hash: str) -> bool:
+    """
+    True when a valid bcrypt hash was created with a different cost factor than configured.
+    Format: $2b$<cost>$<salt+hash>
+    """
+    if not has_usable_password(password_hash):
+        return False
+    parts = str(password_hash).split("$")
+    if len(parts) < 4 or not parts[1].startswith("2"):
+        return False
+    try:
+        return int(parts[2]) != bcrypt_rounds()
+    except ValueError:
+        return False
+
+
 def create_access_token(*, user_id: int, role: str) -> str:
     now = dt.datetime.now(dt.timezone.utc)
     payload = {"sub": str(user_id), "role": role, "iat": int(now.timestamp())}
@@ -36,4 +203,3 @@ def create_access_token(*, user_id: int, role: str) -> str:
 
 def decode_access_token(token: str) -> dict:
     return jwt.decode(token, jwt_secret(), algorithms=["HS256"])
-
@@ -0,0 +1,260 @@
+from __future__ import annotations
+
+import datetime as dt
+import json
+import os
+import re
+import secrets
+from typing import Any
+from functools import lru_cache
+
+from fastapi import HTTPException
+from sqlalchemy import insert, select
+from sqlalchemy.orm import Session
+
+from app.media_urls import stored_media_url
+from app.models import ModerationLog, Property, SubscriptionPlan, User
+from app.security import hash_password_async, password_needs_rehash, verify_password_async
+
+
+# -----------------------
+# Locations (State/District/Area)
+# -----------------------
+def _locations_json_path() -> str:
+    # Backend-owned location dataset (single source of truth).
+    default = os.path.abspath(os.path.join(os.path.dirname(__file__), "locations.json"))
+    return (os.environ.get("LOCATIONS_JSON_PATH") or default).strip() or default
+
+
+@lru_cache(maxsize=1)
+def load_locations() -> dict[str, dict[str, list[str]]]:
+    """
+    Load State → District → Area dataset.
+    Shape: { "Tamil Nadu": { "Chennai": ["Guindy", ...] } }
+    """
+    p = _locations_json_path()
+    if not os.path.exists(p):
+        raise HTTPException(status_code=503, detail=f"Location dataset missing at {p}")
+    try:
+        data = json.loads(open(p, "r", encoding="utf-8").read() or "{}")
+    except Exception:
+        raise HTTPException(status_code=503, detail="Failed to read location dataset")
+    if not isinstance(data, dict) or not data:
+        raise HTTPException(status_code=503, detail="Location dataset is empty")
+
+    out: dict[str, dict[str, list[str]]] = {}
+    for st, districts in data.items():
+        if not isinstance(st, str) or not st.strip():
+            continue
+        if not isinstance(districts, dict):
+            continue
+        dd: dict[str, list[str]] = {}
+        for d, areas in districts.items():
+            if not isinstance(d, str) or not d.strip():
+                continue
+            if isinstance(areas, list):
+                dd[d.strip()] = [str(a).strip() for a in areas if str(a).strip()]
+            else:
+                dd[d.strip()] = []
+        if dd:
+            out[st.strip()] = dd
+    if not out:
+        raise HTTPException(status_code=503, detail="Location dataset has no valid entries")
+    return out
+
+
+def validate_location_selection(*, state: str, district: str, area: str) -> None:
+    data = load_locations()
+    st = (state or "").strip()
+    d = (district or "").strip()
+    a = (area or "").strip()
+    if not st or not d or not a:
+        raise HTTPException(status_code=400, detail="State, District, and Area are required")
+    if st not in data:
+        raise HTTPException(status_code=400, detail="Invalid State")
+    if d not in (data.get(st) or {}):
+        raise HTTPException(status_code=400, detail="Invalid District for State")
+    areas = (data.get(st) or {}).get(d) or []
+    if a not in areas:
+        raise HTTPException(status_code=400, detail="Invalid Area for State/District")
+
+
+# -----------------------
+# Accounts
+# -----------------------
+def is_guest_account(u: User) -> bool:
+    """
+    Guest accounts are temporary users created via /auth/guest.
+    They must not be allowed to publish ads.
+    """
+    email = (getattr(u, "email", "") or "").strip().lower()
+    username = (getattr(u, "username", "") or "").strip().lower()
+    return email.endswith("@guest.local") or username.startswith("guest_") or username.startswith("guest-")
+
+
+def user_out(u: User) -> dict[str, Any]:
+    return {
+        "id": u.id,
+        "email": u.email,
+        "name": u.name,
+        "role": u.role,
+        "phone": u.phone,
+        "state": u.state,
+        "district": u.district,
+        "owner_category": u.owner_category,
+        "company_name": u.company_name,
+        # Missing local files are omitted so clients don't request stale uploads.
+        "profile_image_url": stored_media_url(u.profile_image_path, u.profile_image_url, u.profile_image_missing),
+    }
+
+
+# -----------------------
+# Listings
+# -----------------------
+def norm_key(s: str) -> str:
+    """
+    Normalize human-entered values for duplicate detection and strict matching.
+    - lowercase
+    - strip
+    - replace non-alphanumeric with spaces
+    - collapse whitespace
+    """
+    s = (s or "").strip().lower()
+    s = re.sub(r"[^a-z0-9]+", " ", s)
+    s = re.sub(r"\s+", " ", s).strip()
+    return s
+
+
+_AD_NUMBER_ALPHABET = "ABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789"
+
+
+def _base36(n: int) -> str:
+    if n < 0:
+        raise ValueError("base36 only supports non-negative integers")
+    chars = "0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+    if n == 0:
+        return "0"
+    out = ""
+    while n:
+        n, r = divmod(n, 36)
+        out = chars[r] + out
+    return out
+
+
+def _new_ad_number() -> str:
+    """
+    6-char uppercase alphanumeric, date-based prefix.
+
+    Format: DDDDXX
+    - DDDD: base36(days since 2020-01-01 UTC), left-padded to 4 chars
+    - XX: 2 random base36 chars
+    """
+    today = dt.datetime.now(dt.timezone.utc).date()
+    epoch = dt.date(2020, 1, 1)
+    days = max(0, (today - epoch).days)
+    day_part = _base36(days)[-4:].rjust(4, "0")
+    rand_part = "".join(secrets.choice(_AD_NUMBER_ALPHABET) for _ in range(2))
+    return f"{day_part}{rand_part}"
+
+
+def ensure_property_ad_number(db: Session) -> str:
+    # Extremely low collision probability, but still enforce uniqueness at DB level.
+    for _ in range(50):
+        code = _new_ad_number()
+        exists = db.execute(select(Property.id).where(Property.ad_number == code)).first()
+        if not exists:
+            return code
+    # Fallback: if RNG keeps colliding (unlikely), fail deterministically.
+    raise HTTPException(status_code=500, detail="Failed to allocate ad number")
+
+
+# -----------------------
+# Passwords
+# -----------------------
+async def check_password_async(user: User, password: str) -> bool:
+    """
+    Verify a login password and transparently upgrade the stored hash when the
+    configured bcrypt cost factor changed (caller's session commit persists it).
+    Awaits the bcrypt executor, so no request thread waits on the hash.
+    """
+    if not await verify_password_async(password, user.password_hash):
+        return False
+    if password_needs_rehash(user.password_hash):
+        # Plain attribute set (no I/O); the handler's session commit persists it.
+        user.password_hash = await hash_password_async(password)
+    return True
+
+
+# -----------------------
+# Moderation
+# -----------------------
+def log_moderation(
+    db: Session,
+    *,
+    actor_user_id: int,
+    entity_type: str,
+    entity_id: int,
+    action: str,
+    reason: str = "",
+) -> None:
+    db.add(
+        ModerationLog(
+            actor_user_id=int(actor_user_id),
+            entity_type=(entity_type or "").strip(),
+            entity_id=int(entity_id),
+            action=(action or "").strip(),
+            reason=(reason or "").strip(),
+        )
+    )
+
+
+def log_moderations(
+    db: Session,
+    *,
+    actor_user_id: int,
+    entity_type: str,
+    entity_ids: list[int],
+    action: str,
+    reason: str = "",
+) -> None:
+    """log_moderation for a batch: one multi-row INSERT."""
+    if not entity_ids:
+        return
+    row = {
+        "actor_user_id": int(actor_user_id),
+        "entity_type": (entity_type or "").strip(),
+        "action": (action or "").strip(),
+        "reason": (reason or "").strip(),
+    }
+    db.execute(insert(ModerationLog), [{**row, "entity_id": int(i)} for i in entity_ids])
+
+
+# -----------------------
+# Subscription plans
+# -----------------------
+def ensure_plans(db: Session) -> None:
+    """
+    Ensure the four plans exist. This is idempotent.
+    """
+    def _env_int(name: str, default: int) -> int:
+        try:
+            return int(os.environ.get(name) or default)
+        except Exception:
+            return int(default)
+
+    plans = [
+        ("aggressive_10", "Aggressive", 10, 30, 10),
+        ("instant_79", "Instant", _env_int("SUBSCRIPTION_PRICE_INSTANT_INR", 79), 30, 50),
+        ("smart_monthly_199", "Smart", _env_int("SUBSCRIPTION_PRICE_SMART_INR", 199), 30, 200),
+        ("business_quarterly_499", "Business", _env_int("SUBSCRIPTION_PRICE_BUSINESS_INR", 499), 90, 1000),
+    ]
+    for pid, name, price, days, limit in plans:
+        rec = db.get(SubscriptionPlan, pid)
+        if not rec:
+            db.add(SubscriptionPlan(id=pid, name=name, price_inr=price, duration_days=days, contact_limit=limit))
+        else:
+            rec.name = name
+            rec.price_inr = int(price)
+            rec.duration_days = int(days)
+            rec.contact_limit = int(limit)
+            db.add(rec)
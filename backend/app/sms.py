@@ -3,6 +3,8 @@ from __future__ import annotations
 import logging
 import os
 
+from app.tracing import traced
+
 logger = logging.getLogger(__name__)
 
 
@@ -15,6 +17,7 @@ def sms_backend() -> str:
     return (os.environ.get("SMS_BACKEND") or "console").strip().lower()
 
 
+@traced("sms.send", kind="CLIENT")
 def send_sms(*, to_phone: str, text: str) -> str:
     """
     Sends an SMS message (best-effort).
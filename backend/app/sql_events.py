@@ -0,0 +1,85 @@
+from __future__ import annotations
+
+import threading
+import time
+from typing import Callable
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+
+class ExecutedStatement:
+    """One finished SQL statement, timed once for every observer."""
+
+    __slots__ = ("dialect", "statement", "executemany", "start_ns", "seconds", "error")
+
+    def __init__(
+        self,
+        dialect: str,
+        statement: str,
+        executemany: bool,
+        start_ns: int,
+        seconds: float,
+        error: BaseException | None = None,
+    ) -> None:
+        self.dialect = dialect
+        self.statement = statement
+        self.executemany = executemany
+        # Wall-clock start (trace spans) and perf_counter duration (metrics, profiling).
+        self.start_ns = start_ns
+        self.seconds = seconds
+        self.error = error
+
+
+StatementObserver = Callable[[ExecutedStatement], None]
+
+# Copy-on-write tuple: the cursor hooks iterate it without taking the lock.
+_observers: tuple[StatementObserver, ...] = ()
+_lock = threading.Lock()
+_installed = False
+
+
+def _before_cursor_execute(conn, _cursor, _statement, _params, _context, _executemany) -> None:
+    conn.info.setdefault("sql_event_starts", []).append((time.time_ns(), time.perf_counter()))
+
+
+def _finish(conn, statement: str, executemany: bool, error: BaseException | None) -> None:
+    starts = conn.info.get("sql_event_starts")
+    if not starts:
+        return
+    start_ns, started = starts.pop()
+    executed = ExecutedStatement(
+        conn.dialect.name, statement, executemany, start_ns, time.perf_counter() - started, error
+    )
+    for observer in _observers:
+        observer(executed)
+
+
+def _after_cursor_execute(conn, _cursor, statement, _params, _context, executemany) -> None:
+    _finish(conn, statement, executemany, None)
+
+
+def _handle_error(ctx) -> None:
+    conn = ctx.connection
+    if conn is not None:
+        executemany = bool(ctx.execution_context is not None and ctx.execution_context.executemany)
+        _finish(conn, ctx.statement or "", executemany, ctx.original_exception)
+
+
+def observe_statements(observer: StatementObserver) -> None:
+    """
+    Call `observer` after every SQL statement on every engine (sync, async and replicas),
+    failed ones included (`error` is set). Metrics, the query profiler and tracing share one
+    pair of cursor listeners and one timing per statement. Adding the same observer twice is
+    a no-op.
+    """
+    global _observers, _installed
+    with _lock:
+        if observer in _observers:
+            return
+        _observers = (*_observers, observer)
+        if not _installed:
+            event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+            event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+            event.listen(Engine, "handle_error", _handle_error)
+            _installed = True
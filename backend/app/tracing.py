@@ -0,0 +1,360 @@
+from __future__ import annotations
+
+import atexit
+import contextvars
+import functools
+import inspect
+import json
+import logging
+import random
+import re
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Iterator
+
+from app.config import tracing_exporter, tracing_file, tracing_sample_ratio, tracing_service_name
+from app.sql_events import ExecutedStatement, observe_statements
+
+logger = logging.getLogger(__name__)
+
+# W3C trace context: version-traceid-parentid-flags
+_TRACEPARENT = re.compile(r"^00-([0-9a-f]{32})-([0-9a-f]{16})-([0-9a-f]{2})$")
+
+
+# OTLP enum values (opentelemetry/proto/trace/v1/trace.proto).
+_SPAN_KINDS = {"INTERNAL": 1, "SERVER": 2, "CLIENT": 3, "PRODUCER": 4, "CONSUMER": 5}
+_STATUS_CODES = {"UNSET": 0, "OK": 1, "ERROR": 2}
+
+
+def _any_value(value: Any) -> dict[str, Any]:
+    # OTLP AnyValue; int64 fields are JSON strings in the protobuf JSON mapping.
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    if isinstance(value, (list, tuple)):
+        return {"arrayValue": {"values": [_any_value(v) for v in value]}}
+    return {"stringValue": str(value)}
+
+
+def _otlp_attributes(attributes: dict[str, Any]) -> list[dict[str, Any]]:
+    return [{"key": key, "value": _any_value(value)} for key, value in attributes.items()]
+
+
+class Span:
+    """One timed operation, exported as an OTLP/JSON span (see `to_otlp`)."""
+
+    __slots__ = ("trace_id", "span_id", "parent_span_id", "name", "kind", "start_ns", "end_ns", "attributes", "status", "status_message")
+
+    def __init__(self, name: str, *, trace_id: str, parent_span_id: str = "", kind: str = "INTERNAL") -> None:
+        self.trace_id = trace_id
+        self.span_id = f"{random.getrandbits(64):016x}"
+        self.parent_span_id = parent_span_id
+        self.name = name
+        self.kind = kind
+        self.start_ns = time.time_ns()
+        self.end_ns = 0
+        self.attributes: dict[str, Any] = {}
+        self.status = "UNSET"
+        self.status_message = ""
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def record_exception(self, exc: BaseException) -> None:
+        self.status = "ERROR"
+        self.status_message = str(exc)[:500]
+        self.attributes["exception.type"] = type(exc).__name__
+
+    def end(self, end_ns: int = 0) -> None:
+        if self.end_ns:
+            return
+        self.end_ns = end_ns or time.time_ns()
+        if _exporter is not None:
+            _exporter.export(self)
+
+    def to_otlp(self) -> dict[str, Any]:
+        out: dict[str, Any] = {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "name": self.name,
+            "kind": _SPAN_KINDS.get(self.kind, 1),
+            "startTimeUnixNano": str(self.start_ns),
+            "endTimeUnixNano": str(self.end_ns),
+            "attributes": _otlp_attributes(self.attributes),
+            "status": {"code": _STATUS_CODES.get(self.status, 0)},
+        }
+        if self.parent_span_id:
+            out["parentSpanId"] = self.parent_span_id
+        if self.status_message:
+            out["status"]["message"] = self.status_message
+        return out
+
+
+class _NotSampled:
+    """Context marker: this trace was dropped by sampling, so children are skipped too."""
+
+    trace_id = ""
+    span_id = ""
+
+
+_NOT_SAMPLED = _NotSampled()
+_current: contextvars.ContextVar[Span | _NotSampled | None] = contextvars.ContextVar("trace_span", default=None)
+
+
+class _SpanExporter:
+    """
+    Writes one OTLP/JSON ExportTraceServiceRequest per finished span (a JSON line, the format
+    the OpenTelemetry Collector's otlpjsonfile receiver reads) to a file or stderr.
+    """
+
+    def __init__(self, kind: str, path: str) -> None:
+        self.kind = kind
+        self._lock = threading.Lock()
+        self._out = open(path, "a", encoding="utf-8", buffering=64 * 1024) if kind == "file" else sys.stderr
+        atexit.register(self.flush)
+
+    def export(self, span: Span) -> None:
+        request = {
+            "resourceSpans": [
+                {
+                    "resource": {"attributes": _otlp_attributes({"service.name": _service_name})},
+                    "scopeSpans": [{"scope": {"name": __name__}, "spans": [span.to_otlp()]}],
+                }
+            ]
+        }
+        line = json.dumps(request, separators=(",", ":"))
+        with self._lock:
+            self._out.write(line + "\n")
+            if not span.parent_span_id or self.kind != "file":
+                self._out.flush()
+
+    def flush(self) -> None:
+        with self._lock:
+            try:
+                self._out.flush()
+            except Exception:
+                pass
+
+
+_exporter: _SpanExporter | None = None
+_service_name = "quickrent4u-api"
+_sample_ratio = 1.0
+_setup_lock = threading.Lock()
+
+
+def tracing_enabled() -> bool:
+    return _exporter is not None
+
+
+def current_span() -> Span | None:
+    span = _current.get()
+    return span if isinstance(span, Span) else None
+
+
+def current_trace_id() -> str:
+    span = _current.get()
+    return span.trace_id if span is not None else ""
+
+
+def parse_traceparent(value: str) -> tuple[str, str, bool] | None:
+    """(trace_id, parent_span_id, sampled) from a W3C `traceparent` header."""
+    m = _TRACEPARENT.match((value or "").strip().lower())
+    if not m or m.group(1) == "0" * 32 or m.group(2) == "0" * 16:
+        return None
+    return m.group(1), m.group(2), bool(int(m.group(3), 16) & 1)
+
+
+def start_span(
+    name: str,
+    *,
+    kind: str = "INTERNAL",
+    attributes: dict[str, Any] | None = None,
+    remote_parent: tuple[str, str, bool] | None = None,
+) -> Span | None:
+    """
+    Start a child of the current span (or a new trace). Returns None when tracing is off or
+    the trace is not sampled. The span is not made current; see `span()` for that.
+    """
+    if _exporter is None:
+        return None
+    parent = _current.get()
+    if parent is _NOT_SAMPLED:
+        return None
+    if isinstance(parent, Span):
+        span = Span(name, trace_id=parent.trace_id, parent_span_id=parent.span_id, kind=kind)
+    elif remote_parent is not None:
+        trace_id, parent_id, sampled = remote_parent
+        if not sampled:
+            return None
+        span = Span(name, trace_id=trace_id, parent_span_id=parent_id, kind=kind)
+    else:
+        if _sample_ratio < 1.0 and random.random() >= _sample_ratio:
+            return None
+        span = Span(name, trace_id=f"{random.getrandbits(128):032x}", kind=kind)
+    if attributes:
+        span.attributes.update(attributes)
+    return span
+
+
+@contextmanager
+def span(name: str, *, kind: str = "INTERNAL", attributes: dict[str, Any] | None = None) -> Iterator[Span | None]:
+    """Run a block inside a child span (no-op when tracing is off)."""
+    s = start_span(name, kind=kind, attributes=attributes)
+    if s is None:
+        yield None
+        return
+    token = _current.set(s)
+    try:
+        yield s
+    except BaseException as exc:
+        s.record_exception(exc)
+        raise
+    finally:
+        _current.reset(token)
+        s.end()
+
+
+def traced(name: str, *, kind: str = "INTERNAL") -> Callable[[Callable[..., Any]], Callable[..., Any]]:
+    """Decorator form of `span()` for sync and async functions."""
+
+    def decorate(fn: Callable[..., Any]) -> Callable[..., Any]:
+        if inspect.iscoroutinefunction(fn):
+
+            @functools.wraps(fn)
+            async def async_wrapper(*args: Any, **kwargs: Any) -> Any:
+                if _exporter is None:
+                    return await fn(*args, **kwargs)
+                with span(name, kind=kind):
+                    return await fn(*args, **kwargs)
+
+            return async_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            if _exporter is None:
+                return fn(*args, **kwargs)
+            with span(name, kind=kind):
+                return fn(*args, **kwargs)
+
+        return wrapper
+
+    return decorate
+
+
+# -----------------------
+# SQL statements
+# -----------------------
+def _record_statement(executed: ExecutedStatement) -> None:
+    if _current.get() is None:
+        return
+    s = start_span("db.query", kind="CLIENT")
+    if s is None:
+        return
+    from app.query_profiler import normalize_sql
+
+    s.start_ns = executed.start_ns
+    s.attributes.update(
+        {
+            "db.system": executed.dialect,
+            "db.statement": normalize_sql(executed.statement),
+            "db.operation": (executed.statement.lstrip().split(None, 1) or [""])[0].upper(),
+        }
+    )
+    if executed.executemany:
+        s.attributes["db.executemany"] = True
+    if executed.error is not None:
+        s.record_exception(executed.error)
+    s.end(executed.start_ns + int(executed.seconds * 1e9))
+
+
+# -----------------------
+# Log correlation
+# -----------------------
+def _install_log_correlation() -> None:
+    """Every LogRecord gets trace_id/span_id; messages logged inside a span carry them too."""
+    base_factory = logging.getLogRecordFactory()
+
+    def factory(*args: Any, **kwargs: Any) -> logging.LogRecord:
+        record = base_factory(*args, **kwargs)
+        s = _current.get()
+        record.trace_id = s.trace_id if s is not None else ""
+        record.span_id = s.span_id if s is not None else ""
+        if record.trace_id and isinstance(record.msg, str):
+            record.msg = f"{record.msg} [trace_id={record.trace_id} span_id={record.span_id}]"
+        return record
+
+    logging.setLogRecordFactory(factory)
+
+
+def setup_tracing() -> bool:
+    """
+    Enable tracing per TRACING_EXPORTER (console | file; anything else leaves it off).
+    Safe to call more than once.
+    """
+    global _exporter, _service_name, _sample_ratio
+    kind = tracing_exporter()
+    if kind not in ("console", "file"):
+        return False
+    with _setup_lock:
+        if _exporter is not None:
+            return True
+        _service_name = tracing_service_name()
+        _sample_ratio = tracing_sample_ratio()
+        _exporter = _SpanExporter(kind, tracing_file())
+        observe_statements(_record_statement)
+        _install_log_correlation()
+    logger.info("tracing enabled (exporter=%s, sample_ratio=%s)", kind, _sample_ratio)
+    return True
+
+
+class TracingMiddleware:
+    """
+    Server span per request, continuing an incoming W3C `traceparent` when present. The
+    span is named after the route template and the trace id is returned as X-Trace-Id.
+    """
+
+    def __init__(self, app: Any) -> None:
+        self.app = app
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http" or _exporter is None:
+            await self.app(scope, receive, send)
+            return
+        headers = dict(scope.get("headers") or [])
+        remote = parse_traceparent(headers.get(b"traceparent", b"").decode("latin-1"))
+        method = scope.get("method", "")
+        s = start_span(
+            f"{method} {scope.get('path', '')}",
+            kind="SERVER",
+            attributes={"http.request.method": method, "url.path": scope.get("path", "")},
+            remote_parent=remote,
+        )
+        token = _current.set(s if s is not None else _NOT_SAMPLED)
+
+        async def send_wrapper(message) -> None:
+            if s is not None and message["type"] == "http.response.start":
+                s.set_attribute("http.response.status_code", int(message["status"]))
+                if int(message["status"]) >= 500:
+                    s.status = "ERROR"
+                message = {**message, "headers": list(message.get("headers") or []) + [(b"x-trace-id", s.trace_id.encode())]}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        except BaseException as exc:
+            if s is not None:
+                s.record_exception(exc)
+            raise
+        finally:
+            _current.reset(token)
+            if s is not None:
+                route = getattr(scope.get("route"), "path", None)
+                if route:
+                    s.name = f"{method} {route}"
+                    s.set_attribute("http.route", route)
+                s.end()
@@ -1,12 +1,24 @@
-import cloudinary
 import os
+from functools import lru_cache
 
-cloudinary.config(
-    cloud_name=os.getenv("CLOUDINARY_CLOUD_NAME"),
-    api_key=os.getenv("CLOUDINARY_API_KEY"),
-    api_secret=os.getenv("CLOUDINARY_API_SECRET"),
-    secure=True
-)
+
+@lru_cache(maxsize=1)
+def configure_cloudinary():
+    """
+    Import the Cloudinary SDK and apply the env credentials. Runs once, on the first
+    upload/delete, so the SDK stays off the app's import path.
+    """
+    import cloudinary
+
+    cloudinary.config(
+        cloud_name=os.getenv("CLOUDINARY_CLOUD_NAME"),
+        api_key=os.getenv("CLOUDINARY_API_KEY"),
+        api_secret=os.getenv("CLOUDINARY_API_SECRET"),
+        secure=True,
+        # Optional API host override (regional endpoints, local stubs in load tests).
+        upload_prefix=os.getenv("CLOUDINARY_UPLOAD_PREFIX") or None,
+    )
+    return cloudinary
 
 
 def cloudinary_is_configured() -> bool:
@@ -18,4 +30,3 @@ def cloudinary_is_configured() -> bool:
         and (os.getenv("CLOUDINARY_API_KEY") or "").strip()
         and (os.getenv("CLOUDINARY_API_SECRET") or "").strip()
     )
-
@@ -4,9 +4,9 @@ import os
 from io import BytesIO
 from typing import Literal
 
-import cloudinary.uploader
-
-from app.utils.cloudinary_config import cloudinary_is_configured  # ensures cloudinary.config() runs
+from app.metrics import observe_outbound
+from app.tracing import traced
+from app.utils.cloudinary_config import cloudinary_is_configured, configure_cloudinary
 
 
 ResourceType = Literal["image", "video"]
@@ -17,6 +17,13 @@ def _cloudinary_folder() -> str:
     return (os.getenv("CLOUDINARY_FOLDER") or "quickrent4u").strip() or "quickrent4u"
 
 
+def _uploader():
+    configure_cloudinary()
+    import cloudinary.uploader
+
+    return cloudinary.uploader
+
+
 def cloudinary_enabled() -> bool:
     """
     Cloudinary is enabled iff credentials are present.
@@ -25,6 +32,7 @@ def cloudinary_enabled() -> bool:
     return cloudinary_is_configured()
 
 
+@traced("cloudinary.upload", kind="CLIENT")
 def upload_bytes(*, raw: bytes, resource_type: ResourceType, public_id: str, filename: str, content_type: str) -> tuple[str, str]:
     """
     Upload raw bytes to Cloudinary.
@@ -33,20 +41,21 @@ def upload_bytes(*, raw: bytes, resource_type: ResourceType, public_id: str, fil
     """
     # Cloudinary's python SDK accepts file-like objects.
     f = BytesIO(raw)
-    res = cloudinary.uploader.upload(
-        f,
-        resource_type=resource_type,
-        folder=_cloudinary_folder(),
-        public_id=public_id,
-        overwrite=False,
-        unique_filename=True,
-        use_filename=True,
-        filename_override=(filename or None),
-        # Helps Cloudinary infer correctly when clients send octet-stream.
-        format=None,
-        type="upload",
-        invalidate=False,
-    )
+    with observe_outbound("cloudinary"):
+        res = _uploader().upload(
+            f,
+            resource_type=resource_type,
+            folder=_cloudinary_folder(),
+            public_id=public_id,
+            overwrite=False,
+            unique_filename=True,
+            use_filename=True,
+            filename_override=(filename or None),
+            # Helps Cloudinary infer correctly when clients send octet-stream.
+            format=None,
+            type="upload",
+            invalidate=False,
+        )
     url = str((res or {}).get("secure_url") or "").strip()
     pid = str((res or {}).get("public_id") or public_id or "").strip()
     if not url:
@@ -56,6 +65,7 @@ def upload_bytes(*, raw: bytes, resource_type: ResourceType, public_id: str, fil
     return url, pid
 
 
+@traced("cloudinary.destroy", kind="CLIENT")
 def destroy(*, public_id: str, resource_type: ResourceType) -> None:
     """
     Best-effort delete of a Cloudinary asset.
@@ -64,7 +74,8 @@ def destroy(*, public_id: str, resource_type: ResourceType) -> None:
     if not pid:
         return
     try:
-        cloudinary.uploader.destroy(pid, resource_type=resource_type, invalidate=False)
+        with observe_outbound("cloudinary"):
+            _uploader().destroy(pid, resource_type=resource_type, invalidate=False)
     except Exception:
         # Best-effort cleanup; do not break API flows.
         return
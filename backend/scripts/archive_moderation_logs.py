@@ -0,0 +1,45 @@
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sys
+
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(
+        description=(
+            "Moderation log retention against DATABASE_URL: roll rows older than the hot window over "
+            "into moderation_logs_archive, then export archived rows past retention to a gzip "
+            "JSON-lines file and delete them. Run from one scheduler (e.g. daily cron). Prints one JSON line."
+        )
+    )
+    ap.add_argument("--hot-days", type=int, default=None, help="Default: MODERATION_LOG_HOT_DAYS (90).")
+    ap.add_argument("--retention-days", type=int, default=None, help="Default: MODERATION_LOG_RETENTION_DAYS (365); 0 skips the export.")
+    ap.add_argument("--export-dir", default=None, help="Default: MODERATION_LOG_EXPORT_DIR.")
+    ap.add_argument("--batch-size", type=int, default=1000)
+    ap.add_argument("--max-export-rows", type=int, default=100_000, help="Rows per export file (the rest go next run).")
+    ap.add_argument("--output", default="", help="Also append the JSON line to this file.")
+    args = ap.parse_args()
+
+    sys.path.insert(0, BACKEND_DIR)
+    from app.moderation_logs import run_moderation_log_retention
+
+    result = run_moderation_log_retention(
+        hot_days=args.hot_days,
+        retention_days=args.retention_days,
+        out_dir=args.export_dir,
+        batch_size=max(1, args.batch_size),
+        max_export_rows=max(1, args.max_export_rows),
+    )
+    line = json.dumps(result)
+    print(line)
+    if args.output:
+        with open(args.output, "a", encoding="utf-8") as f:
+            f.write(line + "\n")
+
+
+if __name__ == "__main__":
+    main()
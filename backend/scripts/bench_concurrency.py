@@ -0,0 +1,175 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from bench_seed import BACKEND_DIR, bench_env, run_child
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return int(s.getsockname()[1])
+
+
+def _start_slow_provider(delay_ms: int) -> tuple[ThreadingHTTPServer, str]:
+    """Stand-in for Brevo: accepts any POST after `delay_ms` (simulated provider latency)."""
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self) -> None:  # noqa: N802
+            self.rfile.read(int(self.headers.get("Content-Length") or 0))
+            time.sleep(delay_ms / 1000.0)
+            body = b'{"messageId":"bench"}'
+            self.send_response(201)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *_args) -> None:
+            pass
+
+    ThreadingHTTPServer.daemon_threads = True
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    server.request_queue_size = 1024
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}/v3/smtp/email"
+
+
+# Runs inside a child process (see bench_seed.run_child).
+_SEED = r"""
+from bench_seed import add_listing, add_owner, add_user
+from app.db import ENGINE, session_scope
+from app.models import Base
+Base.metadata.create_all(ENGINE)
+with session_scope() as db:
+    owner = add_owner(db)
+    for i in range(USERS):
+        add_user(db, f"user{i}")
+    for i in range(PROPERTIES):
+        add_listing(db, owner, i)
+"""
+
+
+async def _load(base_url: str, *, path_for, total: int, concurrency: int) -> dict:
+    import httpx
+
+    latencies: list[float] = []
+    errors: dict[str, int] = {}
+    counter = iter(range(total))
+
+    async with httpx.AsyncClient(base_url=base_url, timeout=60.0, limits=httpx.Limits(max_connections=concurrency)) as client:
+
+        async def worker() -> None:
+            for i in counter:
+                method, path, body = path_for(i)
+                t0 = time.perf_counter()
+                try:
+                    r = await client.request(method, path, json=body)
+                    if r.status_code >= 400:
+                        errors[str(r.status_code)] = errors.get(str(r.status_code), 0) + 1
+                except Exception as e:
+                    errors[type(e).__name__] = errors.get(type(e).__name__, 0) + 1
+                latencies.append(time.perf_counter() - t0)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    lat = sorted(latencies)
+
+    def pct(p: float) -> float:
+        return round(lat[min(len(lat) - 1, int(p * len(lat)))] * 1000, 2) if lat else 0.0
+
+    return {
+        "requests": len(lat),
+        "errors": errors,
+        "rps": round(len(lat) / elapsed, 1) if elapsed else 0.0,
+        "p50_ms": pct(0.50),
+        "p95_ms": pct(0.95),
+        "p99_ms": pct(0.99),
+    }
+
+
+def _wait_ready(port: int, proc: subprocess.Popen, timeout: float = 30.0) -> None:
+    import httpx
+
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError("server exited during startup")
+        try:
+            httpx.get(f"http://127.0.0.1:{port}/properties?limit=1", timeout=1.0)
+            return
+        except Exception:
+            time.sleep(0.2)
+    raise RuntimeError("server did not start")
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(
+        description=(
+            "Concurrent-request capacity of a single uvicorn worker, with a simulated slow email "
+            "provider."
+        )
+    )
+    ap.add_argument("--modes", default="sync,async", help="Comma-separated: sync (ASYNC_DB=0), async (ASYNC_DB=1).")
+    ap.add_argument("--concurrency", default="40,200", help="Comma-separated client concurrency levels.")
+    ap.add_argument("--requests", type=int, default=800)
+    ap.add_argument("--provider-delay-ms", type=int, default=250)
+    ap.add_argument("--scenarios", default="otp,feed", help="otp: POST /auth/forgot/request-otp; feed: GET /properties.")
+    args = ap.parse_args()
+
+    provider, provider_url = _start_slow_provider(int(args.provider_delay_ms))
+    levels = [int(x) for x in args.concurrency.split(",") if x.strip()]
+    scenarios = [x.strip() for x in args.scenarios.split(",") if x.strip()]
+    # forgot/request-otp is rate limited to 5 per identifier per 10 minutes.
+    users = max(1, int(args.requests) // 4 + 1)
+
+    try:
+        for mode in [m.strip() for m in args.modes.split(",") if m.strip()]:
+            for concurrency in levels:
+                env = bench_env(
+                    tempfile.mkdtemp(prefix="bench_conc_"),
+                    ASYNC_DB="1" if mode == "async" else "0",
+                    EMAIL_BACKEND="brevo",
+                    BREVO_API_KEY="bench",
+                    BREVO_FROM="bench@bench.local",
+                    BREVO_API_URL=provider_url,
+                )
+                run_child(f"USERS = {users}\nPROPERTIES = 200\n" + _SEED, env)
+                port = _free_port()
+                proc = subprocess.Popen(
+                    [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--workers", "1", "--log-level", "warning"],
+                    cwd=BACKEND_DIR,
+                    env=env,
+                )
+                try:
+                    _wait_ready(port, proc)
+                    for scenario in scenarios:
+                        if scenario == "otp":
+                            path_for = lambda i: ("POST", "/auth/forgot/request-otp", {"identifier": f"bench-user{i % users}@bench.local"})
+                        else:
+                            path_for = lambda i: ("GET", "/properties?limit=20", None)
+                        res = asyncio.run(
+                            _load(f"http://127.0.0.1:{port}", path_for=path_for, total=int(args.requests), concurrency=concurrency)
+                        )
+                        res.update(mode=mode, scenario=scenario, concurrency=concurrency, provider_delay_ms=int(args.provider_delay_ms))
+                        print(json.dumps(res), flush=True)
+                finally:
+                    proc.terminate()
+                    proc.wait(timeout=10)
+    finally:
+        provider.shutdown()
+
+
+if __name__ == "__main__":
+    main()
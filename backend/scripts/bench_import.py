@@ -0,0 +1,114 @@
+from __future__ import annotations
+
+import argparse
+import datetime as dt
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+# SDKs that should only load on first use (see app.utils.cloudinary_config, app.google_*).
+DEFAULT_LAZY = "google,googleapiclient,cloudinary,requests,httpx,PIL"
+
+_LINE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)\s*$")
+
+
+def _parse_importtime(stderr: str) -> list[tuple[str, int, int]]:
+    """(module, self_us, cumulative_us) for every line of `python -X importtime` output."""
+    rows = []
+    for line in stderr.splitlines():
+        m = _LINE.match(line)
+        if m:
+            rows.append((m.group(4), int(m.group(1)), int(m.group(2))))
+    return rows
+
+
+def _run_once(backend_dir: str, env: dict[str, str], module: str) -> tuple[float, list[tuple[str, int, int]]]:
+    started = time.perf_counter()
+    out = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=backend_dir,
+        env=env,
+        capture_output=True,
+        text=True,
+    )
+    wall = time.perf_counter() - started
+    if out.returncode != 0:
+        raise SystemExit(f"import {module} failed:\n{out.stderr[-2000:]}")
+    return wall, _parse_importtime(out.stderr)
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(
+        description=(
+            "Cold-start import cost of the API (`python -X importtime -c 'import app.main'`) in fresh "
+            "interpreters: median import and process wall time, the heaviest top-level packages, and "
+            "any SDK that should be lazily imported but was loaded. Prints one JSON object."
+        )
+    )
+    ap.add_argument("--backend-dir", default=BACKEND_DIR)
+    ap.add_argument("--module", default="app.main")
+    ap.add_argument("--runs", type=int, default=7, help="Fresh interpreters to measure (the first warms .pyc caches and is dropped).")
+    ap.add_argument("--top", type=int, default=10, help="Heaviest top-level packages to report (by summed self time).")
+    ap.add_argument("--lazy", default=DEFAULT_LAZY, help="Comma-separated packages that must not load at import time.")
+    ap.add_argument("--max-ms", type=float, default=0.0, help="Exit 1 when the median import time exceeds this (0: no limit).")
+    ap.add_argument("--output", default="", help="Append the result as one JSON line to this file (tracked over time).")
+    args = ap.parse_args()
+
+    work = tempfile.mkdtemp(prefix="bench_import_")
+    env = dict(
+        os.environ,
+        DATABASE_URL="sqlite:///" + os.path.join(work, "bench.db"),
+        UPLOADS_DIR=os.path.join(work, "uploads"),
+        APP_ENV="local",
+    )
+    env.pop("PYTHONDONTWRITEBYTECODE", None)
+
+    runs = [_run_once(args.backend_dir, env, args.module) for _ in range(max(2, int(args.runs)))][1:]
+    import_ms, wall_ms = [], []
+    packages: dict[str, list[int]] = {}
+    loaded: set[str] = set()
+    for wall, rows in runs:
+        wall_ms.append(wall * 1000.0)
+        import_ms.append(next((cum for name, _self, cum in rows if name == args.module), 0) / 1000.0)
+        per_run: dict[str, int] = {}
+        for name, self_us, _cum in rows:
+            root = name.split(".", 1)[0]
+            per_run[root] = per_run.get(root, 0) + self_us
+            loaded.add(root)
+        for root, us in per_run.items():
+            packages.setdefault(root, []).append(us)
+
+    top = sorted(((root, statistics.median(us) / 1000.0) for root, us in packages.items()), key=lambda x: -x[1])
+    lazy = [p.strip() for p in args.lazy.split(",") if p.strip()]
+    eager = sorted(p for p in lazy if p in loaded)
+    median_ms = statistics.median(import_ms)
+    result = {
+        "timestamp": dt.datetime.now(dt.timezone.utc).isoformat(timespec="seconds"),
+        "module": args.module,
+        "python": sys.version.split()[0],
+        "runs": len(runs),
+        "import_ms_median": round(median_ms, 1),
+        "import_ms_min": round(min(import_ms), 1),
+        "process_ms_median": round(statistics.median(wall_ms), 1),
+        "modules_loaded": len(runs[-1][1]),
+        "top_packages_ms": {root: round(ms, 1) for root, ms in top[: max(0, int(args.top))]},
+        "eager_lazy_sdks": eager,
+    }
+    line = json.dumps(result, sort_keys=True)
+    print(line)
+    if args.output:
+        with open(args.output, "a", encoding="utf-8") as f:
+            f.write(line + "\n")
+    if eager or (args.max_ms > 0 and median_ms > args.max_ms):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
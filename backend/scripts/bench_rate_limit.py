@@ -0,0 +1,97 @@
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+
+# Allow `python scripts/bench_rate_limit.py` from backend/.
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+
+def _run(limiter, *, threads: int, keys: int, seconds: float) -> dict:
+    from fastapi import HTTPException
+
+    stop = time.perf_counter() + float(seconds)
+    counts = [0] * threads
+    rejected = [0] * threads
+    latencies: list[list[float]] = [[] for _ in range(threads)]
+
+    def worker(i: int) -> None:
+        n = 0
+        while True:
+            t0 = time.perf_counter()
+            if t0 >= stop:
+                break
+            try:
+                # Generous limit: we measure bookkeeping cost, not rejections.
+                limiter.hit(key=f"bench:{(i * 7919 + n) % keys}", limit=1_000_000, window_seconds=60)
+            except HTTPException:
+                rejected[i] += 1
+            latencies[i].append(time.perf_counter() - t0)
+            n += 1
+        counts[i] = n
+
+    ts = [threading.Thread(target=worker, args=(i,)) for i in range(threads)]
+    started = time.perf_counter()
+    for t in ts:
+        t.start()
+    for t in ts:
+        t.join()
+    elapsed = time.perf_counter() - started
+    lat = sorted(x for xs in latencies for x in xs)
+    total = sum(counts)
+
+    def pct(p: float) -> float:
+        return round(lat[min(len(lat) - 1, int(p * len(lat)))] * 1e6, 2) if lat else 0.0
+
+    return {
+        "threads": threads,
+        "keys": keys,
+        "hits": total,
+        "rejected": sum(rejected),
+        "hits_per_sec": round(total / elapsed, 1) if elapsed else 0.0,
+        "p50_us": pct(0.50),
+        "p99_us": pct(0.99),
+    }
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Microbenchmark RateLimiter.hit() throughput under thread contention.")
+    ap.add_argument("--backend", choices=["memory", "database", "both"], default="memory")
+    ap.add_argument("--database-url", default="", help="Database for the shared backend (default: temp SQLite file).")
+    ap.add_argument("--threads", default="1,4,16", help="Comma-separated thread counts.")
+    ap.add_argument("--keys", type=int, default=10_000)
+    ap.add_argument("--seconds", type=float, default=2.0)
+    args = ap.parse_args()
+
+    backends = ["memory", "database"] if args.backend == "both" else [args.backend]
+    if "database" in backends:
+        url = (args.database_url or "").strip()
+        if not url:
+            url = "sqlite:///" + os.path.join(tempfile.mkdtemp(prefix="rl_bench_"), "bench.db")
+        os.environ["DATABASE_URL"] = url
+
+    from app.rate_limit import DatabaseBackend, MemoryBackend, RateLimiter
+
+    if "database" in backends:
+        from app.db import ENGINE
+        from app.models import RateLimitBucket
+
+        RateLimitBucket.__table__.create(ENGINE, checkfirst=True)
+
+    results = []
+    for name in backends:
+        for n in [int(x) for x in args.threads.split(",") if x.strip()]:
+            backend = DatabaseBackend() if name == "database" else MemoryBackend()
+            res = _run(RateLimiter(backend), threads=n, keys=int(args.keys), seconds=float(args.seconds))
+            res["backend"] = name
+            results.append(res)
+            print(json.dumps(res))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+from __future__ import annotations
+
+import os
+import subprocess
+import sys
+from typing import Any
+
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+SCRIPTS_DIR = os.path.join(BACKEND_DIR, "scripts")
+
+# Shared by bench_*.py and loadtest.py. The app reads its settings (DATABASE_URL, ASYNC_DB,
+# UPLOADS_DIR, ...) at import, so each script seeds and measures in a child process started
+# by run_child(); code in that process imports the add_* helpers below.
+
+
+def bench_env(work: str, **overrides: str) -> dict[str, str]:
+    """App env for a throwaway SQLite database and uploads dir under `work`, background jobs off."""
+    env = dict(
+        os.environ,
+        DATABASE_URL="sqlite:///" + os.path.join(work, "bench.db"),
+        UPLOADS_DIR=os.path.join(work, "uploads"),
+        APP_ENV="local",
+        EMAIL_BACKEND="console",
+        OTP_PURGE_INTERVAL_SECONDS="0",
+        MEDIA_RECONCILE_INTERVAL_SECONDS="0",
+    )
+    env.update(overrides)
+    os.makedirs(env["UPLOADS_DIR"], exist_ok=True)
+    return env
+
+
+def run_child(code: str, env: dict[str, str]) -> str:
+    """Run `code` in a fresh interpreter with `env` (backend/ and scripts/ importable); returns stdout."""
+    prelude = f"import sys\nsys.path[:0] = [{BACKEND_DIR!r}, {SCRIPTS_DIR!r}]\n"
+    out = subprocess.run([sys.executable, "-c", prelude + code], env=env, cwd=BACKEND_DIR, capture_output=True, text=True)
+    if out.returncode != 0:
+        raise SystemExit(out.stderr[-3000:])
+    return out.stdout
+
+
+def add_user(db, name: str, *, role: str = "user", **fields: Any):
+    """
+    Account `bench-<name>@bench.local` (username `bench_<name>`, no usable password) with its
+    login identifiers and an inactive subscription row.
+    """
+    from app.identifiers import sync_user_identifiers
+    from app.models import Subscription, User
+
+    user = User(
+        email=f"bench-{name}@bench.local",
+        username=f"bench_{name}",
+        name=f"Bench {name}",
+        role=role,
+        password_hash="!bench",
+        **fields,
+    )
+    db.add(user)
+    db.flush()
+    sync_user_identifiers(db, user)
+    db.add(Subscription(user_id=user.id, status="inactive"))
+    return user
+
+
+def add_owner(db, name: str = "owner", **fields: Any):
+    """Approved owner account (see add_user)."""
+    return add_user(db, name, role="owner", **{"approval_status": "approved", **fields})
+
+
+def add_listing(db, owner, i: int, **fields: Any):
+    """Approved listing #i of `owner` in Bengaluru, spread a few metres apart per i."""
+    from app.models import Property
+
+    values: dict[str, Any] = {
+        "owner_id": owner.id,
+        "ad_number": f"B{i:05d}",
+        "title": f"Bench {i}",
+        "status": "approved",
+        "price": 10000 + i,
+        "state": "Karnataka",
+        "district": "Bengaluru (Bangalore) Urban",
+        "area": "Indiranagar",
+        "address": f"bench {i}",
+        "address_normalized": f"bench {i}",
+        "gps_lat": 12.97 + i * 1e-4,
+        "gps_lng": 77.59 + i * 1e-4,
+    }
+    values.update(fields)
+    prop = Property(**values)
+    db.add(prop)
+    db.flush()
+    return prop
+
+
+def add_images(db, prop, count: int, *, uploads: str) -> None:
+    """`count` approved local images for `prop`, with one-byte files written under `uploads`."""
+    from app.models import PropertyImage
+
+    for j in range(count):
+        name = f"bench_{prop.id}_{j}.jpg"
+        with open(os.path.join(uploads, name), "wb") as f:
+            f.write(b"x")
+        db.add(
+            PropertyImage(
+                property_id=prop.id, file_path=name, sort_order=j, status="approved", image_hash=f"{prop.id}-{j}",
+                content_type="image/jpeg", size_bytes=1,
+            )
+        )
@@ -0,0 +1,85 @@
+from __future__ import annotations
+
+import argparse
+import tempfile
+
+from bench_seed import bench_env, run_child
+
+# Runs inside a child process (see bench_seed.run_child).
+_CHILD = r"""
+import datetime as dt, json, os, statistics, time
+from bench_seed import add_images, add_listing, add_owner
+from app.db import ENGINE, session_scope
+from app.media_urls import reconcile_media_urls
+from app.models import Base
+Base.metadata.create_all(ENGINE)
+with session_scope() as db:
+    owner = add_owner(db)
+    for i in range(PROPERTIES):
+        p = add_listing(
+            db, owner, i, title=f"Bench listing {i}", description="Two bedroom flat, close to metro. " * 4,
+            location="Bench Town", amenities_json='["wifi","parking","lift"]',
+        )
+        add_images(db, p, IMAGES, uploads=os.environ["UPLOADS_DIR"])
+reconcile_media_urls()
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, ORJSONResponse
+from fastapi.testclient import TestClient
+from app.main import app
+
+def timed(fn, n):
+    out = []
+    for _ in range(n):
+        t0 = time.perf_counter()
+        fn()
+        out.append((time.perf_counter() - t0) * 1000)
+    return out
+
+with TestClient(app) as c:
+    path = f"/properties?limit={PROPERTIES}"
+    r = c.get(path)
+    assert r.status_code == 200 and len(r.json()["items"]) == PROPERTIES, r.text[:200]
+    body = r.content
+    timed(lambda: c.get(path), 3)
+    request_ms = timed(lambda: c.get(path), ITERATIONS)
+
+# Encoder-only comparison on the same payload shape (datetimes as objects, as serializers emit them).
+payload = json.loads(body)
+for item in payload["items"]:
+    item["created_at"] = dt.datetime.fromisoformat(item["created_at"])
+stdlib_ms = timed(lambda: JSONResponse(jsonable_encoder(payload)), ITERATIONS)
+orjson_ms = timed(lambda: ORJSONResponse(payload), ITERATIONS)
+
+def summary(xs):
+    return {"mean_ms": round(statistics.mean(xs), 3), "p50_ms": round(statistics.median(xs), 3)}
+
+print(json.dumps({
+    "properties": PROPERTIES,
+    "images_per_property": IMAGES,
+    "response_bytes": len(body),
+    "request": summary(request_ms),
+    "encode_jsonable_encoder_stdlib": summary(stdlib_ms),
+    "encode_orjson": summary(orjson_ms),
+}))
+"""
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(
+        description=(
+            "CPU cost of one GET /properties?limit=N feed page (in-process, no network) plus an "
+            "encoder-only comparison."
+        )
+    )
+    ap.add_argument("--properties", type=int, default=200)
+    ap.add_argument("--images", type=int, default=3, help="Images per property.")
+    ap.add_argument("--iterations", type=int, default=50)
+    args = ap.parse_args()
+
+    code = f"PROPERTIES = {int(args.properties)}\nIMAGES = {int(args.images)}\nITERATIONS = {int(args.iterations)}\n" + _CHILD
+    out = run_child(code, bench_env(tempfile.mkdtemp(prefix="bench_ser_")))
+    print(out.strip().splitlines()[-1])
+
+if __name__ == "__main__":
+    main()
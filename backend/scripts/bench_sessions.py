@@ -0,0 +1,116 @@
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import tempfile
+
+from bench_seed import bench_env, run_child
+
+# Runs inside a child process (see bench_seed.run_child).
+_CHILD = r"""
+import json
+from sqlalchemy import event
+from sqlalchemy.pool import Pool
+from bench_seed import add_listing, add_owner, add_user
+from app.db import ENGINE, session_scope
+from app.models import Base, PropertyImage
+from app.security import create_access_token
+
+Base.metadata.create_all(ENGINE)
+with session_scope() as db:
+    owner = add_owner(db)
+    pending_owner = add_owner(db, "new", approval_status="pending")
+    user = add_user(db, "user", gps_lat=12.97, gps_lng=77.59)
+    props = [
+        add_listing(db, owner, i, status=status, contact_phone=f"+9190000000{i:02d}", contact_phone_normalized=f"+9190000000{i:02d}")
+        for i, status in enumerate(("approved", "approved", "pending"))
+    ]
+    db.add(PropertyImage(property_id=props[0].id, file_path="https://example.test/a.jpg", status="approved", image_hash="a"))
+    db.add(PropertyImage(property_id=props[1].id, file_path="https://example.test/b.jpg", status="pending", image_hash="b"))
+    ids = {"owner": owner.id, "user": user.id, "pending_owner": pending_owner.id, "p0": props[0].id, "p1": props[1].id, "p2": props[2].id}
+
+from fastapi.testclient import TestClient
+from app.main import app
+
+checkouts = [0]
+event.listen(Pool, "checkout", lambda *_a: checkouts.__setitem__(0, checkouts[0] + 1))
+
+def bearer(uid, role):
+    return {"Authorization": "Bearer " + create_access_token(user_id=uid, role=role)}
+
+U, O = bearer(ids["user"], "user"), bearer(ids["owner"], "owner")
+p0, p1, p2 = ids["p0"], ids["p1"], ids["p2"]
+results = []
+with TestClient(app) as c:
+    r = c.post("/admin/auth/login", json={"identifier": "Admin", "password": "Admin@123"})
+    A = {"Authorization": "Bearer " + r.json()["access_token"]}
+    cases = [
+        ("GET", "/properties", None, {}),
+        ("GET", "/properties", U, {}),
+        ("GET", f"/properties/{p0}", U, {}),
+        ("GET", f"/properties/batch?ids={p0},{p1}", U, {}),
+        ("GET", "/properties/nearby?lat=12.97&lon=77.59", U, {}),
+        ("GET", f"/properties/{p0}/contact", U, {}),
+        ("GET", "/me", U, {}),
+        ("PATCH", "/me", U, {"json": {"name": "Bench User 2"}}),
+        ("GET", "/me/subscription", U, {}),
+        ("POST", "/auth/guest", None, {}),
+        ("GET", "/owner/properties", O, {}),
+        ("POST", "/owner/properties", O, {"json": {"title": "New", "state": "Andhra Pradesh", "district": "Anantapur", "area": "Old Town", "address": "bench new 1"}}),
+        ("PATCH", f"/owner/properties/{p1}", O, {"json": {"price": 12000}}),
+        ("POST", f"/properties/{p0}/images", O, {"files": {"file": ("a.png", b"\x89PNGbench", "image/png")}}),
+        ("GET", "/admin/properties/pending", A, {}),
+        ("GET", "/admin/properties", A, {}),
+        ("GET", "/admin/owners/pending", A, {}),
+        ("GET", "/admin/images/pending", A, {}),
+        ("GET", "/admin/logs", A, {}),
+        ("GET", "/admin/stats", A, {}),
+        ("GET", "/admin/revenue", A, {}),
+        ("POST", f"/admin/properties/{p2}/approve", A, {"json": {"reason": ""}}),
+        ("POST", f"/admin/owners/{ids['pending_owner']}/approve", A, {"json": {"reason": ""}}),
+    ]
+    for method, path, headers, kw in cases:
+        checkouts[0] = 0
+        r = c.request(method, path, headers=headers or {}, **kw)
+        results.append({"request": f"{method} {path.split('?')[0]}", "status": r.status_code, "checkouts": checkouts[0]})
+
+print(json.dumps(results))
+"""
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(
+        description=(
+            "Connection-pool checkouts per request across the API's routers (in-process, SQLite). "
+            "Every request should check out at most one connection: one shared session per request. "
+            "Prints one JSON object; exits 1 when a request exceeds --max-checkouts."
+        )
+    )
+    ap.add_argument("--modes", default="sync,async", help="Comma-separated: sync (ASYNC_DB=0), async (ASYNC_DB=1).")
+    ap.add_argument("--max-checkouts", type=int, default=1)
+    args = ap.parse_args()
+
+    report: dict[str, list[dict]] = {}
+    for mode in [m.strip() for m in args.modes.split(",") if m.strip()]:
+        env = bench_env(
+            tempfile.mkdtemp(prefix="bench_sessions_"),
+            ASYNC_DB="1" if mode == "async" else "0",
+            ENABLE_MEDIA_AI_MODERATION="0",
+        )
+        out = run_child(_CHILD, env)
+        report[mode] = json.loads(out.strip().splitlines()[-1])
+
+    over = [
+        f"{mode}: {r['request']} ({r['checkouts']})"
+        for mode, rows in report.items()
+        for r in rows
+        if r["checkouts"] > args.max_checkouts
+    ]
+    print(json.dumps({"max_checkouts": args.max_checkouts, "over_limit": over, "modes": report}))
+    if over:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
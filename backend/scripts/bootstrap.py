@@ -0,0 +1,30 @@
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(
+        description=(
+            "Run the pending one-time data bootstrap (default admin account; demo listings on an "
+            "empty local/dev database) against DATABASE_URL. Completed steps are recorded in bootstrap_markers."
+        )
+    )
+    demo = ap.add_mutually_exclusive_group()
+    demo.add_argument("--demo", dest="demo", action="store_const", const=True, help="Seed the demo listings (same as SEED_DEMO_DATA=1).")
+    demo.add_argument("--no-demo", dest="demo", action="store_const", const=False, help="Skip the demo listings (same as SEED_DEMO_DATA=0).")
+    args = ap.parse_args()
+
+    sys.path.insert(0, BACKEND_DIR)
+    from app.main import run_bootstrap
+
+    ran = run_bootstrap(demo=args.demo)
+    print("Bootstrap: " + (", ".join(ran) if ran else "nothing to do"))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+from __future__ import annotations
+
+import argparse
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+
+class FakeGoogleCerts:
+    """
+    Offline stand-in for Google's ID-token certificate endpoint.
+
+    Serves {kid: PEM public key} at /oauth2/v1/certs with a Cache-Control max-age and mints
+    RS256 ID tokens signed by the matching private key. Point the API at it with
+    GOOGLE_OAUTH_CERTS_URL=<certs_url>.
+    """
+
+    def __init__(self, *, port: int = 0, kid: str = "fake-key-1", max_age: int = 3600) -> None:
+        import rsa
+
+        self.kid = kid
+        self.max_age = int(max_age)
+        self.cert_requests = 0
+        self._public, self._private = rsa.newkeys(2048)
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self) -> None:  # noqa: N802
+                url = urlparse(self.path)
+                if url.path == "/oauth2/v1/certs":
+                    fake.cert_requests += 1
+                    self._send(json.dumps(fake.certs()).encode(), cache=f"public, max-age={fake.max_age}")
+                elif url.path == "/token":
+                    q = {k: v[0] for k, v in parse_qs(url.query).items()}
+                    self._send(fake.mint(email=q.get("email") or "user@example.com", aud=q.get("aud") or "fake-client-id").encode())
+                else:
+                    self.send_error(404)
+
+            def _send(self, body: bytes, *, cache: str = "no-store") -> None:
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Cache-Control", cache)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *_args) -> None:
+                pass
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", int(port)), Handler)
+
+    @property
+    def certs_url(self) -> str:
+        return f"http://127.0.0.1:{self._server.server_address[1]}/oauth2/v1/certs"
+
+    def certs(self) -> dict[str, str]:
+        return {self.kid: self._public.save_pkcs1().decode("ascii")}
+
+    def mint(self, *, email: str, aud: str, name: str = "", ttl: int = 3600, iss: str = "https://accounts.google.com") -> str:
+        from google.auth import crypt, jwt
+
+        now = int(time.time())
+        payload = {
+            "iss": iss,
+            "aud": aud,
+            "sub": str(abs(hash(email))),
+            "email": email,
+            "email_verified": True,
+            "name": name,
+            "iat": now,
+            "exp": now + int(ttl),
+        }
+        signer = crypt.RSASigner.from_string(self._private.save_pkcs1().decode("ascii"), key_id=self.kid)
+        return jwt.encode(signer, payload).decode("ascii")
+
+    def start(self) -> "FakeGoogleCerts":
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Serve fake Google ID-token certificates and mint matching tokens.")
+    ap.add_argument("--port", type=int, default=8765)
+    ap.add_argument("--max-age", type=int, default=3600)
+    ap.add_argument("--email", default="user@example.com")
+    ap.add_argument("--aud", default="fake-client-id")
+    args = ap.parse_args()
+
+    fake = FakeGoogleCerts(port=args.port, max_age=args.max_age).start()
+    print(f"GOOGLE_OAUTH_CERTS_URL={fake.certs_url}")
+    print(f"GOOGLE_OAUTH_CLIENT_ID={args.aud}")
+    print(f"id_token={fake.mint(email=args.email, aud=args.aud)}")
+    print(f"More tokens: GET http://127.0.0.1:{args.port}/token?email=...&aud=...")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        fake.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,601 @@
+from __future__ import annotations
+
+import argparse
+import datetime as dt
+import io
+import json
+import math
+import os
+import random
+import re
+import sys
+import time
+from typing import Any, Callable, Iterable, Iterator
+
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+# Rough centroid (lat, lng) and spread in degrees per state in app/locations.json. District
+# centres are scattered inside the spread, areas around their district, listings around
+# their area, so nearby searches see realistic clusters instead of uniform noise.
+_STATE_GEO: dict[str, tuple[float, float, float]] = {
+    "Andhra Pradesh": (15.9, 79.7, 2.0),
+    "Arunachal Pradesh": (28.2, 94.7, 1.5),
+    "Assam": (26.2, 92.9, 1.2),
+    "Bihar": (25.8, 85.6, 1.2),
+    "Chandigarh (UT)": (30.73, 76.78, 0.04),
+    "Chhattisgarh": (21.3, 81.9, 1.5),
+    "Gujarat": (22.4, 71.6, 1.8),
+    "Kerala": (10.4, 76.4, 0.9),
+    "Lakshadweep (UT)": (10.6, 72.6, 0.3),
+    "Madhya Pradesh": (23.5, 78.3, 2.5),
+    "Maharashtra": (19.4, 76.0, 2.3),
+    "Manipur": (24.7, 93.9, 0.5),
+    "Meghalaya": (25.5, 91.3, 0.5),
+    "Mizoram": (23.3, 92.8, 0.6),
+    "Nagaland": (26.1, 94.5, 0.4),
+    "Odisha": (20.5, 84.4, 1.5),
+    "Puducherry (UT)": (11.94, 79.8, 0.1),
+    "Punjab": (30.9, 75.4, 0.9),
+    "Rajasthan": (26.6, 73.8, 2.5),
+    "Sikkim": (27.5, 88.5, 0.3),
+    "Tamil Nadu": (11.0, 78.4, 1.6),
+    "Telangana": (17.9, 79.0, 1.2),
+    "Tripura": (23.8, 91.5, 0.4),
+    "Uttar Pradesh": (26.9, 80.9, 2.5),
+    "Uttarakhand": (30.1, 79.2, 0.9),
+    "West Bengal": (23.8, 87.9, 1.3),
+}
+_INDIA_FALLBACK = (22.0, 79.0, 6.0)
+
+_PROPERTY_TYPES = ("apartment", "house", "studio", "villa", "plot", "office", "shop")
+_AMENITIES = ("parking", "lift", "power backup", "security", "gym", "water supply", "garden", "wifi")
+_ADJECTIVES = ("Spacious", "Cosy", "Bright", "Furnished", "Semi-furnished", "New", "Renovated", "Quiet")
+
+
+def _norm(s: str) -> str:
+    """Same normalization as the API's `_norm_key`."""
+    s = re.sub(r"[^a-z0-9]+", " ", (s or "").strip().lower())
+    return re.sub(r"\s+", " ", s).strip()
+
+
+def _b36(n: int, width: int = 6) -> str:
+    digits = "0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+    out = ""
+    while n:
+        n, r = divmod(n, 36)
+        out = digits[r] + out
+    return out.rjust(width, "0")[-width:]
+
+
+def _scatter(rnd: random.Random, lat: float, lng: float, radius: float) -> tuple[float, float]:
+    """Uniform point in a disc of `radius` degrees (longitude corrected for latitude)."""
+    r = radius * math.sqrt(rnd.random())
+    theta = rnd.uniform(0.0, 2.0 * math.pi)
+    return lat + r * math.sin(theta), lng + r * math.cos(theta) / max(0.2, math.cos(math.radians(lat)))
+
+
+class Geography:
+    """Districts from locations.json with clustered GPS centres and a skewed popularity weight."""
+
+    def __init__(self, locations: dict[str, dict[str, list[str]]], rnd: random.Random) -> None:
+        self.places: list[tuple[str, str, list[tuple[str, float, float]]]] = []
+        weights: list[float] = []
+        for state, districts in locations.items():
+            s_lat, s_lng, spread = _STATE_GEO.get(state, _INDIA_FALLBACK)
+            for district, areas in districts.items():
+                if not areas:
+                    continue
+                d_lat, d_lng = _scatter(rnd, s_lat, s_lng, spread)
+                area_radius = min(0.08, spread / 4)
+                pts = [(area, *_scatter(rnd, d_lat, d_lng, area_radius)) for area in areas]
+                self.places.append((state, district, pts))
+                # A few metro districts hold most listings.
+                weights.append(rnd.paretovariate(1.2))
+        self.cum_weights: list[float] = []
+        total = 0.0
+        for w in weights:
+            total += w
+            self.cum_weights.append(total)
+
+    def pick(self, rnd: random.Random) -> tuple[str, str, str, float, float]:
+        state, district, areas = rnd.choices(self.places, cum_weights=self.cum_weights)[0]
+        area, lat, lng = rnd.choice(areas)
+        return state, district, area, lat + rnd.gauss(0.0, 0.006), lng + rnd.gauss(0.0, 0.006)
+
+    def centers(self) -> list[tuple[float, float]]:
+        return [(lat, lng) for _s, _d, areas in self.places for _a, lat, lng in areas]
+
+
+def _chunked(rows: Iterable[dict[str, Any]], size: int) -> Iterator[list[dict[str, Any]]]:
+    batch: list[dict[str, Any]] = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _copy_value(v: Any) -> str:
+    if v is None:
+        return r"\N"
+    if isinstance(v, bool):
+        return "t" if v else "f"
+    if isinstance(v, dt.datetime):
+        return v.isoformat()
+    return str(v).replace("\\", "\\\\").replace("\t", "\\t").replace("\n", "\\n").replace("\r", "\\r")
+
+
+class BulkLoader:
+    """
+    Streams row dicts into tables in fixed-size batches: `COPY ... FROM STDIN` on
+    PostgreSQL/psycopg2, one executemany INSERT per batch everywhere else.
+    """
+
+    def __init__(self, conn, *, batch_size: int = 20_000) -> None:
+        self.conn = conn
+        self.batch_size = max(1, int(batch_size))
+        self.counts: dict[str, int] = {}
+        dbapi = conn.connection.dbapi_connection
+        self._copy = conn.dialect.name == "postgresql" and hasattr(dbapi.cursor(), "copy_expert")
+
+    def load(self, table, rows: Iterable[dict[str, Any]]) -> int:
+        from sqlalchemy import insert
+
+        n = 0
+        for batch in _chunked(rows, self.batch_size):
+            if self._copy:
+                self._copy_batch(table, batch)
+            else:
+                self.conn.execute(insert(table), batch)
+            n += len(batch)
+        self.counts[table.name] = self.counts.get(table.name, 0) + n
+        return n
+
+    def _copy_batch(self, table, batch: list[dict[str, Any]]) -> None:
+        cols = list(batch[0].keys())
+        buf = io.StringIO()
+        for row in batch:
+            buf.write("\t".join(_copy_value(row[c]) for c in cols))
+            buf.write("\n")
+        buf.seek(0)
+        quoted = ", ".join(f'"{c}"' for c in cols)
+        cur = self.conn.connection.dbapi_connection.cursor()
+        try:
+            cur.copy_expert(f'COPY "{table.name}" ({quoted}) FROM STDIN', buf)
+        finally:
+            cur.close()
+
+    def next_id(self, table) -> int:
+        from sqlalchemy import func, select
+
+        return int(self.conn.execute(select(func.coalesce(func.max(table.c.id), 0))).scalar_one()) + 1
+
+    def reset_sequences(self, tables) -> None:
+        """Explicit ids bypass serial sequences on PostgreSQL; move them past the loaded rows."""
+        from sqlalchemy import text
+
+        if self.conn.dialect.name != "postgresql":
+            return
+        for table in tables:
+            self.conn.execute(
+                text(
+                    f"SELECT setval(pg_get_serial_sequence('{table.name}', 'id'), "
+                    f"(SELECT COALESCE(MAX(id), 0) + 1 FROM \"{table.name}\"), false)"
+                )
+            )
+
+
+def generate(
+    engine,
+    *,
+    users: int,
+    owners: int,
+    properties: int,
+    images_per_property: float = 3.0,
+    bare_properties: int = 0,
+    pending_ratio: float = 0.02,
+    subscribed_ratio: float = 0.2,
+    usage_rows: int = 0,
+    saved_rows: int = 0,
+    history_days: int = 365,
+    password_hash: str,
+    email_domain: str = "example.test",
+    batch_size: int = 20_000,
+    seed: int = 1,
+    progress: Callable[[str, int, float], None] | None = None,
+) -> dict[str, Any]:
+    """
+    Bulk-load a synthetic dataset into an existing schema in one transaction and return
+    the generated ids (users with emails, owners, listings, bare listings, GPS centres).
+
+    Ids are assigned here (max(id)+1 onwards), so no rows are read back while loading.
+    `bare_properties` are approved listings without images (upload targets). Usage rows are
+    spread over users with a skew; free users stop at FREE_CONTACT_LIMIT and subscribed
+    users at their plan limit, so the actual count can be lower than asked for.
+    """
+    sys.path.insert(0, BACKEND_DIR)
+    from sqlalchemy import select
+
+    from app.models import (
+        ContactUsage,
+        FreeContactUsage,
+        Property,
+        PropertyImage,
+        SavedProperty,
+        Subscription,
+        SubscriptionPlan,
+        User,
+        UserIdentifier,
+        UserSubscription,
+    )
+
+    rnd = random.Random(seed)
+    now = dt.datetime.now(dt.timezone.utc)
+    with open(os.path.join(BACKEND_DIR, "app", "locations.json"), encoding="utf-8") as f:
+        geo = Geography(json.load(f), rnd)
+
+    with engine.begin() as conn:
+        loader = BulkLoader(conn, batch_size=batch_size)
+
+        def step(table, rows: Iterable[dict[str, Any]]) -> None:
+            started = time.perf_counter()
+            n = loader.load(table.__table__, rows)
+            if progress is not None:
+                progress(table.__tablename__, n, time.perf_counter() - started)
+
+        # Subscribers are on the Smart plan; the API's _ensure_plans() refreshes its price/limits.
+        plan_id, plan_days, plan_limit = "smart_monthly_199", 30, 200
+        row = conn.execute(
+            select(SubscriptionPlan.duration_days, SubscriptionPlan.contact_limit).where(SubscriptionPlan.id == plan_id)
+        ).first()
+        if row is None:
+            loader.load(
+                SubscriptionPlan.__table__,
+                [{"id": plan_id, "name": "Smart", "price_inr": 199, "duration_days": plan_days, "contact_limit": plan_limit}],
+            )
+        else:
+            plan_days, plan_limit = int(row[0]), int(row[1])
+
+        first_user = loader.next_id(User.__table__)
+        user_ids = list(range(first_user, first_user + users))
+        owner_ids = list(range(first_user + users, first_user + users + owners))
+
+        def user_rows() -> Iterator[dict[str, Any]]:
+            for uid in user_ids + owner_ids:
+                owner = uid >= first_user + users
+                state, district, _area, lat, lng = geo.pick(rnd)
+                company = f"{district} Realty {uid}" if owner else ""
+                address = f"{uid} Main Road, {district}" if owner else ""
+                yield {
+                    "id": uid,
+                    "email": f"gen{uid}@{email_domain}",
+                    "username": f"gen_{uid}",
+                    "phone": "",
+                    "phone_normalized": "",
+                    "name": f"{'Owner' if owner else 'User'} {uid}",
+                    "state": state,
+                    "district": district,
+                    "gps_lat": lat,
+                    "gps_lng": lng,
+                    "gender": "",
+                    "role": "owner" if owner else "user",
+                    "owner_category": "broker" if owner else "",
+                    "company_name": company,
+                    "company_name_normalized": _norm(company),
+                    "company_description": "",
+                    "company_address": address,
+                    "company_address_normalized": _norm(address),
+                    "profile_image_path": "",
+                    "profile_image_url": "",
+                    "profile_image_missing": False,
+                    "profile_image_cloudinary_public_id": "",
+                    "approval_status": "approved",
+                    "approval_reason": "",
+                    "password_hash": password_hash,
+                    "created_at": now - dt.timedelta(seconds=rnd.randrange(history_days * 86400 + 1)),
+                }
+
+        step(User, user_rows())
+
+        first_ident = loader.next_id(UserIdentifier.__table__)
+
+        def identifier_rows() -> Iterator[dict[str, Any]]:
+            next_id = first_ident
+            for uid in user_ids + owner_ids:
+                yield {"id": next_id, "user_id": uid, "kind": "email", "value": f"gen{uid}@{email_domain}"}
+                yield {"id": next_id + 1, "user_id": uid, "kind": "username", "value": f"gen_{uid}"}
+                next_id += 2
+
+        step(UserIdentifier, identifier_rows())
+
+        # Owners get a skewed share of listings (a few agencies own most of them).
+        owner_cum: list[float] = []
+        total = 0.0
+        for _ in owner_ids:
+            total += rnd.paretovariate(1.5)
+            owner_cum.append(total)
+
+        first_prop = loader.next_id(Property.__table__)
+        listing_ids = list(range(first_prop, first_prop + properties))
+        bare_ids = list(range(first_prop + properties, first_prop + properties + bare_properties))
+        prop_status: dict[int, str] = {}
+        bare = []
+
+        def property_rows() -> Iterator[dict[str, Any]]:
+            for pid in listing_ids + bare_ids:
+                is_bare = pid >= first_prop + properties
+                state, district, area, lat, lng = geo.pick(rnd)
+                owner_id = rnd.choices(owner_ids, cum_weights=owner_cum)[0]
+                status = "pending" if not is_bare and rnd.random() < pending_ratio else "approved"
+                if status != "approved":
+                    prop_status[pid] = status
+                if is_bare:
+                    bare.append({"id": pid, "owner_id": owner_id})
+                ptype = rnd.choice(_PROPERTY_TYPES)
+                rent_sale = "sale" if rnd.random() < 0.3 else "rent"
+                price = rnd.randrange(1_500_000, 30_000_000, 10_000) if rent_sale == "sale" else rnd.randrange(4_000, 120_000, 500)
+                address = f"{pid} {area} Road, {district}"
+                phone = f"+91{9000000000 + pid}"
+                created = now - dt.timedelta(seconds=rnd.randrange(history_days * 86400 + 1))
+                yield {
+                    "id": pid,
+                    "owner_id": owner_id,
+                    "ad_number": _b36(pid),
+                    "title": f"{rnd.choice(_ADJECTIVES)} {ptype} in {area}",
+                    "description": f"{ptype.title()} for {rent_sale} in {area}, {district}. Close to schools and transit.",
+                    "property_type": ptype,
+                    "rent_sale": rent_sale,
+                    "price": price,
+                    "location": area,
+                    "address": address,
+                    "address_normalized": _norm(address),
+                    "state": state,
+                    "district": district,
+                    "area": area,
+                    "state_normalized": _norm(state),
+                    "district_normalized": _norm(district),
+                    "area_normalized": _norm(area),
+                    "gps_lat": lat,
+                    "gps_lng": lng,
+                    "amenities_json": json.dumps(rnd.sample(_AMENITIES, rnd.randint(0, 4))),
+                    "availability": "available" if rnd.random() < 0.9 else "occupied",
+                    "status": status,
+                    "moderation_reason": "",
+                    "contact_phone": phone,
+                    "contact_phone_normalized": phone,
+                    "contact_email": f"owner{owner_id}@{email_domain}",
+                    "created_at": created,
+                    "updated_at": created,
+                    "allow_duplicate_address": False,
+                    "allow_duplicate_phone": False,
+                }
+
+        step(Property, property_rows())
+
+        first_image = loader.next_id(PropertyImage.__table__)
+
+        def image_rows() -> Iterator[dict[str, Any]]:
+            next_id = first_image
+            spread = max(1.0, images_per_property / 2)
+            for pid in listing_ids:
+                n = min(10, max(0, round(rnd.gauss(images_per_property, spread)))) if images_per_property > 0 else 0
+                status = prop_status.get(pid, "approved")
+                for j in range(n):
+                    public_id = f"quickrent4u/gen/p{pid}_{j}"
+                    url = f"https://res.cloudinary.com/demo/image/upload/{public_id}.jpg"
+                    yield {
+                        "id": next_id,
+                        "property_id": pid,
+                        "file_path": url,
+                        "public_url": url,
+                        "missing": False,
+                        "cloudinary_public_id": public_id,
+                        "sort_order": j,
+                        "image_hash": f"{rnd.getrandbits(256):064x}",
+                        "original_filename": f"photo_{j + 1}.jpg",
+                        "content_type": "image/jpeg",
+                        "size_bytes": rnd.randrange(60_000, 900_000),
+                        "status": status,
+                        "moderation_reason": "",
+                        "uploaded_by_user_id": None,
+                        "created_at": now,
+                    }
+                    next_id += 1
+
+        step(PropertyImage, image_rows())
+
+        # Subscriptions: the Google Play mirror row per user, the current plan period for
+        # subscribers and a few expired periods as history.
+        subscribed = set(rnd.sample(user_ids, int(len(user_ids) * max(0.0, min(1.0, subscribed_ratio)))))
+        period_start = {uid: now - dt.timedelta(days=rnd.randint(0, plan_days - 1)) for uid in subscribed}
+        first_sub = loader.next_id(Subscription.__table__)
+
+        def subscription_rows() -> Iterator[dict[str, Any]]:
+            for i, uid in enumerate(user_ids + owner_ids):
+                active = uid in subscribed
+                yield {
+                    "id": first_sub + i,
+                    "user_id": uid,
+                    "provider": "google_play",
+                    "status": "active" if active else "inactive",
+                    "expires_at": period_start[uid] + dt.timedelta(days=plan_days) if active else None,
+                    "purchase_token": f"gen-{uid}-0" if active else None,
+                    "updated_at": now,
+                }
+
+        step(Subscription, subscription_rows())
+
+        first_usub = loader.next_id(UserSubscription.__table__)
+        current_period: dict[int, int] = {}
+
+        def user_subscription_rows() -> Iterator[dict[str, Any]]:
+            next_id = first_usub
+            for uid in user_ids:
+                if uid in subscribed:
+                    start, periods = period_start[uid], range(rnd.randint(0, 3), -1, -1)
+                elif rnd.random() < 0.1:
+                    start, periods = now - dt.timedelta(days=rnd.randint(0, plan_days - 1)), range(1, 0, -1)
+                else:
+                    continue
+                for k in periods:
+                    begin = start - dt.timedelta(days=plan_days * k)
+                    if k == 0:
+                        current_period[uid] = next_id
+                    yield {
+                        "id": next_id,
+                        "user_id": uid,
+                        "plan_id": plan_id,
+                        "purchase_token": f"gen-{uid}-{k}",
+                        "start_time": begin,
+                        "end_time": begin + dt.timedelta(days=plan_days),
+                        "active": k == 0,
+                        "created_at": begin,
+                    }
+                    next_id += 1
+
+        step(UserSubscription, user_subscription_rows())
+
+        # Active users do most of the unlocking and saving.
+        def per_user_counts(total_rows: int) -> list[int]:
+            counts = [0] * len(user_ids)
+            if total_rows <= 0 or not user_ids:
+                return counts
+            cum: list[float] = []
+            acc = 0.0
+            for _ in user_ids:
+                acc += rnd.paretovariate(1.3)
+                cum.append(acc)
+            for i in rnd.choices(range(len(user_ids)), cum_weights=cum, k=total_rows):
+                counts[i] += 1
+            return counts
+
+        free_limit = max(0, int(os.environ.get("FREE_CONTACT_LIMIT") or "5"))
+        usage_counts = per_user_counts(usage_rows)
+        prop_ids = range(first_prop, first_prop + properties)
+
+        def usage_rows_iter(table, paid: bool) -> Iterator[dict[str, Any]]:
+            next_id = loader.next_id(table)
+            for uid, wanted in zip(user_ids, usage_counts):
+                if not wanted or not prop_ids or (uid in current_period) != paid:
+                    continue
+                for pid in rnd.sample(prop_ids, min(wanted, plan_limit if paid else free_limit, properties)):
+                    row = {"id": next_id, "user_id": uid, "property_id": pid}
+                    if paid:
+                        begin = period_start[uid]
+                        row.update(subscription_id=current_period[uid], used_at=begin + (now - begin) * rnd.random())
+                    else:
+                        row["used_at"] = now - dt.timedelta(seconds=rnd.randrange(history_days * 86400 + 1))
+                    yield row
+                    next_id += 1
+
+        step(ContactUsage, usage_rows_iter(ContactUsage.__table__, True))
+        step(FreeContactUsage, usage_rows_iter(FreeContactUsage.__table__, False))
+
+        saved_counts = per_user_counts(saved_rows)
+        first_saved = loader.next_id(SavedProperty.__table__)
+
+        def saved_rows_iter() -> Iterator[dict[str, Any]]:
+            next_id = first_saved
+            for uid, wanted in zip(user_ids, saved_counts):
+                if not wanted or not prop_ids:
+                    continue
+                for pid in rnd.sample(prop_ids, min(wanted, properties)):
+                    used = now - dt.timedelta(seconds=rnd.randrange(history_days * 86400 + 1))
+                    yield {"id": next_id, "user_id": uid, "property_id": pid, "created_at": used}
+                    next_id += 1
+
+        step(SavedProperty, saved_rows_iter())
+
+        loader.reset_sequences(
+            [
+                m.__table__
+                for m in (
+                    User,
+                    UserIdentifier,
+                    Property,
+                    PropertyImage,
+                    Subscription,
+                    UserSubscription,
+                    ContactUsage,
+                    FreeContactUsage,
+                    SavedProperty,
+                )
+            ]
+        )
+
+    return {
+        "counts": dict(loader.counts),
+        "users": [{"id": uid, "email": f"gen{uid}@{email_domain}", "subscribed": uid in subscribed} for uid in user_ids],
+        "owner_ids": owner_ids,
+        "property_ids": [pid for pid in listing_ids if pid not in prop_status],
+        "bare_properties": bare,
+        "centers": geo.centers(),
+        "districts": sorted({(s, d) for s, d, _areas in geo.places}),
+    }
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(
+        description=(
+            "Bulk-load synthetic users, owners, listings (valid locations.json state/district/area "
+            "with GPS clustered per district), images, subscriptions and contact/saved history. "
+            "Uses COPY on PostgreSQL (psycopg2) and batched executemany INSERTs elsewhere."
+        )
+    )
+    ap.add_argument("--database-url", default="", help="Defaults to DATABASE_URL (or the app's local SQLite file).")
+    ap.add_argument("--create-schema", action="store_true", help="Create missing tables from the models (scratch databases; use alembic otherwise).")
+    ap.add_argument("--users", type=int, default=10_000)
+    ap.add_argument("--owners", type=int, default=500)
+    ap.add_argument("--properties", type=int, default=50_000)
+    ap.add_argument("--images", type=float, default=3.0, help="Average images per listing (max 10).")
+    ap.add_argument("--pending-ratio", type=float, default=0.02, help="Share of listings left pending moderation.")
+    ap.add_argument("--subscribed-ratio", type=float, default=0.2)
+    ap.add_argument("--usage-rows", type=int, default=50_000, help="Contact unlocks to spread over users.")
+    ap.add_argument("--saved-rows", type=int, default=20_000, help="Saved listings to spread over users.")
+    ap.add_argument("--history-days", type=int, default=365)
+    ap.add_argument("--password", default="Password@123", help="Password for every generated account.")
+    ap.add_argument("--email-domain", default="example.test")
+    ap.add_argument("--batch-size", type=int, default=20_000)
+    ap.add_argument("--seed", type=int, default=1)
+    args = ap.parse_args()
+
+    if args.database_url:
+        os.environ["DATABASE_URL"] = args.database_url
+    sys.path.insert(0, BACKEND_DIR)
+    from app.db import ENGINE
+    from app.models import Base
+    from app.security import hash_password
+
+    if args.create_schema:
+        Base.metadata.create_all(ENGINE)
+
+    def progress(table: str, n: int, seconds: float) -> None:
+        rate = n / seconds if seconds > 0 else 0.0
+        print(f"{table:<22} {n:>10,} rows  {seconds:7.1f}s  {rate:>10,.0f} rows/s", flush=True)
+
+    started = time.perf_counter()
+    result = generate(
+        ENGINE,
+        users=max(0, args.users),
+        owners=max(1, args.owners),
+        properties=max(0, args.properties),
+        images_per_property=max(0.0, args.images),
+        pending_ratio=args.pending_ratio,
+        subscribed_ratio=args.subscribed_ratio,
+        usage_rows=max(0, args.usage_rows),
+        saved_rows=max(0, args.saved_rows),
+        history_days=max(1, args.history_days),
+        password_hash=hash_password(args.password),
+        email_domain=args.email_domain,
+        batch_size=args.batch_size,
+        seed=args.seed,
+        progress=progress,
+    )
+    total = sum(result["counts"].values())
+    print(f"{'total':<22} {total:>10,} rows  {time.perf_counter() - started:7.1f}s", flush=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,448 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import datetime as dt
+import io
+import json
+import os
+import random
+import re
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from bench_seed import BACKEND_DIR, bench_env, run_child
+
+DEFAULT_MIX = "feed=40,nearby=20,detail=25,contact=8,login=4,upload=3"
+_OTP_RE = re.compile(r"\b(\d{6})\b")
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return int(s.getsockname()[1])
+
+
+class StubProviders:
+    """
+    One local HTTP server standing in for Brevo, OpenAI moderation and Cloudinary uploads,
+    each answering after `delay_ms`. OTP codes found in emails are kept per recipient so
+    the load driver can complete OTP logins.
+    """
+
+    def __init__(self, delay_ms: int) -> None:
+        self.delay_ms = int(delay_ms)
+        self.otps: dict[str, str] = {}
+        self.calls: dict[str, int] = {}
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self) -> None:  # noqa: N802
+                raw = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+                time.sleep(stub.delay_ms / 1000.0)
+                if self.path.endswith("/smtp/email"):
+                    stub._count("brevo")
+                    try:
+                        msg = json.loads(raw)
+                        m = _OTP_RE.search(str(msg.get("textContent") or ""))
+                        if m:
+                            stub.otps[str(msg["to"][0]["email"]).lower()] = m.group(1)
+                    except Exception:
+                        pass
+                    self._send(201, {"messageId": "stub"})
+                elif self.path.endswith("/moderations"):
+                    stub._count("openai")
+                    self._send(200, {"results": [{"flagged": False, "categories": {}}]})
+                elif "/upload" in self.path:
+                    stub._count("cloudinary")
+                    pid = f"stub/{random.getrandbits(64):016x}"
+                    self._send(200, {"secure_url": f"https://res.cloudinary.com/stub/{pid}.jpg", "public_id": pid})
+                else:
+                    self._send(404, {"error": "unknown stub path"})
+
+            def _send(self, status: int, payload: dict) -> None:
+                body = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *_args) -> None:
+                pass
+
+        ThreadingHTTPServer.daemon_threads = True
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._server.request_queue_size = 1024
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+
+    def _count(self, name: str) -> None:
+        self.calls[name] = self.calls.get(name, 0) + 1
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self._server.server_address[1]}"
+
+    def app_env(self) -> dict[str, str]:
+        return {
+            "EMAIL_BACKEND": "brevo",
+            "BREVO_API_KEY": "stub",
+            "BREVO_FROM": "loadtest@bench.local",
+            "BREVO_API_URL": f"{self.base_url}/v3/smtp/email",
+            "ENABLE_MEDIA_AI_MODERATION": "1",
+            "OPENAI_API_KEY": "stub",
+            "OPENAI_BASE_URL": f"{self.base_url}/v1",
+            "CLOUDINARY_CLOUD_NAME": "stub",
+            "CLOUDINARY_API_KEY": "stub",
+            "CLOUDINARY_API_SECRET": "stub",
+            "CLOUDINARY_UPLOAD_PREFIX": self.base_url,
+        }
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+
+# Runs inside a child process (see bench_seed.run_child).
+_SEED = r"""
+import json, os
+P = json.loads(os.environ["LOADTEST_SEED"])
+from generate_data import generate
+from app.db import ENGINE
+from app.models import Base
+from app.security import create_access_token, hash_password
+
+Base.metadata.create_all(ENGINE)
+data = generate(
+    ENGINE, users=P["users"], owners=P["owners"], properties=P["properties"], images_per_property=P["images"],
+    bare_properties=P["upload_targets"], pending_ratio=0.0, subscribed_ratio=P["subscribed_ratio"],
+    usage_rows=P["usage_rows"], password_hash=hash_password(P["password"]), email_domain="bench.local", seed=P["seed"],
+)
+for u in data["users"]:
+    u["token"] = create_access_token(user_id=u["id"], role="user")
+out = {
+    "users": data["users"],
+    "owners": [{"id": oid, "token": create_access_token(user_id=oid, role="owner")} for oid in data["owner_ids"]],
+    "property_ids": data["property_ids"],
+    "upload_targets": data["bare_properties"],
+    "centers": data["centers"],
+    "districts": data["districts"],
+}
+json.dump(out, open(P["output"], "w"))
+"""
+
+
+def seed_database(env: dict[str, str], params: dict) -> dict:
+    """Create the schema and synthetic rows; returns ids, tokens and GPS centres for the driver."""
+    fd, path = tempfile.mkstemp(prefix="loadtest_seed_", suffix=".json")
+    os.close(fd)
+    run_child(_SEED, dict(env, LOADTEST_SEED=json.dumps(dict(params, output=path))))
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _parse_mix(raw: str) -> list[tuple[str, float]]:
+    mix = []
+    for part in raw.split(","):
+        name, _, weight = part.partition("=")
+        if name.strip() and float(weight or 0) > 0:
+            mix.append((name.strip(), float(weight)))
+    unknown = {n for n, _w in mix} - set(_OPS)
+    if unknown:
+        raise SystemExit(f"unknown mix entries: {', '.join(sorted(unknown))} (known: {', '.join(_OPS)})")
+    return mix
+
+
+def _tiny_jpeg(rnd: random.Random) -> bytes:
+    """A small, unique JPEG per upload (the API rejects duplicate media hashes)."""
+    from PIL import Image
+
+    buf = io.BytesIO()
+    Image.new("RGB", (64, 48), (rnd.randrange(256), rnd.randrange(256), rnd.randrange(256))).save(buf, "JPEG")
+    return buf.getvalue() + rnd.randbytes(16)
+
+
+class Driver:
+    """Issues the weighted request mix and records latency per endpoint name."""
+
+    def __init__(self, client, data: dict, stubs: StubProviders, rnd: random.Random, password: str) -> None:
+        self.client = client
+        self.data = data
+        self.stubs = stubs
+        self.rnd = rnd
+        self.password = password
+        self.samples: dict[str, list[float]] = {}
+        self.errors: dict[str, dict[str, int]] = {}
+        self._login_cursor = 0
+        self._upload_cursor = 0
+
+    def _auth(self, token: str) -> dict[str, str]:
+        return {"Authorization": f"Bearer {token}"}
+
+    async def _timed(self, name: str, method: str, path: str, *, ok=(200,), **kwargs):
+        t0 = time.perf_counter()
+        try:
+            r = await self.client.request(method, path, **kwargs)
+            status = str(r.status_code) if r.status_code not in ok else ""
+        except Exception as e:
+            r, status = None, type(e).__name__
+        self.samples.setdefault(name, []).append(time.perf_counter() - t0)
+        if status:
+            errs = self.errors.setdefault(name, {})
+            errs[status] = errs.get(status, 0) + 1
+        return r
+
+    def _user(self) -> dict:
+        return self.rnd.choice(self.data["users"])
+
+    async def feed(self) -> None:
+        params = {"limit": 20}
+        if self.rnd.random() < 0.5:
+            s, d = self.rnd.choice(self.data["districts"])
+            params.update(state=s, district=d)
+        await self._timed("GET /properties", "GET", "/properties", params=params, headers=self._auth(self._user()["token"]))
+
+    async def nearby(self) -> None:
+        lat, lng = self.rnd.choice(self.data["centers"])
+        params = {"lat": lat + self.rnd.gauss(0, 0.03), "lon": lng + self.rnd.gauss(0, 0.03), "radius_km": 10, "limit": 20}
+        await self._timed("GET /properties/nearby", "GET", "/properties/nearby", params=params)
+
+    async def detail(self) -> None:
+        pid = self.rnd.choice(self.data["property_ids"])
+        await self._timed("GET /properties/{id}", "GET", f"/properties/{pid}", headers=self._auth(self._user()["token"]))
+
+    async def contact(self) -> None:
+        # Subscribed users (plan limit 200) so most unlocks succeed; free quota exhaustion shows up as 402.
+        users = self.data["subscribed_users"] or self.data["users"]
+        user = self.rnd.choice(users)
+        pid = self.rnd.choice(self.data["property_ids"])
+        await self._timed("GET /properties/{id}/contact", "GET", f"/properties/{pid}/contact", headers=self._auth(user["token"]))
+
+    async def login(self) -> None:
+        # Round-robin identities: request-otp is limited to 5 per identifier per 10 minutes.
+        users = self.data["users"]
+        user = users[self._login_cursor % len(users)]
+        self._login_cursor += 1
+        body = {"identifier": user["email"], "password": self.password}
+        r = await self._timed("POST /auth/login/request-otp", "POST", "/auth/login/request-otp", json=body)
+        otp = self.stubs.otps.pop(user["email"].lower(), "")
+        if r is None or r.status_code != 200 or not otp:
+            return
+        await self._timed("POST /auth/login/verify-otp", "POST", "/auth/login/verify-otp", json=dict(body, otp=otp))
+
+    async def upload(self) -> None:
+        targets = self.data["upload_targets"]
+        if not targets:
+            return
+        target = targets[(self._upload_cursor // 8) % len(targets)]  # stay under the 10-images-per-ad cap
+        self._upload_cursor += 1
+        files = {"file": ("loadtest.jpg", _tiny_jpeg(self.rnd), "image/jpeg")}
+        await self._timed(
+            "POST /properties/{id}/images", "POST", f"/properties/{target['id']}/images",
+            files=files, headers=self._auth(self.data["owner_tokens"][target["owner_id"]]),
+        )
+
+
+_OPS = {
+    "feed": Driver.feed,
+    "nearby": Driver.nearby,
+    "detail": Driver.detail,
+    "contact": Driver.contact,
+    "login": Driver.login,
+    "upload": Driver.upload,
+}
+
+
+def _summary(latencies: list[float], elapsed: float, errors: dict[str, int]) -> dict:
+    lat = sorted(latencies)
+
+    def pct(p: float) -> float:
+        return round(lat[min(len(lat) - 1, int(p * len(lat)))] * 1000, 2) if lat else 0.0
+
+    return {
+        "requests": len(lat),
+        "errors": errors,
+        "rps": round(len(lat) / elapsed, 1) if elapsed else 0.0,
+        "mean_ms": round(sum(lat) / len(lat) * 1000, 2) if lat else 0.0,
+        "p50_ms": pct(0.50),
+        "p95_ms": pct(0.95),
+        "p99_ms": pct(0.99),
+    }
+
+
+async def run_load(base_url: str, data: dict, stubs: StubProviders, *, mix, total: int, duration: float, concurrency: int, warmup: int, seed: int, password: str) -> dict:
+    import httpx
+
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, timeout=60.0, limits=limits) as client:
+        driver = Driver(client, data, stubs, random.Random(seed), password)
+        names = [n for n, _w in mix]
+        weights = [w for _n, w in mix]
+        for name in names:  # warm caches/pools for every endpoint in the mix
+            for _ in range(warmup):
+                await _OPS[name](driver)
+        driver.samples.clear()
+        driver.errors.clear()
+
+        issued = 0
+        deadline = time.perf_counter() + duration if duration > 0 else None
+
+        async def worker() -> None:
+            nonlocal issued
+            while True:
+                if deadline is not None:
+                    if time.perf_counter() >= deadline:
+                        return
+                elif issued >= total:
+                    return
+                issued += 1
+                await _OPS[driver.rnd.choices(names, weights)[0]](driver)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    all_lat = [x for xs in driver.samples.values() for x in xs]
+    all_err: dict[str, int] = {}
+    for errs in driver.errors.values():
+        for k, v in errs.items():
+            all_err[k] = all_err.get(k, 0) + v
+    return {
+        "elapsed_s": round(elapsed, 3),
+        "total": _summary(all_lat, elapsed, all_err),
+        "endpoints": {name: _summary(xs, elapsed, driver.errors.get(name, {})) for name, xs in sorted(driver.samples.items())},
+    }
+
+
+def _wait_ready(base_url: str, proc: subprocess.Popen, timeout: float = 60.0) -> None:
+    import httpx
+
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError("server exited during startup")
+        try:
+            httpx.get(f"{base_url}/health", timeout=1.0)
+            return
+        except Exception:
+            time.sleep(0.2)
+    raise RuntimeError("server did not start")
+
+
+def _git_revision() -> str:
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND_DIR, capture_output=True, text=True, timeout=10)
+        return out.stdout.strip()
+    except Exception:
+        return ""
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(
+        description=(
+            "Seeded load test: starts uvicorn against a synthetic SQLite (or --database-url Postgres) "
+            "database, drives a weighted request mix with stubbed email/moderation/Cloudinary, and "
+            "prints one JSON object with p50/p95/p99 and throughput per endpoint."
+        )
+    )
+    ap.add_argument("--database-url", default="", help="Empty: fresh SQLite file. Postgres URLs must point at an empty database.")
+    ap.add_argument("--users", type=int, default=2000)
+    ap.add_argument("--owners", type=int, default=100)
+    ap.add_argument("--properties", type=int, default=5000)
+    ap.add_argument("--images", type=float, default=3.0, help="Average images per property.")
+    ap.add_argument("--usage-rows", type=int, default=5000, help="Historical contact unlocks.")
+    ap.add_argument("--subscribed-ratio", type=float, default=0.5)
+    ap.add_argument("--mix", default=DEFAULT_MIX, help=f"Weighted endpoint mix (default {DEFAULT_MIX}).")
+    ap.add_argument("--requests", type=int, default=3000, help="Total requests (ignored with --duration).")
+    ap.add_argument("--duration", type=float, default=0.0, help="Run for this many seconds instead of a request count.")
+    ap.add_argument("--concurrency", type=int, default=32)
+    ap.add_argument("--warmup", type=int, default=5, help="Untimed requests per mix entry before measuring.")
+    ap.add_argument("--workers", type=int, default=1, help="uvicorn worker processes.")
+    ap.add_argument("--async-db", action="store_true", help="Run with ASYNC_DB=1.")
+    ap.add_argument("--stub-delay-ms", type=int, default=50, help="Latency of stubbed Brevo/OpenAI/Cloudinary calls.")
+    ap.add_argument("--bcrypt-rounds", type=int, default=0, help="Cost for the seeded password hashes (0: app default).")
+    ap.add_argument("--seed", type=int, default=1)
+    ap.add_argument("--output", default="", help="Append the result as one JSON line to this file.")
+    args = ap.parse_args()
+
+    mix = _parse_mix(args.mix)
+    password = "LoadTest@123"
+    stubs = StubProviders(args.stub_delay_ms)
+    env = bench_env(
+        tempfile.mkdtemp(prefix="loadtest_"),
+        ASYNC_DB="1" if args.async_db else "0",
+        FREE_CONTACT_LIMIT="5",
+        **stubs.app_env(),
+    )
+    if args.database_url:
+        env["DATABASE_URL"] = args.database_url
+    if args.bcrypt_rounds:
+        env["BCRYPT_ROUNDS"] = str(int(args.bcrypt_rounds))
+    database_url = env["DATABASE_URL"]
+
+    params = {
+        "users": int(args.users),
+        "owners": max(1, int(args.owners)),
+        "properties": int(args.properties),
+        "images": float(args.images),
+        "usage_rows": int(args.usage_rows),
+        "subscribed_ratio": float(args.subscribed_ratio),
+        # Enough empty listings that every upload lands under the per-ad image cap.
+        "upload_targets": max(1, int(args.requests) // 8 + 1),
+        "seed": int(args.seed),
+        "password": password,
+    }
+    t0 = time.perf_counter()
+    data = seed_database(env, params)
+    seed_s = time.perf_counter() - t0
+    data["subscribed_users"] = [u for u in data["users"] if u["subscribed"]]
+    data["owner_tokens"] = {o["id"]: o["token"] for o in data["owners"]}
+
+    port = _free_port()
+    base_url = f"http://127.0.0.1:{port}"
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--workers", str(int(args.workers)), "--log-level", "warning"],
+        cwd=BACKEND_DIR,
+        env=env,
+    )
+    try:
+        _wait_ready(base_url, proc)
+        result = asyncio.run(
+            run_load(
+                base_url, data, stubs, mix=mix, total=int(args.requests), duration=float(args.duration),
+                concurrency=int(args.concurrency), warmup=int(args.warmup), seed=int(args.seed), password=password,
+            )
+        )
+    finally:
+        proc.terminate()
+        proc.wait(timeout=15)
+        stubs.stop()
+
+    report = {
+        "timestamp": dt.datetime.now(dt.timezone.utc).isoformat(timespec="seconds"),
+        "revision": _git_revision(),
+        "database": database_url.split(":", 1)[0],
+        "async_db": bool(args.async_db),
+        "workers": int(args.workers),
+        "concurrency": int(args.concurrency),
+        "mix": dict(mix),
+        "dataset": {k: params[k] for k in ("users", "owners", "properties", "images", "usage_rows", "subscribed_ratio")},
+        "seed_s": round(seed_s, 2),
+        "stub_delay_ms": int(args.stub_delay_ms),
+        "stub_calls": stubs.calls,
+        **result,
+    }
+    line = json.dumps(report, sort_keys=True)
+    print(line, flush=True)
+    if args.output:
+        with open(args.output, "a", encoding="utf-8") as f:
+            f.write(line + "\n")
+
+
+if __name__ == "__main__":
+    main()
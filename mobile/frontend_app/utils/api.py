@@ -216,6 +216,8 @@ def api_list_properties(
     area: str = "",
     sort_budget: str = "",
     posted_within_days: str = "",
+    view: str = "",
+    fields: str = "",
 ) -> dict[str, Any]:
     url = f"{_base_url()}/properties"
     rent_sale_norm = (rent_sale or "").strip()
@@ -231,6 +233,8 @@ def api_list_properties(
         "area": ((area or "").strip() or None),
         "sort_budget": (sort_budget_norm or None),
         "posted_within_days": ((posted_within_days or "").strip() or None),
+        "view": ((view or "").strip() or None),
+        "fields": ((fields or "").strip() or None),
     }
     resp = _request("GET", url, params=params, headers=_headers(), timeout=15, verify=_verify_ca_bundle())
     return _handle(resp)
@@ -250,6 +254,8 @@ def api_list_nearby_properties(
     area: str = "",
     posted_within_days: str = "",
     limit: int | None = None,
+    view: str = "",
+    fields: str = "",
 ) -> dict[str, Any]:
     """
     Nearby listing based on GPS.
@@ -270,18 +276,21 @@ def api_list_nearby_properties(
         "area": ((area or "").strip() or None),
         "posted_within_days": ((posted_within_days or "").strip() or None),
         "limit": int(limit) if limit is not None else None,
+        "view": ((view or "").strip() or None),
+        "fields": ((fields or "").strip() or None),
     }
     resp = _request("GET", url, params=params, headers=_headers(), timeout=15, verify=_verify_ca_bundle())
     return _handle(resp)
 
 
-def api_owner_list_properties() -> dict[str, Any]:
+def api_owner_list_properties(*, view: str = "", fields: str = "") -> dict[str, Any]:
     """
     Owner's own listings.
     Backend endpoint: GET /owner/properties
     """
     url = f"{_base_url()}/owner/properties"
-    resp = _request("GET", url, headers=_headers(), timeout=15, verify=_verify_ca_bundle())
+    params = {"view": ((view or "").strip() or None), "fields": ((fields or "").strip() or None)}
+    resp = _request("GET", url, params=params, headers=_headers(), timeout=15, verify=_verify_ca_bundle())
     return _handle(resp)
 
 
@@ -291,6 +300,22 @@ def api_get_property(property_id: int) -> dict[str, Any]:
     return _handle(resp)
 
 
+def api_get_properties_batch(property_ids: list[int], *, view: str = "", fields: str = "") -> dict[str, Any]:
+    """
+    Several listings in one request (shared links, saved lists).
+    Backend endpoint: GET /properties/batch -> {"items": [...], "missing": [ids]}
+    Items keep the order of `property_ids`; hidden/deleted ids come back in "missing".
+    """
+    url = f"{_base_url()}/properties/batch"
+    params = {
+        "ids": ",".join(str(int(pid)) for pid in property_ids),
+        "view": ((view or "").strip() or None),
+        "fields": ((fields or "").strip() or None),
+    }
+    resp = _request("GET", url, params=params, headers=_headers(), timeout=15, verify=_verify_ca_bundle())
+    return _handle(resp)
+
+
 def api_get_property_contact(property_id: int) -> dict[str, Any]:
     url = f"{_base_url()}/properties/{int(property_id)}/contact"
     resp = _request("GET", url, headers=_headers(), timeout=15, verify=_verify_ca_bundle())
@@ -44,6 +44,14 @@ from frontend_app.utils.storage import clear_session, get_session, get_user, set
 
 from screens.gestures import GestureNavigationMixin
 
+# Feed/nearby requests use the compact card payload (cover image only), plus the amenities
+# that _feed_card also renders.
+_FEED_VIEW = "card"
+_FEED_FIELDS = (
+    "adv_number,title,property_type,rent_sale,price,price_display,location_display,area,district,"
+    "status,images,created_at,owner_name,distance_km,contacted,amenities"
+)
+
 def _popup(title: str, message: str) -> None:
     def _open(*_):
         popup = Popup(
@@ -1385,6 +1393,8 @@ def _feed_card(self, raw: dict[str, Any]) -> BoxLayout:
                         area=area,
                         posted_within_days=posted_param,
                         limit=20,
+                        view=_FEED_VIEW,
+                        fields=_FEED_FIELDS,
                     )
                     # Nearby results require ads to have GPS coords. If none match (common),
                     # fall back to normal listing so refresh never "empties" the Home feed.
@@ -1399,6 +1409,8 @@ def _feed_card(self, raw: dict[str, Any]) -> BoxLayout:
                             area=area,
                             sort_budget=sort_budget_param,
                             posted_within_days=posted_param,
+                            view=_FEED_VIEW,
+                            fields=_FEED_FIELDS,
                         )
                 else:
                     data = api_list_properties(
@@ -1410,6 +1422,8 @@ def _feed_card(self, raw: dict[str, Any]) -> BoxLayout:
                         area=area,
                         sort_budget=sort_budget_param,
                         posted_within_days=posted_param,
+                        view=_FEED_VIEW,
+                        fields=_FEED_FIELDS,
                     )
                 cards: list[dict[str, Any]] = []
                 for p in (data.get("items") or []):
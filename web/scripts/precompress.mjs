@@ -0,0 +1,29 @@
+// Writes .br and .gz siblings for compressible build output in dist/assets.
+// The backend serves them to clients that accept br/gzip (see backend/app/compression.py).
+import { readdirSync, readFileSync, statSync, writeFileSync } from "node:fs";
+import { join } from "node:path";
+import { brotliCompressSync, constants, gzipSync } from "node:zlib";
+
+const dir = process.argv[2] || "dist/assets";
+const COMPRESSIBLE = /\.(js|mjs|css|html|json|svg|txt|map)$/;
+const MIN_BYTES = 1024;
+
+let count = 0;
+for (const name of readdirSync(dir)) {
+  const path = join(dir, name);
+  if (!COMPRESSIBLE.test(name) || !statSync(path).isFile()) continue;
+  const raw = readFileSync(path);
+  if (raw.length < MIN_BYTES) continue;
+  writeFileSync(
+    `${path}.br`,
+    brotliCompressSync(raw, {
+      params: {
+        [constants.BROTLI_PARAM_QUALITY]: constants.BROTLI_MAX_QUALITY,
+        [constants.BROTLI_PARAM_SIZE_HINT]: raw.length,
+      },
+    }),
+  );
+  writeFileSync(`${path}.gz`, gzipSync(raw, { level: 9 }));
+  count += 1;
+}
+console.log(`precompressed ${count} file(s) in ${dir}`);
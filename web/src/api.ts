@@ -30,6 +30,10 @@ export type CategoryCatalog = {
   source?: string;
 };
 
+// Moderation queues are keyset-paginated, newest first: pass the previous page's
+// `next_cursor` as `cursor` (null when there are no more pages).
+export type AdminPage = { items: any[]; next_cursor: number | null };
+
 const KEY = "pd_session_v1";
 
 export function getSession(): Session {
@@ -335,8 +339,19 @@ export async function uploadPropertyImage(propertyId: number, file: File, sortOr
   return data;
 }
 
-export function adminPending() {
-  return api<{ items: any[] }>(`/admin/properties/pending`);
+function pageQuery(params?: { cursor?: number | null; limit?: number }) {
+  const sp = new URLSearchParams();
+  if (params?.cursor != null) sp.set("cursor", String(params.cursor));
+  if (params?.limit != null) sp.set("limit", String(params.limit));
+  return sp.toString() ? `?${sp.toString()}` : "";
+}
+
+export function adminPending(params?: { cursor?: number | null; limit?: number }) {
+  return api<AdminPage>(`/admin/properties/pending${pageQuery(params)}`);
+}
+
+export function adminPendingCounts() {
+  return api<{ properties: number; owners: number; images: number }>(`/admin/pending/counts`);
 }
 
 export function adminListProperties(params?: {
@@ -421,8 +436,8 @@ export function adminSuspend(id: number, reason = "") {
   });
 }
 
-export function adminOwnersPending() {
-  return api<{ items: any[] }>(`/admin/owners/pending`);
+export function adminOwnersPending(params?: { cursor?: number | null; limit?: number }) {
+  return api<AdminPage>(`/admin/owners/pending${pageQuery(params)}`);
 }
 
 export function adminOwnerApprove(id: number) {
@@ -445,8 +460,8 @@ export function adminOwnerSuspend(id: number, reason = "") {
   });
 }
 
-export function adminImagesPending() {
-  return api<{ items: any[] }>(`/admin/images/pending`);
+export function adminImagesPending(params?: { cursor?: number | null; limit?: number }) {
+  return api<AdminPage>(`/admin/images/pending${pageQuery(params)}`);
 }
 
 export function adminImageApprove(id: number) {
@@ -469,13 +484,14 @@ export function adminImageSuspend(id: number, reason = "") {
   });
 }
 
-export function adminLogs(params?: { entity_type?: string; entity_id?: number; limit?: number }) {
+export function adminLogs(params?: { entity_type?: string; entity_id?: number; cursor?: number | null; limit?: number }) {
   const sp = new URLSearchParams();
   if (params?.entity_type) sp.set("entity_type", params.entity_type);
   if (params?.entity_id != null) sp.set("entity_id", String(params.entity_id));
+  if (params?.cursor != null) sp.set("cursor", String(params.cursor));
   if (params?.limit != null) sp.set("limit", String(params.limit));
   const qs = sp.toString() ? `?${sp.toString()}` : "";
-  return api<{ items: any[] }>(`/admin/logs${qs}`);
+  return api<AdminPage>(`/admin/logs${qs}`);
 }
 
 export function getCategoryCatalog() {
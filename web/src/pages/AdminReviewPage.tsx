@@ -11,6 +11,7 @@ import {
   adminOwnerReject,
   adminOwnersPending,
   adminPending,
+  adminPendingCounts,
   adminReject,
   adminSuspend,
   adminUpdateProperty,
@@ -24,6 +25,20 @@ import {
 import { useNavigate } from "react-router-dom";
 import { sharePost } from "../share";
 
+type Queue = "listings" | "owners" | "images" | "logs";
+
+const NO_CURSORS: Record<Queue, number | null> = { listings: null, owners: null, images: null, logs: null };
+
+function isRejection(x: any) {
+  return String(x.action || "").toLowerCase() === "reject";
+}
+
+// Approvals between page loads shift the queues; never show the same row twice.
+function appendById(prev: any[], more: any[]) {
+  const seen = new Set(prev.map((x) => x.id));
+  return [...prev, ...more.filter((x) => !seen.has(x.id))];
+}
+
 export default function AdminReviewPage() {
   const nav = useNavigate();
   const [items, setItems] = useState<any[]>([]);
@@ -31,6 +46,9 @@ export default function AdminReviewPage() {
   const [owners, setOwners] = useState<any[]>([]);
   const [images, setImages] = useState<any[]>([]);
   const [violations, setViolations] = useState<any[]>([]);
+  const [counts, setCounts] = useState<{ properties: number; owners: number; images: number } | null>(null);
+  const [cursors, setCursors] = useState<Record<Queue, number | null>>(NO_CURSORS);
+  const [loadingMore, setLoadingMore] = useState<Queue | "">("");
   const [msg, setMsg] = useState("");
   const [reasonById, setReasonById] = useState<Record<string, string>>({});
   const [editOpenById, setEditOpenById] = useState<Record<string, boolean>>({});
@@ -58,21 +76,67 @@ export default function AdminReviewPage() {
   async function loadQueues() {
     setMsg("");
     try {
-      const [resListings, resOwners, resImages, resLogs] = await Promise.all([
+      const [resListings, resOwners, resImages, resLogs, resCounts] = await Promise.all([
         adminPending(),
         adminOwnersPending(),
         adminImagesPending(),
         adminLogs({ entity_type: "property_media_upload", limit: 200 }),
+        adminPendingCounts(),
       ]);
       setItems(resListings.items || []);
       setOwners(resOwners.items || []);
       setImages(resImages.items || []);
-      setViolations((resLogs.items || []).filter((x: any) => String(x.action || "").toLowerCase() === "reject"));
+      setViolations((resLogs.items || []).filter(isRejection));
+      setCursors({
+        listings: resListings.next_cursor ?? null,
+        owners: resOwners.next_cursor ?? null,
+        images: resImages.next_cursor ?? null,
+        logs: resLogs.next_cursor ?? null,
+      });
+      setCounts(resCounts);
     } catch (e: any) {
       setMsg(e.message || "Failed");
     }
   }
 
+  async function loadMore(queue: Queue) {
+    const cursor = cursors[queue];
+    if (cursor == null) return;
+    setMsg("");
+    setLoadingMore(queue);
+    try {
+      const res =
+        queue === "listings"
+          ? await adminPending({ cursor })
+          : queue === "owners"
+            ? await adminOwnersPending({ cursor })
+            : queue === "images"
+              ? await adminImagesPending({ cursor })
+              : await adminLogs({ entity_type: "property_media_upload", cursor, limit: 200 });
+      const more = res.items || [];
+      if (queue === "listings") setItems((prev) => appendById(prev, more));
+      else if (queue === "owners") setOwners((prev) => appendById(prev, more));
+      else if (queue === "images") setImages((prev) => appendById(prev, more));
+      else setViolations((prev) => appendById(prev, more.filter(isRejection)));
+      setCursors((prev) => ({ ...prev, [queue]: res.next_cursor ?? null }));
+    } catch (e: any) {
+      setMsg(e.message || "Failed");
+    } finally {
+      setLoadingMore("");
+    }
+  }
+
+  function loadMoreButton(queue: Queue) {
+    if (cursors[queue] == null) return null;
+    return (
+      <div className="col-12">
+        <button onClick={() => loadMore(queue)} disabled={loadingMore === queue}>
+          {loadingMore === queue ? "Loading…" : "Load more"}
+        </button>
+      </div>
+    );
+  }
+
   async function runQuery() {
     setMsg("");
     try {
@@ -651,7 +715,7 @@ export default function AdminReviewPage() {
             </div>
           </div>
           <div className="spacer" />
-          <span className="admin-pill">{owners.length}</span>
+          <span className="admin-pill">{counts?.owners ?? owners.length}</span>
         </div>
         <div className="grid" style={{ marginTop: 10 }}>
           {owners.map((o) => (
@@ -702,6 +766,7 @@ export default function AdminReviewPage() {
             </div>
           ))}
           {!owners.length ? <div className="col-12 muted">No pending owners.</div> : null}
+          {loadMoreButton("owners")}
         </div>
       </div>
 
@@ -714,7 +779,7 @@ export default function AdminReviewPage() {
             </div>
           </div>
           <div className="spacer" />
-          <span className="admin-pill">{images.length}</span>
+          <span className="admin-pill">{counts?.images ?? images.length}</span>
         </div>
         <div className="grid" style={{ marginTop: 10 }}>
           {images.map((img) => (
@@ -786,6 +851,7 @@ export default function AdminReviewPage() {
             </div>
           ))}
           {!images.length ? <div className="col-12 muted">No pending images.</div> : null}
+          {loadMoreButton("images")}
         </div>
       </div>
 
@@ -817,12 +883,15 @@ export default function AdminReviewPage() {
             </div>
           ))}
           {!violations.length ? <div className="col-12 muted">No AI moderation rejections logged.</div> : null}
+          {loadMoreButton("logs")}
         </div>
       </div>
 
       <div className="grid" style={{ marginTop: 12 }}>
-        <div className="col-12">
+        <div className="col-12 row admin-queue-head">
           <div className="h2">Pending Listings</div>
+          <div className="spacer" />
+          <span className="admin-pill">{counts?.properties ?? items.length}</span>
         </div>
         {items.map((p) => (
           <div key={p.id} className="col-12">
@@ -951,6 +1020,7 @@ export default function AdminReviewPage() {
             No pending listings.
           </div>
         ) : null}
+        {loadMoreButton("listings")}
       </div>
     </div>
   );